@@ -0,0 +1,49 @@
+"""add submission_counts
+
+Per-form, per-status submission counts for the admin dashboard. Sessions
+keep them current on every flush once the table exists; this seeds it from
+the submissions already stored.
+
+Revision ID: a3f1c2d4e5b6
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c2d4e5b6'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    # Databases set up by init_db() may have the table already
+    if not inspector.has_table("submission_counts"):
+        op.create_table(
+            "submission_counts",
+            sa.Column("form_id", sa.String(length=100), nullable=False),
+            sa.Column("status", sa.String(length=50), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+            sa.PrimaryKeyConstraint("form_id", "status"),
+        )
+
+    # Seed once: rows are never removed, so an empty table has not been seeded
+    if inspector.has_table("form_submissions"):
+        op.execute(
+            """
+            INSERT INTO submission_counts (form_id, status, count)
+            SELECT form_id, status, COUNT(*)
+            FROM form_submissions
+            WHERE NOT EXISTS (SELECT 1 FROM submission_counts)
+            GROUP BY form_id, status
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("submission_counts")
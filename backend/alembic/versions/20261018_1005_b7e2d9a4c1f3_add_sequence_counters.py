@@ -0,0 +1,34 @@
+"""add sequence_counters
+
+Named counters that worker processes lease blocks of human-readable IDs
+from (see labuan_fsa.utils.sequence).
+
+Revision ID: b7e2d9a4c1f3
+Revises: a3f1c2d4e5b6
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d9a4c1f3'
+down_revision = 'a3f1c2d4e5b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases set up by init_db() may have the table already
+    if not sa.inspect(op.get_bind()).has_table("sequence_counters"):
+        op.create_table(
+            "sequence_counters",
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("next", sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint("name"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("sequence_counters")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent draft saves against the JSON database.
+
+Every simulated client owns one draft submission and autosaves it
+repeatedly (read, then update with the revision it read) while the other
+clients do the same. Throughput should grow with the number of clients,
+because writers share fsyncs instead of queueing behind one lock.
+
+The benchmark runs in a temporary data directory, so backend/data is
+never touched.
+
+Usage:
+    python scripts/benchmark_json_db.py
+    python scripts/benchmark_json_db.py --clients 1 2 4 8 16 32 --saves 50 --existing 2000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+backend_dir = Path(__file__).parent.parent
+src_dir = backend_dir / "src"
+sys.path.insert(0, str(src_dir))
+
+from labuan_fsa import json_db
+
+
+def _use_data_dir(data_dir: Path) -> None:
+    """Point every JSON collection at ``data_dir`` (compact_logs covers them all)."""
+    for collection in json_db._COLLECTIONS:
+        collection.file_path = data_dir / collection.file_path.name
+
+
+async def _seed(existing: int) -> None:
+    """Fill the store with finished submissions so saves run against a realistic size."""
+    for i in range(existing):
+        await json_db.create_submission({
+            "formId": "benchmark-form",
+            "status": "submitted",
+            "submittedBy": f"seed-user-{i % 50}",
+            "submittedData": {"step-1": {"companyName": f"Company {i}", "notes": "x" * 512}},
+        })
+    await json_db.compact_logs()
+
+
+async def _client(client_id: int, saves: int, latencies: list[float]) -> None:
+    """Create one draft and autosave it ``saves`` times."""
+    draft = await json_db.create_submission({
+        "formId": "benchmark-form",
+        "status": "draft",
+        "submittedBy": f"client-{client_id}",
+        "submittedData": {},
+    })
+    for i in range(saves):
+        start = time.perf_counter()
+        current = await json_db.get_submission_by_id(draft["id"])
+        current["submittedData"] = {"step-1": {"companyName": f"Client {client_id}", "save": i}}
+        await json_db.update_submission(
+            draft["id"], current, expected_revision=current.get("revision", 0)
+        )
+        latencies.append(time.perf_counter() - start)
+
+
+async def _run(clients: int, saves: int) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(i, saves, latencies) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    return clients * saves / elapsed, latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--saves", type=int, default=50, help="Autosaves per client")
+    parser.add_argument("--existing", type=int, default=1000, help="Submissions already stored")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _use_data_dir(Path(tmp))
+
+        print(f"🌱 Seeding {args.existing} submissions...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            await _seed(args.existing)
+
+        print(f"{'clients':>8} {'saves/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+        for clients in args.clients:
+            with contextlib.redirect_stdout(io.StringIO()):
+                throughput, latencies = await _run(clients, args.saves)
+            latencies.sort()
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            print(f"{clients:>8} {throughput:>10.0f} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
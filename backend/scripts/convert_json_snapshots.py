@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Convert the JSON database snapshots between the "json" and "compact" formats.
+
+"json" is the indented layout the data files have always used. "compact" is
+the same structure without whitespace, which is smaller on disk (so fewer
+chunks) and faster to parse, especially with orjson installed.
+
+Without --output the snapshots in backend/data are converted in place, and
+later saves keep the new format (unless JSON_DB_SNAPSHOT_FORMAT overrides it).
+With --output a converted copy is written to that directory instead, e.g. to
+export a readable copy of a store kept in compact format.
+
+Usage:
+    python scripts/convert_json_snapshots.py compact
+    python scripts/convert_json_snapshots.py json --output /tmp/export
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add src to path
+backend_dir = Path(__file__).parent.parent
+src_dir = backend_dir / "src"
+sys.path.insert(0, str(src_dir))
+
+from labuan_fsa import json_db
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("format", choices=json_db.SNAPSHOT_FORMATS, help="Target snapshot format")
+    parser.add_argument("--output", type=Path, help="Write a converted copy to this directory")
+    args = parser.parse_args()
+
+    if args.output is not None:
+        args.output.mkdir(parents=True, exist_ok=True)
+
+    await json_db.convert_snapshots(args.format, args.output)
+    target = args.output or json_db.DATA_DIR
+    print(f"✅ Wrote {args.format} snapshots to {target}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
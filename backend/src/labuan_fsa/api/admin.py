@@ -4,33 +4,47 @@ Admin API endpoints.
 Handles admin operations: submission review, form management, audit logs, analytics.
 """
 
-from typing import Optional
+from typing import AsyncIterator, Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, EmailStr
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
-from labuan_fsa.database import get_db
-from labuan_fsa.models.submission import FormSubmission
+from labuan_fsa.database import AsyncSessionLocal, get_db
+from labuan_fsa.models.submission import FormSubmission, SubmissionCount, has_submission_counts
 from labuan_fsa.models.form import Form
 from labuan_fsa.schemas.submission import SubmissionResponse, SubmissionUpdate
 from labuan_fsa.json_db import (
-    get_submissions as json_get_submissions,
+    get_submissions_page as json_get_submissions_page,
+    get_submission_statistics as json_get_submission_statistics,
     get_submission_by_id as json_get_submission_by_id,
     update_submission as json_update_submission,
     delete_submission as json_delete_submission,
     get_forms as json_get_forms,
+    count_forms as json_count_forms,
     get_form_by_id as json_get_form_by_id,
     create_form as json_create_form,
     update_form as json_update_form,
     delete_form as json_delete_form,
-    initialize_default_data,
+    RevisionConflictError,
 )
+from labuan_fsa.utils.export import (
+    EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    csv_line,
+    export_row,
+    ndjson_line,
+    schema_columns,
+)
+from labuan_fsa.utils.pagination import SQL_CURSOR_UNAVAILABLE, encode_cursor, read_cursor
+from labuan_fsa.utils.revision import client_revision
 from labuan_fsa.utils.uuid_helper import safe_uuid_convert
 from labuan_fsa.api.auth import get_current_user
 from labuan_fsa.auth_json import (
@@ -78,69 +92,106 @@ async def require_super_admin(current_user: Optional[dict] = Depends(get_current
     return current_user
 
 
+async def _list_json_submissions(
+    response: Response,
+    form_id: Optional[str],
+    status: Optional[str],
+    page_size: int,
+    after: Optional[tuple[str, str]],
+    offset: int,
+    include_total: bool,
+) -> list[SubmissionResponse]:
+    """Read one page of submissions from the JSON database and set the paging headers."""
+    json_page = await json_get_submissions_page(
+        form_id=form_id,
+        user_id=None,
+        status=status,
+        limit=page_size,
+        after=after,
+        offset=offset,
+        with_total=include_total,
+    )
+    if json_page["next"] is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor("json", *json_page["next"])
+    if json_page["total"] is not None:
+        response.headers["X-Total-Count"] = str(json_page["total"])
+
+    # Convert to SubmissionResponse format
+    result_submissions = []
+    for sub in json_page["items"]:
+        try:
+            submission_response = SubmissionResponse(
+                id=safe_uuid_convert(sub.get("id")),
+                form_id=sub.get("formId", ""),
+                submission_id=sub.get("submissionId", ""),
+                submitted_data=sub.get("submittedData", {}),
+                status=sub.get("status", "draft"),
+                submitted_by=sub.get("submittedBy"),
+                submitted_at=datetime.fromisoformat(sub.get("submittedAt", "").replace("Z", "+00:00")) if sub.get("submittedAt") else None,
+                created_at=datetime.fromisoformat(sub.get("createdAt", datetime.utcnow().isoformat() + "Z").replace("Z", "+00:00")),
+                updated_at=datetime.fromisoformat(sub.get("updatedAt", datetime.utcnow().isoformat() + "Z").replace("Z", "+00:00")),
+                revision=sub.get("revision", 0),
+            )
+            result_submissions.append(submission_response)
+        except Exception as e:
+            print(f"⚠️  Error converting submission {sub.get('submissionId')}: {e}")
+            continue
+
+    return result_submissions
+
+
 @router.get("/submissions", response_model=list[SubmissionResponse])
 async def list_all_submissions(
+    response: Response,
     form_id: Optional[str] = None,
     status: Optional[str] = None,
-    page: int = 1,
-    page_size: int = 20,
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Optional[AsyncSession] = Depends(get_db),
     admin_user: dict = Depends(require_admin),
 ) -> list[SubmissionResponse]:
     """
-    List all submissions (Admin only).
+    List all submissions (Admin only), ordered by creation time.
+
+    Pages are cut on (createdAt, id). The cursor for the next page is returned
+    in the X-Next-Cursor header (absent on the last page); pass it back as
+    ``cursor`` to continue. ``page`` is still accepted for older clients.
+    A cursor is continued by the database that issued it.
 
     Falls back to JSON database if SQL database fails.
 
     Args:
         form_id: Filter by form ID
         status: Filter by status
-        page: Page number
+        page: Page number (ignored when a cursor is given)
         page_size: Page size
+        cursor: Cursor from the previous page's X-Next-Cursor header
+        include_total: Also return the number of matches in X-Total-Count
         db: Database session
 
     Returns:
         List of submissions
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed, 503 if it was issued
+            by the SQL database and that is unavailable
     """
-    # TODO: Add admin authentication check
+    try:
+        issuer, after = read_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    offset = 0 if after else (page - 1) * page_size
 
-    # If no database connection, use JSON immediately
-    if db is None:
+    # If no database connection (or the cursor continues a JSON listing), use JSON immediately
+    if db is None or issuer == "json":
+        if issuer == "sql":
+            raise HTTPException(status_code=503, detail=SQL_CURSOR_UNAVAILABLE)
         print("📄 No SQL database connection - listing submissions from JSON database")
-        await initialize_default_data()
-        json_submissions = await json_get_submissions(form_id=form_id, user_id=None)
-        
-        # Apply status filter
-        if status:
-            json_submissions = [s for s in json_submissions if s.get("status") == status]
-        
-        # Pagination
-        start = (page - 1) * page_size
-        end = start + page_size
-        paginated_submissions = json_submissions[start:end]
-        
-        # Convert to SubmissionResponse format
-        from datetime import datetime
-        result_submissions = []
-        for sub in paginated_submissions:
-            try:
-                submission_response = SubmissionResponse(
-                    id=safe_uuid_convert(sub.get("id")),
-                    form_id=sub.get("formId", ""),
-                    submission_id=sub.get("submissionId", ""),
-                    submitted_data=sub.get("submittedData", {}),
-                    status=sub.get("status", "draft"),
-                    submitted_by=sub.get("submittedBy"),
-                    submitted_at=datetime.fromisoformat(sub.get("submittedAt", "").replace("Z", "+00:00")) if sub.get("submittedAt") else None,
-                    created_at=datetime.fromisoformat(sub.get("createdAt", datetime.utcnow().isoformat() + "Z").replace("Z", "+00:00")),
-                    updated_at=datetime.fromisoformat(sub.get("updatedAt", datetime.utcnow().isoformat() + "Z").replace("Z", "+00:00")),
-                )
-                result_submissions.append(submission_response)
-            except Exception as e:
-                print(f"⚠️  Error converting submission {sub.get('submissionId')}: {e}")
-                continue
-        
-        return result_submissions
+        return await _list_json_submissions(
+            response, form_id, status, page_size, after, offset, include_total
+        )
 
     # Try SQL database first
     try:
@@ -153,54 +204,231 @@ async def list_all_submissions(
         if status:
             query = query.where(FormSubmission.status == status)
 
-        # Execute query
+        total = None
+        if include_total:
+            total = await db.scalar(select(func.count()).select_from(query.subquery()))
+
+        # Keyset: continue strictly after the cursor's (created_at, id)
+        if after:
+            after_created_at = datetime.fromisoformat(after[0].replace("Z", "+00:00"))
+            after_id = UUID(after[1])
+            query = query.where(
+                or_(
+                    FormSubmission.created_at > after_created_at,
+                    and_(FormSubmission.created_at == after_created_at, FormSubmission.id > after_id),
+                )
+            )
+
+        # Fetch one extra row to know whether another page follows
+        query = (
+            query.order_by(FormSubmission.created_at, FormSubmission.id)
+            .offset(offset)
+            .limit(page_size + 1)
+        )
         result = await db.execute(query)
         submissions = result.scalars().all()
 
-        # Pagination
-        start = (page - 1) * page_size
-        end = start + page_size
-        paginated_submissions = submissions[start:end]
+        if len(submissions) > page_size:
+            submissions = submissions[:page_size]
+            last = submissions[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor("sql", last.created_at.isoformat(), str(last.id))
+        if total is not None:
+            response.headers["X-Total-Count"] = str(total)
 
-        return [SubmissionResponse.model_validate(sub) for sub in paginated_submissions]
+        return [SubmissionResponse.model_validate(sub) for sub in submissions]
     except Exception as e:
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
-        
+        if issuer == "sql":
+            raise HTTPException(status_code=503, detail=SQL_CURSOR_UNAVAILABLE)
+
         # Fallback to JSON database
-        await initialize_default_data()
-        json_submissions = await json_get_submissions(form_id=form_id, user_id=None)
-        
-        # Apply status filter
-        if status:
-            json_submissions = [s for s in json_submissions if s.get("status") == status]
-        
-        # Pagination
-        start = (page - 1) * page_size
-        end = start + page_size
-        paginated_submissions = json_submissions[start:end]
-        
-        # Convert to SubmissionResponse format
-        from datetime import datetime
-        result_submissions = []
-        for sub in paginated_submissions:
-            try:
-                submission_response = SubmissionResponse(
-                    id=safe_uuid_convert(sub.get("id")),
-                    form_id=sub.get("formId", ""),
-                    submission_id=sub.get("submissionId", ""),
-                    submitted_data=sub.get("submittedData", {}),
-                    status=sub.get("status", "draft"),
-                    submitted_by=sub.get("submittedBy"),
-                    submitted_at=datetime.fromisoformat(sub.get("submittedAt", "").replace("Z", "+00:00")) if sub.get("submittedAt") else None,
-                    created_at=datetime.fromisoformat(sub.get("createdAt", datetime.utcnow().isoformat() + "Z").replace("Z", "+00:00")),
-                    updated_at=datetime.fromisoformat(sub.get("updatedAt", datetime.utcnow().isoformat() + "Z").replace("Z", "+00:00")),
-                )
-                result_submissions.append(submission_response)
-            except Exception as e:
-                print(f"⚠️  Error converting submission {sub.get('submissionId')}: {e}")
-                continue
-        
-        return result_submissions
+        return await _list_json_submissions(
+            response, form_id, status, page_size, after, offset, include_total
+        )
+
+
+# Rows fetched per JSON page / SQL partition, and bytes buffered per chunk sent
+EXPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _utc_bound(value: datetime) -> datetime:
+    """Return ``value`` as a naive UTC datetime, the way timestamps are stored."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_created_at(value: Optional[str]) -> datetime:
+    """Parse a stored ISO timestamp (e.g. "2025-11-17T08:00:00Z") as a naive UTC datetime."""
+    if not value:
+        return datetime.min
+    return _utc_bound(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+async def _json_export_rows(
+    form_id: Optional[str],
+    status: Optional[str],
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+) -> AsyncIterator[dict]:
+    """Yield export rows from the JSON database, one (createdAt, id) page at a time."""
+    # createdAt is an ISO string: the lower bound is a (createdAt, id) cursor
+    # (no "Z", so it sorts before every stored timestamp at that instant)
+    after = (_utc_bound(created_from).isoformat(), "") if created_from else None
+    until = _utc_bound(created_to) if created_to else None
+    while True:
+        json_page = await json_get_submissions_page(
+            form_id=form_id, status=status, limit=EXPORT_BATCH_SIZE, after=after
+        )
+        for sub in json_page["items"]:
+            if until is not None and _parse_created_at(sub.get("createdAt")) > until:
+                return
+            yield export_row(sub)
+        if json_page["next"] is None:
+            return
+        after = json_page["next"]
+
+
+async def _sql_export_rows(
+    form_id: Optional[str],
+    status: Optional[str],
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+) -> AsyncIterator[dict]:
+    """Yield export rows from SQL through a server-side cursor."""
+    query = select(FormSubmission).options(raiseload("*"))
+    if form_id:
+        query = query.where(FormSubmission.form_id == form_id)
+    if status:
+        query = query.where(FormSubmission.status == status)
+    if created_from:
+        query = query.where(FormSubmission.created_at >= _utc_bound(created_from))
+    if created_to:
+        query = query.where(FormSubmission.created_at <= _utc_bound(created_to))
+    query = query.order_by(FormSubmission.created_at, FormSubmission.id).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+
+    # The session lives as long as the stream, not the request handler
+    async with AsyncSessionLocal() as session:
+        result = await session.stream_scalars(query)
+        async for sub in result:
+            yield export_row({
+                "id": str(sub.id),
+                "submissionId": sub.submission_id,
+                "formId": sub.form_id,
+                "status": sub.status,
+                "submittedBy": sub.submitted_by,
+                "submittedAt": sub.submitted_at.isoformat() if sub.submitted_at else None,
+                "createdAt": sub.created_at.isoformat() if sub.created_at else None,
+                "updatedAt": sub.updated_at.isoformat() if sub.updated_at else None,
+                "reviewedBy": sub.reviewed_by,
+                "reviewedAt": sub.reviewed_at.isoformat() if sub.reviewed_at else None,
+                "submittedData": sub.submitted_data,
+            })
+
+
+async def _render_export(
+    rows: AsyncIterator[dict], export_format: str, columns: list[str]
+) -> AsyncIterator[str]:
+    """Render rows as NDJSON or CSV, sending about EXPORT_CHUNK_SIZE bytes at a time."""
+    buffer: list[str] = []
+    size = 0
+    if export_format == "csv":
+        buffer.append(csv_line(columns))
+    async for row in rows:
+        if export_format == "csv":
+            line = csv_line(row.get(column) for column in columns)
+        else:
+            line = ndjson_line(row)
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+@router.get("/submissions/export")
+async def export_submissions(
+    export_format: str = Query("ndjson", alias="format", description="Export format: ndjson or csv"),
+    form_id: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, description="Only submissions created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only submissions created at or before this time"),
+    db: Optional[AsyncSession] = Depends(get_db),
+    admin_user: dict = Depends(require_admin),
+) -> StreamingResponse:
+    """
+    Export submissions as NDJSON or CSV (Admin only).
+
+    Rows are produced lazily in (createdAt, id) order and streamed as they are
+    rendered, so memory stays flat however many submissions are exported.
+    Each row holds the submission fields followed by the submitted data
+    flattened into "stepId.fieldName" columns. CSV columns come from the form
+    schemas (the filtered form's, or every form's), so fields outside them
+    only appear in NDJSON.
+
+    Falls back to JSON database if SQL database fails.
+
+    Args:
+        export_format: "ndjson" or "csv"
+        form_id: Filter by form ID
+        status: Filter by status
+        created_from: Filter by creation time (inclusive)
+        created_to: Filter by creation time (inclusive)
+        db: Database session
+
+    Returns:
+        Streaming response with the exported rows
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format: {export_format}. Use one of: {', '.join(EXPORT_FORMATS)}",
+        )
+
+    rows = None
+    schemas: list[dict] = []
+    if db is not None:
+        try:
+            # Probe SQL before committing to a stream that can no longer fall back
+            await db.execute(select(FormSubmission.id).limit(1))
+            if export_format == "csv":
+                form_query = select(Form.schema_data)
+                if form_id:
+                    form_query = form_query.where(Form.form_id == form_id)
+                schemas = list((await db.execute(form_query)).scalars())
+            rows = _sql_export_rows(form_id, status, created_from, created_to)
+        except Exception as e:
+            print(f"⚠️  SQL database error, using JSON fallback: {e}")
+            schemas = []
+
+    if rows is None:
+        print("📄 Exporting submissions from JSON database")
+        if export_format == "csv":
+            if form_id:
+                json_form = await json_get_form_by_id(form_id)
+                json_forms = [json_form] if json_form else []
+            else:
+                json_forms = await json_get_forms()
+            schemas = [form.get("schemaData", {}) for form in json_forms]
+        rows = _json_export_rows(form_id, status, created_from, created_to)
+
+    # Schema columns in first-seen order, without duplicates across forms
+    columns = list(EXPORT_COLUMNS)
+    if export_format == "csv":
+        columns.extend(dict.fromkeys(column for schema in schemas for column in schema_columns(schema)))
+
+    timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _render_export(rows, export_format, columns),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="submissions-{timestamp}.{export_format}"'},
+    )
 
 
 @router.put("/submissions/{submission_id}", response_model=SubmissionResponse)
@@ -209,23 +437,34 @@ async def review_submission(
     update_data: SubmissionUpdate,
     db: Optional[AsyncSession] = Depends(get_db),
     admin_user: dict = Depends(require_admin),
+    if_match: Optional[str] = Header(None, alias="If-Match"),
 ) -> SubmissionResponse:
     """
     Review a submission (Admin only).
 
+    Send the revision last read (If-Match, or ``revision`` in the body) to
+    have the review rejected if the submission changed since.
+
     Falls back to JSON database if SQL database fails.
 
     Args:
         submission_id: Submission ID
-        update_data: Update data (status, review_notes, requested_info)
+        update_data: Update data (status, review_notes, requested_info, revision)
         db: Database session
+        if_match: Revision the client last read
 
     Returns:
         Updated submission
 
     Raises:
-        HTTPException: 404 if submission not found
+        HTTPException: 404 if submission not found, 400 if If-Match is
+            malformed, 409 if the submission changed since the client's revision
     """
+    try:
+        expected_revision = client_revision(if_match, update_data.revision)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     # TODO: Add admin authentication check
     from datetime import datetime
     from uuid import UUID
@@ -234,7 +473,6 @@ async def review_submission(
     # If no database connection, use JSON immediately
     if db is None:
         print("📄 No SQL database connection - updating submission in JSON database")
-        await initialize_default_data()
         
         # Get submission from JSON
         json_submission = await json_get_submission_by_id(submission_id)
@@ -259,23 +497,31 @@ async def review_submission(
                 detail=f"Cannot review submission with status 'draft'. Only submitted submissions can be reviewed. Please ensure the submission is submitted first."
             )
         
-        # Update submission data
+        # Collect the review changes
+        changes = {}
         if update_data.status is not None:
-            json_submission["status"] = update_data.status
+            changes["status"] = update_data.status
         if update_data.review_notes is not None:
-            json_submission["reviewNotes"] = update_data.review_notes
+            changes["reviewNotes"] = update_data.review_notes
         if update_data.requested_info is not None:
-            json_submission["requestedInfo"] = update_data.requested_info
+            changes["requestedInfo"] = update_data.requested_info
         
         # Get admin user ID from authentication
         admin_user_id = admin_user.get("userId") if admin_user else "admin"
         
-        json_submission["reviewedAt"] = datetime.utcnow().isoformat() + "Z"
-        json_submission["reviewedBy"] = admin_user_id
-        json_submission["updatedAt"] = datetime.utcnow().isoformat() + "Z"
+        changes["reviewedAt"] = datetime.utcnow().isoformat() + "Z"
+        changes["reviewedBy"] = admin_user_id
         
-        # Update in JSON database
-        updated_submission = await json_update_submission(submission_id, json_submission)
+        # Update in JSON database, rejecting the review if the submission changed
+        # since the client (or, without a client revision, this request) read it
+        if expected_revision is None:
+            expected_revision = json_submission.get("revision", 0)
+        try:
+            updated_submission = await json_update_submission(
+                submission_id, changes, expected_revision=expected_revision
+            )
+        except RevisionConflictError as e:
+            raise HTTPException(status_code=409, detail=str(e))
         if not updated_submission:
             raise HTTPException(status_code=404, detail=f"Submission not found: {submission_id}")
         
@@ -299,6 +545,7 @@ async def review_submission(
             requested_info=updated_submission.get("requestedInfo"),
             created_at=datetime.fromisoformat(created_at_str.replace("Z", "+00:00")),
             updated_at=datetime.fromisoformat(updated_at_str.replace("Z", "+00:00")),
+            revision=updated_submission.get("revision", 0),
         )
 
     # Try SQL database first
@@ -348,8 +595,6 @@ async def review_submission(
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
         
         # Fallback to JSON database
-        await initialize_default_data()
-        
         # Get submission from JSON
         json_submission = await json_get_submission_by_id(submission_id)
         if not json_submission:
@@ -366,23 +611,31 @@ async def review_submission(
                 detail="Cannot modify approved submissions. Only superAdmin can modify approved submissions."
             )
         
-        # Update submission data
+        # Collect the review changes
+        changes = {}
         if update_data.status is not None:
-            json_submission["status"] = update_data.status
+            changes["status"] = update_data.status
         if update_data.review_notes is not None:
-            json_submission["reviewNotes"] = update_data.review_notes
+            changes["reviewNotes"] = update_data.review_notes
         if update_data.requested_info is not None:
-            json_submission["requestedInfo"] = update_data.requested_info
+            changes["requestedInfo"] = update_data.requested_info
         
         # Get admin user ID from authentication
         admin_user_id = admin_user.get("userId") if admin_user else "admin"
         
-        json_submission["reviewedAt"] = datetime.utcnow().isoformat() + "Z"
-        json_submission["reviewedBy"] = admin_user_id
-        json_submission["updatedAt"] = datetime.utcnow().isoformat() + "Z"
+        changes["reviewedAt"] = datetime.utcnow().isoformat() + "Z"
+        changes["reviewedBy"] = admin_user_id
         
-        # Update in JSON database
-        updated_submission = await json_update_submission(submission_id, json_submission)
+        # Update in JSON database, rejecting the review if the submission changed
+        # since the client (or, without a client revision, this request) read it
+        if expected_revision is None:
+            expected_revision = json_submission.get("revision", 0)
+        try:
+            updated_submission = await json_update_submission(
+                submission_id, changes, expected_revision=expected_revision
+            )
+        except RevisionConflictError as e:
+            raise HTTPException(status_code=409, detail=str(e))
         if not updated_submission:
             raise HTTPException(status_code=404, detail=f"Submission not found: {submission_id}")
         
@@ -406,9 +659,41 @@ async def review_submission(
             requested_info=updated_submission.get("requestedInfo"),
             created_at=datetime.fromisoformat(created_at_str.replace("Z", "+00:00")),
             updated_at=datetime.fromisoformat(updated_at_str.replace("Z", "+00:00")),
+            revision=updated_submission.get("revision", 0),
         )
 
 
+# Statuses counted as pending review on the dashboard
+PENDING_STATUSES = ("submitted", "under-review")
+
+
+async def _json_statistics() -> dict:
+    """Build the dashboard statistics from the JSON database's counters."""
+    stats = await json_get_submission_statistics(recent=10)
+    status_dict = stats["byStatus"]
+
+    recent_activity = [
+        {
+            "id": sub.get("submissionId", ""),
+            "type": "submission",
+            "description": f"New submission {sub.get('submissionId', '')} for form {sub.get('formId', '')}",
+            "timestamp": sub.get("submittedAt") or sub.get("createdAt", datetime.utcnow().isoformat() + "Z"),
+        }
+        for sub in stats["recent"]
+    ]
+
+    return {
+        "totalSubmissions": stats["total"],
+        "pendingSubmissions": sum(status_dict.get(status, 0) for status in PENDING_STATUSES),
+        "approvedSubmissions": status_dict.get("approved", 0),
+        "rejectedSubmissions": status_dict.get("rejected", 0),
+        "totalForms": await json_count_forms(),
+        "submissionsByStatus": status_dict,
+        "submissionsByForm": stats["byForm"],
+        "recentActivity": recent_activity,
+    }
+
+
 @router.get("/statistics")
 async def get_statistics(
     db: Optional[AsyncSession] = Depends(get_db),
@@ -417,6 +702,10 @@ async def get_statistics(
     """
     Get admin dashboard statistics.
 
+    The JSON database answers from counters it maintains on every write, and
+    SQL from the submission_counts table (kept current on every flush) plus
+    an indexed top-10, so a dashboard refresh never reads every submission.
+
     Falls back to JSON database if SQL database fails.
 
     Args:
@@ -425,72 +714,36 @@ async def get_statistics(
     Returns:
         Statistics dictionary
     """
-    # TODO: Add admin authentication check
-    from datetime import datetime
-
     # If no database connection, use JSON immediately
     if db is None:
         print("📄 No SQL database connection - getting statistics from JSON database")
-        await initialize_default_data()
-        
-        # Get all submissions and forms from JSON
-        json_submissions = await json_get_submissions()
-        json_forms = await json_get_forms()
-        
-        # Calculate statistics
-        total_submissions = len(json_submissions)
-        status_dict = {}
-        for sub in json_submissions:
-            status = sub.get("status", "draft")
-            status_dict[status] = status_dict.get(status, 0) + 1
-        
-        # Get recent activity (last 10 submissions, sorted by created date)
-        recent_submissions = sorted(
-            json_submissions,
-            key=lambda x: x.get("createdAt", ""),
-            reverse=True
-        )[:10]
-        
-        recent_activity = [
-            {
-                "id": sub.get("submissionId", ""),
-                "type": "submission",
-                "description": f"New submission {sub.get('submissionId', '')} for form {sub.get('formId', '')}",
-                "timestamp": sub.get("submittedAt") or sub.get("createdAt", datetime.utcnow().isoformat() + "Z"),
-            }
-            for sub in recent_submissions
-        ]
-        
-        return {
-            "totalSubmissions": total_submissions,
-            "pendingSubmissions": status_dict.get("under-review", 0) + status_dict.get("submitted", 0),
-            "approvedSubmissions": status_dict.get("approved", 0),
-            "rejectedSubmissions": status_dict.get("rejected", 0),
-            "totalForms": len(json_forms),
-            "recentActivity": recent_activity,
-        }
+        return await _json_statistics()
 
     # Try SQL database first
     try:
-        from sqlalchemy import func, case
-
-        # Get total submissions
-        total_result = await db.execute(select(func.count(FormSubmission.id)))
-        total_submissions = total_result.scalar() or 0
-
-        # Get submissions by status
-        status_counts = await db.execute(
-            select(
-                FormSubmission.status,
-                func.count(FormSubmission.id).label('count')
-            ).group_by(FormSubmission.status)
-        )
-        status_dict = {row.status: row.count for row in status_counts}
-
-        # Get recent activity (last 10 submissions)
+        # Read the per-form, per-status counters (one row per pair, not per submission)
+        if await db.run_sync(lambda session: has_submission_counts(session.connection())):
+            counts = await db.execute(
+                select(SubmissionCount.status, SubmissionCount.form_id, SubmissionCount.count)
+                .where(SubmissionCount.count > 0)
+            )
+        else:
+            # Not migrated yet - count the submissions themselves
+            counts = await db.execute(
+                select(FormSubmission.status, FormSubmission.form_id, func.count().label("count"))
+                .group_by(FormSubmission.status, FormSubmission.form_id)
+            )
+        status_dict: dict[str, int] = {}
+        form_dict: dict[str, int] = {}
+        for row in counts:
+            status_dict[row.status] = status_dict.get(row.status, 0) + row.count
+            form_dict[row.form_id] = form_dict.get(row.form_id, 0) + row.count
+        total_submissions = sum(status_dict.values())
+
+        # Get recent activity (last 10 submissions, from the (created_at, id) index)
         recent_result = await db.execute(
             select(FormSubmission)
-            .order_by(FormSubmission.created_at.desc())
+            .order_by(FormSubmission.created_at.desc(), FormSubmission.id.desc())
             .limit(10)
         )
         recent_submissions = recent_result.scalars().all()
@@ -512,54 +765,19 @@ async def get_statistics(
 
         return {
             "totalSubmissions": total_submissions,
-            "pendingSubmissions": status_dict.get("under-review", 0),
+            "pendingSubmissions": sum(status_dict.get(status, 0) for status in PENDING_STATUSES),
             "approvedSubmissions": status_dict.get("approved", 0),
             "rejectedSubmissions": status_dict.get("rejected", 0),
             "totalForms": total_forms,
+            "submissionsByStatus": status_dict,
+            "submissionsByForm": form_dict,
             "recentActivity": recent_activity,
         }
     except Exception as e:
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
         
         # Fallback to JSON database
-        await initialize_default_data()
-        
-        # Get all submissions and forms from JSON
-        json_submissions = await json_get_submissions()
-        json_forms = await json_get_forms()
-        
-        # Calculate statistics
-        total_submissions = len(json_submissions)
-        status_dict = {}
-        for sub in json_submissions:
-            status = sub.get("status", "draft")
-            status_dict[status] = status_dict.get(status, 0) + 1
-        
-        # Get recent activity (last 10 submissions, sorted by created date)
-        recent_submissions = sorted(
-            json_submissions,
-            key=lambda x: x.get("createdAt", ""),
-            reverse=True
-        )[:10]
-        
-        recent_activity = [
-            {
-                "id": sub.get("submissionId", ""),
-                "type": "submission",
-                "description": f"New submission {sub.get('submissionId', '')} for form {sub.get('formId', '')}",
-                "timestamp": sub.get("submittedAt") or sub.get("createdAt", datetime.utcnow().isoformat() + "Z"),
-            }
-            for sub in recent_submissions
-        ]
-        
-        return {
-            "totalSubmissions": total_submissions,
-            "pendingSubmissions": status_dict.get("under-review", 0) + status_dict.get("submitted", 0),
-            "approvedSubmissions": status_dict.get("approved", 0),
-            "rejectedSubmissions": status_dict.get("rejected", 0),
-            "totalForms": len(json_forms),
-            "recentActivity": recent_activity,
-        }
+        return await _json_statistics()
 
 
 @router.post("/seed-sample-form")
@@ -591,7 +809,6 @@ async def seed_sample_form_endpoint(
     # If no database connection, use JSON immediately
     if db is None:
         print("📄 No SQL database connection - seeding form in JSON database")
-        await initialize_default_data()
         
         # Check if form already exists in JSON
         existing_form = await json_get_form_by_id(form_id)
@@ -643,7 +860,6 @@ async def delete_submission(
     # If no database connection, use JSON immediately
     if db is None:
         print("📄 No SQL database connection - deleting submission from JSON database")
-        await initialize_default_data()
         
         # Get submission from JSON
         json_submission = await json_get_submission_by_id(submission_id)
@@ -692,8 +908,6 @@ async def delete_submission(
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
         
         # Fallback to JSON database
-        await initialize_default_data()
-        
         # Get submission from JSON
         json_submission = await json_get_submission_by_id(submission_id)
         if not json_submission:
@@ -751,8 +965,6 @@ async def delete_submission(
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
         
         # Fallback to JSON database
-        await initialize_default_data()
-        
         # Check if form already exists in JSON
         existing_form = await json_get_form_by_id(form_id)
         
@@ -803,7 +1015,6 @@ async def delete_submission(
     # If no database connection, use JSON immediately
     if db is None:
         print("📄 No SQL database connection - deleting submission from JSON database")
-        await initialize_default_data()
         
         # Get submission from JSON
         json_submission = await json_get_submission_by_id(submission_id)
@@ -852,8 +1063,6 @@ async def delete_submission(
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
         
         # Fallback to JSON database
-        await initialize_default_data()
-        
         # Get submission from JSON
         json_submission = await json_get_submission_by_id(submission_id)
         if not json_submission:
@@ -1270,7 +1479,6 @@ async def delete_form(
     # If no database connection, use JSON immediately
     if db is None:
         print("📄 No SQL database connection - deleting form from JSON database")
-        await initialize_default_data()
         
         deleted = await json_delete_form(form_id)
         if not deleted:
@@ -1295,8 +1503,6 @@ async def delete_form(
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
         
         # Fallback to JSON database
-        await initialize_default_data()
-        
         deleted = await json_delete_form(form_id)
         if not deleted:
             raise HTTPException(status_code=404, detail=f"Form not found: {form_id}")
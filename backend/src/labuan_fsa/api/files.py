@@ -5,146 +5,76 @@ Handles file uploads, downloads, and deletion.
 Supports both SQL database and JSON fallback.
 """
 
-import json
+import asyncio
 import hashlib
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, Query
-from fastapi.responses import FileResponse
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Request, UploadFile, Query
+from fastapi.responses import FileResponse, Response
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from labuan_fsa.blob_store import (
+    BlobTooLargeError,
+    MultipartUploadError,
+    MultipartUploadNotFoundError,
+    abort_multipart,
+    blob_root,
+    complete_multipart,
+    create_multipart,
+    list_parts,
+    read_multipart,
+    reclaim_blob,
+    settle_blob,
+    store_blob,
+    store_part,
+)
 from labuan_fsa.config import get_settings
 from labuan_fsa.database import get_db
+from labuan_fsa.json_db import (
+    count_file_references as json_count_file_references,
+    create_file as json_create_file,
+    delete_file as json_delete_file,
+    get_file as json_get_file,
+)
 from labuan_fsa.models.submission import FileUpload as FileUploadModel
-from labuan_fsa.schemas.file import FileUploadResponse
+from labuan_fsa.schemas.file import (
+    FileUploadResponse,
+    MultipartPart,
+    MultipartUploadComplete,
+    MultipartUploadCreate,
+    MultipartUploadResponse,
+)
 from labuan_fsa.utils.validators import validate_file_upload
 
 router = APIRouter(prefix="/api/files", tags=["Files"])
 
 settings = get_settings()
 
-# JSON database for file uploads
-FILES_DB_PATH = Path(__file__).parent.parent.parent.parent / "data" / "files.json"
-FILES_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-
 def get_file_hash(file_content: bytes) -> str:
     """Calculate SHA-256 hash of file content."""
     return hashlib.sha256(file_content).hexdigest()
 
 
-def _load_json_files() -> list:
-    """Load files from JSON database."""
-    if not FILES_DB_PATH.exists():
-        return []
-    
-    try:
-        with open(FILES_DB_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if isinstance(data, dict) and 'items' in data:
-                return data['items']
-            elif isinstance(data, list):
-                return data
-            return []
-    except Exception as e:
-        print(f"Error loading files.json: {e}")
-        return []
-
-
-def _save_json_files(files: list) -> None:
-    """Save files to JSON database."""
-    data = {
-        "version": "1.0.0",
-        "lastUpdated": datetime.utcnow().isoformat() + "Z",
-        "items": files
-    }
-    with open(FILES_DB_PATH, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-
-async def save_file_locally(file: UploadFile, field_name: str) -> tuple[str, int]:
-    """
-    Save file to local storage.
-
-    Returns:
-        Tuple of (file_path, file_size)
-    """
-    # Create uploads directory if it doesn't exist
-    upload_dir = Path(settings.storage.local_path)
-    upload_dir.mkdir(parents=True, exist_ok=True)
-
-    # Generate unique filename
-    file_extension = Path(file.filename).suffix if file.filename else ''
-    unique_filename = f"{field_name}_{uuid4().hex[:16]}{file_extension}"
-    file_path = upload_dir / unique_filename
-
-    # Save file
-    file_content = await file.read()
-    with open(file_path, 'wb') as f:
-        f.write(file_content)
-
-    file_size = len(file_content)
-    # Return absolute path for JSON storage
-    return str(file_path.absolute()), file_size
-
-
-@router.post("/upload", response_model=FileUploadResponse, status_code=201)
-@router.post("", response_model=FileUploadResponse, status_code=201)
-async def upload_file(
-    file: UploadFile = File(...),
-    field_name: str = Query(..., alias="fieldName"),
-    file_id: Optional[str] = Query(None, alias="fileId"),  # Accept custom file ID from frontend
-    db: Optional[AsyncSession] = Depends(get_db),
+async def _record_upload(
+    db: Optional[AsyncSession],
+    field_name: str,
+    file_name: str,
+    mime_type: Optional[str],
+    file_id: Optional[str],
+    file_path: str,
+    file_size: int,
+    file_hash: str,
+    storage_url: Optional[str] = None,
 ) -> FileUploadResponse:
     """
-    Upload a file.
+    Save the metadata of a stored upload and build the upload response.
 
-    Args:
-        file: File to upload
-        field_name: Form field name (can be passed as query param or form data)
-        db: Database session (optional, will use JSON fallback if None)
-
-    Returns:
-        File upload response with metadata
-
-    Raises:
-        HTTPException: 400 if file validation fails, 413 if file too large
+    Falls back to JSON database if SQL database fails.
     """
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="File name is required")
-
-    # Get file extension
-    file_extension = Path(file.filename).suffix.lower()
-
-    # Validate file
-    file_content = await file.read()
-    await file.seek(0)  # Reset file pointer for saving
-
-    is_valid, error_message = validate_file_upload(
-        file_size=len(file_content),
-        file_name=file.filename,
-        allowed_extensions=settings.storage.allowed_extensions,
-        max_size=settings.storage.max_file_size,
-    )
-
-    if not is_valid:
-        raise HTTPException(status_code=400, detail=error_message)
-
-    # Calculate file hash
-    file_hash = get_file_hash(file_content)
-
-    # Save file (currently only local storage)
-    if settings.storage.provider == 'local':
-        file_path, file_size = await save_file_locally(file, field_name)
-        storage_url = None
-    else:
-        # TODO: Implement cloud storage (S3, Azure, GCP)
-        raise HTTPException(status_code=501, detail="Cloud storage not yet implemented")
-
     # Generate file ID - use custom format if provided, otherwise use UUID
     # Frontend uses format: "file-{timestamp}-{filename}" for compatibility
     if file_id:
@@ -161,10 +91,10 @@ async def upload_file(
                 id=file_uuid,  # Use UUID for database
                 submission_id=UUID('00000000-0000-0000-0000-000000000000'),  # Temporary UUID
                 field_name=field_name,
-                file_name=file.filename,
+                file_name=file_name,
                 file_path=file_path,
                 file_size=file_size,
-                mime_type=file.content_type,
+                mime_type=mime_type,
                 storage_location=settings.storage.provider,
                 storage_url=storage_url,
                 file_hash=file_hash,
@@ -192,17 +122,15 @@ async def upload_file(
             print(f"⚠️  SQL database error, using JSON fallback: {e}")
     
     # Fallback to JSON database
-    files = _load_json_files()
-    
     file_data = {
         "id": str(file_uuid),  # Internal UUID
         "fileId": file_id_str,  # Use frontend's file ID format for compatibility
         "submissionId": "00000000-0000-0000-0000-000000000000",  # Temporary
         "fieldName": field_name,
-        "fileName": file.filename,
+        "fileName": file_name,
         "filePath": file_path,
         "fileSize": file_size,
-        "mimeType": file.content_type,
+        "mimeType": mime_type,
         "storageLocation": settings.storage.provider,
         "storageUrl": storage_url,
         "fileHash": file_hash,
@@ -210,8 +138,7 @@ async def upload_file(
         "uploadedBy": None,
     }
     
-    files.append(file_data)
-    _save_json_files(files)
+    await json_create_file(file_data)
     
     uploaded_at_dt = datetime.utcnow()
     
@@ -219,10 +146,10 @@ async def upload_file(
         id=str(file_uuid),  # Convert UUID to string
         file_id=file_id_str,  # Return the file ID format that frontend expects
         field_name=field_name,
-        file_name=file.filename,
+        file_name=file_name,
         file_path=file_path,
         file_size=file_size,
-        mime_type=file.content_type,
+        mime_type=mime_type,
         storage_location=settings.storage.provider,
         storage_url=storage_url,
         uploaded_at=uploaded_at_dt,
@@ -230,16 +157,327 @@ async def upload_file(
     )
 
 
+@router.post("/upload", response_model=FileUploadResponse, status_code=201)
+@router.post("", response_model=FileUploadResponse, status_code=201)
+async def upload_file(
+    file: UploadFile = File(...),
+    field_name: str = Query(..., alias="fieldName"),
+    file_id: Optional[str] = Query(None, alias="fileId"),  # Accept custom file ID from frontend
+    db: Optional[AsyncSession] = Depends(get_db),
+) -> FileUploadResponse:
+    """
+    Upload a file.
+
+    Args:
+        file: File to upload
+        field_name: Form field name (can be passed as query param or form data)
+        db: Database session (optional, will use JSON fallback if None)
+
+    Returns:
+        File upload response with metadata
+
+    Raises:
+        HTTPException: 400 if file validation fails, 413 if file too large
+    """
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="File name is required")
+
+    # Validate the file name before reading anything; the size is checked while streaming
+    is_valid, error_message = validate_file_upload(
+        file_size=0,
+        file_name=file.filename,
+        allowed_extensions=settings.storage.allowed_extensions,
+        max_size=settings.storage.max_file_size,
+    )
+
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=error_message)
+
+    # Save file (currently only local storage), hashing it on the way.
+    # Identical content is stored once and shared by every upload of it.
+    if settings.storage.provider == 'local':
+        try:
+            file_path, file_size, file_hash, spare = await store_blob(
+                file, settings.storage.max_file_size
+            )
+        except BlobTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        storage_url = None
+    else:
+        # TODO: Implement cloud storage (S3, Azure, GCP)
+        raise HTTPException(status_code=501, detail="Cloud storage not yet implemented")
+
+    try:
+        return await _record_upload(
+            db,
+            field_name=field_name,
+            file_name=file.filename,
+            mime_type=file.content_type,
+            file_id=file_id,
+            file_path=file_path,
+            file_size=file_size,
+            file_hash=file_hash,
+            storage_url=storage_url,
+        )
+    finally:
+        # Keeps the shared blob in place even if a delete raced with this upload
+        await asyncio.to_thread(settle_blob, file_path, spare)
+
+
+async def _multipart_state(upload_id: str) -> MultipartUploadResponse:
+    """Describe a multipart upload and the parts it has received."""
+    parts = await asyncio.to_thread(list_parts, upload_id)
+    return MultipartUploadResponse(
+        upload_id=upload_id,
+        part_size=settings.storage.multipart_part_size,
+        max_file_size=settings.storage.max_multipart_file_size,
+        parts=[MultipartPart(**part) for part in parts],
+    )
+
+
+@router.post("/multipart", response_model=MultipartUploadResponse, status_code=201)
+async def initiate_multipart_upload(request: MultipartUploadCreate) -> MultipartUploadResponse:
+    """
+    Start a resumable multipart upload.
+
+    The client then PUTs the file in parts (in any order, in parallel if it
+    likes) to /multipart/{upload_id}/parts/{part_number}, and completes the
+    upload once every part is in. After a dropped connection, GET the upload
+    to see which parts arrived and resend only the others.
+
+    Args:
+        request: File name, form field name and optional expected size / file ID
+
+    Returns:
+        Upload ID and suggested part size
+
+    Raises:
+        HTTPException: 400 if file validation fails
+    """
+    if settings.storage.provider != 'local':
+        # TODO: Implement cloud storage (S3, Azure, GCP)
+        raise HTTPException(status_code=501, detail="Cloud storage not yet implemented")
+
+    is_valid, error_message = validate_file_upload(
+        file_size=request.file_size or 0,
+        file_name=request.file_name,
+        allowed_extensions=settings.storage.allowed_extensions,
+        max_size=settings.storage.max_multipart_file_size,
+    )
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=error_message)
+
+    upload_id = await asyncio.to_thread(create_multipart, {
+        "fileName": request.file_name,
+        "fieldName": request.field_name,
+        "fileId": request.file_id,
+        "mimeType": request.mime_type,
+        "createdAt": datetime.utcnow().isoformat() + "Z",
+    })
+    print(f"📤 Started multipart upload {upload_id} for {request.file_name}")
+    return await _multipart_state(upload_id)
+
+
+@router.get("/multipart/{upload_id}", response_model=MultipartUploadResponse)
+async def get_multipart_upload(upload_id: str) -> MultipartUploadResponse:
+    """
+    Get a multipart upload and the parts received so far (to resume it).
+
+    Raises:
+        HTTPException: 404 if the upload does not exist
+    """
+    try:
+        return await _multipart_state(upload_id)
+    except MultipartUploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.put("/multipart/{upload_id}/parts/{part_number}", response_model=MultipartPart)
+async def upload_multipart_part(
+    upload_id: str,
+    part_number: int,
+    request: Request,
+    checksum: Optional[str] = Header(None, alias="X-Checksum-SHA256"),
+) -> MultipartPart:
+    """
+    Upload one part of a multipart upload.
+
+    The part is the raw request body. It is streamed to disk and stored only
+    if it arrives complete and its SHA-256 matches the X-Checksum-SHA256
+    header (hex), when sent. Sending a part again replaces it.
+
+    Args:
+        upload_id: Upload ID from the initiate call
+        part_number: Part number, starting at 1
+        request: Request whose body is the part
+        checksum: SHA-256 of the part (hex)
+
+    Returns:
+        Stored part number, size and checksum
+
+    Raises:
+        HTTPException: 404 if the upload does not exist, 400 if the part is
+            invalid or corrupted, 413 if it would take the upload's parts
+            past the maximum file size
+    """
+    try:
+        part = await store_part(
+            upload_id,
+            part_number,
+            request.stream(),
+            settings.storage.max_multipart_file_size,
+            checksum=checksum,
+        )
+    except BlobTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except MultipartUploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except MultipartUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return MultipartPart(**part)
+
+
+@router.post("/multipart/{upload_id}/complete", response_model=FileUploadResponse, status_code=201)
+async def complete_multipart_upload(
+    upload_id: str,
+    request: Optional[MultipartUploadComplete] = None,
+    db: Optional[AsyncSession] = Depends(get_db),
+) -> FileUploadResponse:
+    """
+    Assemble the parts of a multipart upload into the stored file.
+
+    The parts are concatenated in order into the content-addressed store
+    (hashing the whole file on the way) and the upload is recorded like a
+    single-shot upload.
+
+    Args:
+        upload_id: Upload ID from the initiate call
+        request: Optionally, the parts the client sent, to check against the received ones
+        db: Database session (optional, will use JSON fallback if None)
+
+    Returns:
+        File upload response with metadata
+
+    Raises:
+        HTTPException: 404 if the upload does not exist, 400 if parts are
+            missing or do not match, 413 if the file is too large
+    """
+    try:
+        upload = await asyncio.to_thread(read_multipart, upload_id)
+        expected_parts = None
+        if request is not None and request.parts is not None:
+            expected_parts = [part.model_dump(by_alias=True) for part in request.parts]
+        file_path, file_size, file_hash, spare = await complete_multipart(
+            upload_id, settings.storage.max_multipart_file_size, expected_parts
+        )
+    except BlobTooLargeError as e:
+        await asyncio.to_thread(abort_multipart, upload_id)
+        raise HTTPException(status_code=413, detail=str(e))
+    except MultipartUploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except MultipartUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    print(f"✅ Completed multipart upload {upload_id} ({file_size} bytes)")
+    try:
+        return await _record_upload(
+            db,
+            field_name=upload["fieldName"],
+            file_name=upload["fileName"],
+            mime_type=upload.get("mimeType"),
+            file_id=upload.get("fileId"),
+            file_path=file_path,
+            file_size=file_size,
+            file_hash=file_hash,
+        )
+    finally:
+        await asyncio.to_thread(settle_blob, file_path, spare)
+
+
+@router.delete("/multipart/{upload_id}", status_code=204)
+async def abort_multipart_upload(upload_id: str):
+    """
+    Abandon a multipart upload and discard its parts.
+
+    Raises:
+        HTTPException: 404 if the upload does not exist
+    """
+    try:
+        await asyncio.to_thread(abort_multipart, upload_id)
+    except MultipartUploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return None
+
+
+# Blobs are named by their SHA-256, so their content never changes; other
+# files are revalidated against their ETag. Documents are applicants' own,
+# so only the browser may keep them, not shared caches.
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against ``etag`` (weak comparison, as for GET)."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _download_response(
+    request: Request,
+    file_path: Path,
+    file_name: str,
+    mime_type: Optional[str],
+    file_hash: Optional[str],
+) -> Response:
+    """
+    Serve a stored file with caching and range support.
+
+    The strong ETag is the stored SHA-256. A matching If-None-Match gets a
+    304 without touching the file; otherwise FileResponse streams it and
+    answers Range requests (with If-Range checked against the ETag) with
+    206 partial content.
+    """
+    headers = {}
+    if file_hash:
+        headers["ETag"] = f'"{file_hash}"'
+        try:
+            is_blob = file_path.resolve().parent.parent == blob_root().resolve()
+        except OSError:
+            is_blob = False
+        headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if is_blob else REVALIDATE_CACHE_CONTROL
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    else:
+        headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+
+    return FileResponse(
+        path=str(file_path),
+        filename=file_name,
+        media_type=mime_type,
+        headers=headers,
+    )
+
+
 @router.get("/{file_id}/download")
 async def download_file(
     file_id: str,
+    request: Request,
     db: Optional[AsyncSession] = Depends(get_db),
 ):
     """
     Download a file.
 
+    Supports conditional requests (ETag / If-None-Match -> 304) and byte
+    ranges (Range -> 206), so reviewers re-opening a document are served
+    from the browser cache or fetch only the part they need.
+
     Args:
         file_id: File ID (UUID string)
+        request: Incoming request (for the conditional and range headers)
         db: Database session (optional, will use JSON fallback if None)
 
     Returns:
@@ -262,23 +500,19 @@ async def download_file(
                     if not file_path.exists():
                         raise HTTPException(status_code=404, detail="File not found on disk")
 
-                    return FileResponse(
-                        path=str(file_path),
-                        filename=file_upload.file_name,
-                        media_type=file_upload.mime_type,
+                    return _download_response(
+                        request,
+                        file_path,
+                        file_upload.file_name,
+                        file_upload.mime_type,
+                        file_upload.file_hash,
                     )
         except Exception as e:
             print(f"⚠️  SQL database error, using JSON fallback: {e}")
     
     # Fallback to JSON database
-    files = _load_json_files()
     # Support both UUID and frontend's timestamp-based file ID format (e.g., "file-1763466093336-test-document.pdf")
-    file_data = next((f for f in files if 
-                      f.get("id") == file_id or 
-                      f.get("fileId") == file_id or 
-                      str(f.get("id")) == file_id or 
-                      str(f.get("fileId")) == file_id or
-                      (isinstance(f.get("fileId"), str) and file_id in f.get("fileId", ""))), None)
+    file_data = await json_get_file(file_id)
     
     if not file_data:
         raise HTTPException(status_code=404, detail=f"File not found: {file_id}")
@@ -287,13 +521,35 @@ async def download_file(
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="File not found on disk")
     
-    return FileResponse(
-        path=str(file_path),
-        filename=file_data.get("fileName", "file"),
-        media_type=file_data.get("mimeType", "application/octet-stream"),
+    return _download_response(
+        request,
+        file_path,
+        file_data.get("fileName", "file"),
+        file_data.get("mimeType", "application/octet-stream"),
+        file_data.get("fileHash"),
     )
 
 
+async def _count_file_references(db: Optional[AsyncSession], file_path: str) -> int:
+    """
+    Count the upload records, in either store, that reference ``file_path``.
+
+    Uploads land in the JSON database whenever SQL is unavailable, so records
+    sharing one blob can live in both. A store that cannot be queried is
+    assumed to reference the file, so it is kept.
+    """
+    count = await json_count_file_references(file_path)
+    if db is not None:
+        try:
+            count += await db.scalar(
+                select(func.count()).where(FileUploadModel.file_path == file_path)
+            )
+        except Exception as e:
+            print(f"⚠️  SQL database error, keeping {Path(file_path).name}: {e}")
+            count += 1
+    return count
+
+
 @router.delete("/{file_id}", status_code=204)
 async def delete_file(
     file_id: str,
@@ -318,40 +574,30 @@ async def delete_file(
             file_upload = result.scalar_one_or_none()
 
             if file_upload:
-                # Delete file from storage
-                if settings.storage.provider == 'local':
-                    file_path = Path(file_upload.file_path)
-                    if file_path.exists():
-                        file_path.unlink()
-
                 # Delete record
+                file_path = file_upload.file_path
                 await db.delete(file_upload)
                 await db.commit()
+
+                # Delete file from storage once no other upload shares it
+                if settings.storage.provider == 'local':
+                    await reclaim_blob(file_path, lambda: _count_file_references(db, file_path))
                 return None
         except Exception as e:
             print(f"⚠️  SQL database error, using JSON fallback: {e}")
     
     # Fallback to JSON database
-    files = _load_json_files()
     # Support both UUID and frontend's timestamp-based file ID format (e.g., "file-1763466093336-test-document.pdf")
-    file_data = next((f for f in files if 
-                      f.get("id") == file_id or 
-                      f.get("fileId") == file_id or 
-                      str(f.get("id")) == file_id or 
-                      str(f.get("fileId")) == file_id or
-                      (isinstance(f.get("fileId"), str) and file_id in f.get("fileId", ""))), None)
+    deleted = await json_delete_file(file_id)
     
-    if not file_data:
+    if not deleted:
         raise HTTPException(status_code=404, detail=f"File not found: {file_id}")
     
-    # Delete file from storage
+    # Delete file from storage once no other upload shares it
+    file_data, remaining = deleted
     if settings.storage.provider == 'local':
-        file_path = Path(file_data.get("filePath", ""))
-        if file_path.exists():
-            file_path.unlink()
-    
-    # Remove from JSON database
-    files = [f for f in files if f.get("id") != file_id and f.get("fileId") != file_id]
-    _save_json_files(files)
+        file_path = file_data.get("filePath", "")
+        if file_path and not remaining:
+            await reclaim_blob(file_path, lambda: _count_file_references(db, file_path))
     
     return None
@@ -26,7 +26,7 @@ from labuan_fsa.json_db import (
     get_form_by_id as json_get_form_by_id,
     create_form as json_create_form,
     update_form as json_update_form,
-    initialize_default_data,
+    DuplicateKeyError,
 )
 
 router = APIRouter(prefix="/api/forms", tags=["Forms"])
@@ -38,8 +38,6 @@ async def _try_sql_db(coro):
         return await coro
     except Exception as e:
         print(f"⚠️  SQL database error, falling back to JSON: {e}")
-        # Initialize default data if JSON DB is empty
-        await initialize_default_data()
         return None
 
 
@@ -118,7 +116,6 @@ async def list_forms(
     
     # Use JSON database by default (preferred for local development and GitHub-based storage)
     print("📄 Using JSON database (default)")
-    await initialize_default_data()
     json_forms = await json_get_forms(status=status)
     
     # Apply additional filters
@@ -162,7 +159,6 @@ async def get_form(
     # If no database connection, use JSON immediately
     if db is None:
         print("📄 No SQL database connection - using JSON database")
-        await initialize_default_data()
         json_form = await json_get_form_by_id(form_id)
         
         if not json_form:
@@ -195,7 +191,6 @@ async def get_form(
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
     
     # Fallback to JSON database
-    await initialize_default_data()
     json_form = await json_get_form_by_id(form_id)
     
     if not json_form:
@@ -245,7 +240,6 @@ async def get_form_schema(
     # If no database connection, use JSON immediately
     if db is None:
         print("📄 No SQL database connection - using JSON database")
-        await initialize_default_data()
         json_form = await json_get_form_by_id(form_id)
         
         if not json_form:
@@ -285,7 +279,6 @@ async def get_form_schema(
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
     
     # Fallback to JSON database
-    await initialize_default_data()
     json_form = await json_get_form_by_id(form_id)
     
     if not json_form:
@@ -328,7 +321,6 @@ async def create_form(
     # If no database connection, use JSON immediately
     if db is None:
         print("📄 No SQL database connection - creating form in JSON database")
-        await initialize_default_data()
         
         # Check if form_id already exists in JSON
         existing_json_form = await json_get_form_by_id(form_data.form_id)
@@ -350,7 +342,13 @@ async def create_form(
             "estimatedTime": form_data.estimated_time,
         }
         
-        created_form = await json_create_form(json_form_data)
+        try:
+            created_form = await json_create_form(json_form_data)
+        except DuplicateKeyError:
+            # Created by a concurrent request since the check above
+            raise HTTPException(
+                status_code=409, detail=f"Form with form_id '{form_data.form_id}' already exists"
+            )
         
         # Convert to FormResponse format
         return FormResponse(
@@ -404,8 +402,6 @@ async def create_form(
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
         
         # Fallback to JSON database
-        await initialize_default_data()
-        
         # Check if form_id already exists in JSON
         existing_json_form = await json_get_form_by_id(form_data.form_id)
         if existing_json_form:
@@ -426,7 +422,13 @@ async def create_form(
             "estimatedTime": form_data.estimated_time,
         }
         
-        created_form = await json_create_form(json_form_data)
+        try:
+            created_form = await json_create_form(json_form_data)
+        except DuplicateKeyError:
+            # Created by a concurrent request since the check above
+            raise HTTPException(
+                status_code=409, detail=f"Form with form_id '{form_data.form_id}' already exists"
+            )
         
         # Convert to FormResponse format
         return FormResponse(
@@ -471,7 +473,6 @@ async def update_form(
     # If no database connection, use JSON immediately
     if db is None:
         print("📄 No SQL database connection - updating form in JSON database")
-        await initialize_default_data()
         
         # Get existing form from JSON
         existing_form = await json_get_form_by_id(form_id)
@@ -555,8 +556,6 @@ async def update_form(
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
         
         # Fallback to JSON database
-        await initialize_default_data()
-        
         # Get existing form from JSON
         existing_form = await json_get_form_by_id(form_id)
         if not existing_form:
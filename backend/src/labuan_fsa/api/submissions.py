@@ -5,17 +5,20 @@ Handles form submission validation, submission, and draft saving.
 """
 
 from datetime import datetime
+import json
 from typing import Optional
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from labuan_fsa.database import get_db
 from labuan_fsa.models.form import Form
 from labuan_fsa.models.submission import FormSubmission
 from labuan_fsa.schemas.submission import (
+    SubmissionBatchValidateRequest,
     SubmissionCreate,
     SubmissionCreateResponse,
     SubmissionDraft,
@@ -23,21 +26,61 @@ from labuan_fsa.schemas.submission import (
     SubmissionValidateRequest,
     SubmissionValidateResponse,
 )
-from labuan_fsa.utils.validators import generate_submission_id, validate_form_data
+from labuan_fsa.utils.validators import (
+    CompiledSchema,
+    generate_submission_id,
+    get_form_validator,
+    validate_batch,
+)
+from labuan_fsa.utils.pagination import SQL_CURSOR_UNAVAILABLE, encode_cursor, read_cursor
+from labuan_fsa.utils.revision import client_revision
 from labuan_fsa.utils.uuid_helper import safe_uuid_convert
 from labuan_fsa.json_db import (
     get_form_by_id as json_get_form_by_id,
-    get_submissions as json_get_submissions,
+    get_submissions_page as json_get_submissions_page,
     get_submission_by_id as json_get_submission_by_id,
     create_submission as json_create_submission,
     update_submission as json_update_submission,
-    initialize_default_data,
+    RevisionConflictError,
 )
 from labuan_fsa.api.auth import get_current_user
 
 router = APIRouter(prefix="/api", tags=["Submissions"])
 
 
+async def _get_form_validator(form_id: str, db: Optional[AsyncSession]) -> CompiledSchema:
+    """
+    Resolve a form and return the compiled validator of its current version.
+
+    Falls back to JSON database if SQL database fails.
+
+    Raises:
+        HTTPException: 404 if form not found
+    """
+    form_schema_data = None
+    form_version = form_revision = None
+    try:
+        if db is not None:
+            result = await db.execute(select(Form).where(Form.form_id == form_id))
+            form = result.scalar_one_or_none()
+            if form:
+                form_schema_data = form.schema_data
+                form_version, form_revision = form.version, form.updated_at
+    except Exception as e:
+        print(f"⚠️  SQL database error, using JSON fallback: {e}")
+
+    # Fallback to JSON database
+    if not form_schema_data:
+        json_form = await json_get_form_by_id(form_id)
+        if not json_form:
+            raise HTTPException(status_code=404, detail=f"Form not found: {form_id}")
+        form_schema_data = json_form.get("schemaData", {})
+        form_version = json_form.get("version", "1.0.0")
+        form_revision = json_form.get("updatedAt")
+
+    return get_form_validator(form_id, form_version, form_schema_data, form_revision)
+
+
 @router.post("/forms/{form_id}/validate", response_model=SubmissionValidateResponse)
 async def validate_submission(
     form_id: str,
@@ -47,47 +90,70 @@ async def validate_submission(
     """
     Validate submission data before submitting.
 
+    With ``step_id`` only that step is validated, and with ``fields`` only
+    those fields, so the form can be checked live as the user edits it.
+    Errors are returned for the validated fields only.
+
     Args:
         form_id: Form identifier
-        request: Validation request with form data
+        request: Validation request with form data, and optionally the step or fields to validate
         db: Database session
 
     Returns:
         Validation result with any errors
 
     Raises:
-        HTTPException: 404 if form not found
+        HTTPException: 400 if the step or fields are not in the form, 404 if form not found
     """
-    async def _get_sql_form():
-        if db is None:
-            return None
-        result = await db.execute(select(Form).where(Form.form_id == form_id))
-        return result.scalar_one_or_none()
-    
-    # Try SQL database first
-    form = None
-    form_schema_data = None
+    # Validate form data with the compiled schema of this form version
+    validator = await _get_form_validator(form_id, db)
     try:
-        form = await _get_sql_form()
-        if form:
-            form_schema_data = form.schema_data
-    except Exception as e:
-        print(f"⚠️  SQL database error, using JSON fallback: {e}")
-    
-    # Fallback to JSON database
-    if not form_schema_data:
-        await initialize_default_data()
-        json_form = await json_get_form_by_id(form_id)
-        if not json_form:
-            raise HTTPException(status_code=404, detail=f"Form not found: {form_id}")
-        form_schema_data = json_form.get("schemaData", {})
-    
-    # Validate form data
-    is_valid, errors = validate_form_data(form_schema_data, request.data)
+        is_valid, errors = validator.validate(request.data, step_id=request.step_id, fields=request.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return SubmissionValidateResponse(valid=is_valid, errors=errors)
 
 
+@router.post("/forms/{form_id}/validate/batch")
+async def validate_submission_batch(
+    form_id: str,
+    request: SubmissionBatchValidateRequest,
+    db: Optional[AsyncSession] = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Validate many submissions for one form, e.g. before a bulk import.
+
+    The form is resolved and its schema compiled once for the whole batch.
+    Large batches are validated in a process pool. Results are streamed as
+    NDJSON, one line per item in request order:
+    ``{"index": 0, "valid": false, "errors": [...]}``.
+
+    Args:
+        form_id: Form identifier
+        request: Batch of form data payloads (each organized by step)
+        db: Database session
+
+    Returns:
+        Streaming NDJSON response
+
+    Raises:
+        HTTPException: 404 if form not found
+    """
+    validator = await _get_form_validator(form_id, db)
+
+    def _render_results():
+        for index, (is_valid, errors) in enumerate(validate_batch(validator, request.items)):
+            yield json.dumps({
+                "index": index,
+                "valid": is_valid,
+                "errors": [error.model_dump() for error in errors],
+            }, ensure_ascii=False) + "\n"
+
+    # A plain iterator: Starlette runs it in a worker thread, off the event loop
+    return StreamingResponse(_render_results(), media_type="application/x-ndjson")
+
+
 @router.post("/forms/{form_id}/submit", response_model=SubmissionCreateResponse, status_code=201)
 async def submit_form(
     form_id: str,
@@ -111,32 +177,9 @@ async def submit_form(
     Raises:
         HTTPException: 400 if validation fails, 404 if form not found
     """
-    async def _get_sql_form():
-        if db is None:
-            return None
-        result = await db.execute(select(Form).where(Form.form_id == form_id))
-        return result.scalar_one_or_none()
-    
-    # Try SQL database first
-    form = None
-    form_schema_data = None
-    try:
-        form = await _get_sql_form()
-        if form:
-            form_schema_data = form.schema_data
-    except Exception as e:
-        print(f"⚠️  SQL database error, using JSON fallback: {e}")
-    
-    # Fallback to JSON database
-    if not form_schema_data:
-        await initialize_default_data()
-        json_form = await json_get_form_by_id(form_id)
-        if not json_form:
-            raise HTTPException(status_code=404, detail=f"Form not found: {form_id}")
-        form_schema_data = json_form.get("schemaData", {})
-    
-    # Validate form data
-    is_valid, errors = validate_form_data(form_schema_data, request.data)
+    # Validate form data with the compiled schema of this form version
+    validator = await _get_form_validator(form_id, db)
+    is_valid, errors = validator.validate(request.data)
 
     if not is_valid:
         raise HTTPException(
@@ -147,8 +190,8 @@ async def submit_form(
     # Get user ID from authentication
     user_id = current_user.get("userId") if current_user else None
     
-    # Generate submission ID
-    submission_id = generate_submission_id()
+    # Generate submission ID (from the counter of the store it will be saved in)
+    submission_id = await generate_submission_id(sql=db is not None)
 
     # If no database connection, use JSON immediately
     if db is None:
@@ -205,6 +248,8 @@ async def submit_form(
         )
     except Exception as e:
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
+        # Number the JSON record from the JSON store's counter
+        submission_id = await generate_submission_id()
     
     # Fallback to JSON database
     # Extract files from submittedData (step-4-documents) and store in files array
@@ -288,7 +333,6 @@ async def save_draft(
     
     # Fallback to JSON database
     if not form:
-        await initialize_default_data()
         json_form = await json_get_form_by_id(form_id)
         if not json_form:
             raise HTTPException(status_code=404, detail=f"Form not found: {form_id}")
@@ -296,8 +340,8 @@ async def save_draft(
     # Get user ID from authentication
     user_id = current_user.get("userId") if current_user else None
     
-    # Generate submission ID
-    submission_id = generate_submission_id()
+    # Generate submission ID (from the counter of the store it will be saved in)
+    submission_id = await generate_submission_id(sql=db is not None)
 
     # If no database connection, use JSON immediately
     if db is None:
@@ -349,6 +393,7 @@ async def save_draft(
             submitted_at=None,
             created_at=datetime.fromisoformat(created_at_str.replace("Z", "+00:00")),
             updated_at=datetime.fromisoformat(updated_at_str.replace("Z", "+00:00")),
+            revision=json_submission.get("revision", 0),
         )
 
     # Try SQL database first
@@ -371,6 +416,8 @@ async def save_draft(
         return SubmissionResponse.model_validate(submission)
     except Exception as e:
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
+        # Number the JSON record from the JSON store's counter
+        submission_id = await generate_submission_id()
     
     # Fallback to JSON database
     submission_data = {
@@ -400,6 +447,7 @@ async def save_draft(
         submitted_at=None,
         created_at=datetime.fromisoformat(created_at_str.replace("Z", "+00:00")),
         updated_at=datetime.fromisoformat(updated_at_str.replace("Z", "+00:00")),
+        revision=json_submission.get("revision", 0),
     )
 
 
@@ -409,21 +457,33 @@ async def update_draft(
     request: SubmissionDraft,
     db: Optional[AsyncSession] = Depends(get_db),
     current_user: Optional[dict] = Depends(get_current_user),
+    if_match: Optional[str] = Header(None, alias="If-Match"),
 ) -> SubmissionResponse:
     """
     Update existing draft submission.
 
+    Send the revision last read (If-Match, or ``revision`` in the body) to
+    have the save rejected if the submission changed since.
+
     Args:
         submission_id: Submission identifier
         request: Draft request with updated form data
         db: Database session
+        if_match: Revision the client last read
 
     Returns:
         Updated draft submission response
 
     Raises:
         HTTPException: 404 if submission not found, 400 if submission is not a draft
+            or If-Match is malformed, 409 if the submission changed since the
+            client's revision
     """
+    try:
+        expected_revision = client_revision(if_match, request.revision)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     async def _get_sql_submission():
         if db is None:
             return None
@@ -444,7 +504,6 @@ async def update_draft(
     
     # Fallback to JSON database
     if not submission:
-        await initialize_default_data()
         json_submission = await json_get_submission_by_id(submission_id)
         if not json_submission:
             raise HTTPException(status_code=404, detail=f"Submission not found: {submission_id}")
@@ -465,8 +524,7 @@ async def update_draft(
             )
         
         # Update submission data - includes ALL steps including Step 5
-        json_submission["submittedData"] = request.data
-        json_submission["updatedAt"] = datetime.utcnow().isoformat() + "Z"
+        changes = {"submittedData": request.data}
         
         # Extract files from submittedData (step-4-documents) and store in files array
         files_list = []
@@ -487,12 +545,21 @@ async def update_draft(
             files_list.extend(request.files)
         
         # Update files array
-        json_submission["files"] = files_list
+        changes["files"] = files_list
         # Preserve submittedBy if it exists, otherwise set it
         if not json_submission.get("submittedBy") and user_id:
-            json_submission["submittedBy"] = user_id
+            changes["submittedBy"] = user_id
         
-        updated_submission = await json_update_submission(submission_id, json_submission)
+        # Reject the save if the submission changed since the client (or, without
+        # a client revision, this request) read it
+        if expected_revision is None:
+            expected_revision = json_submission.get("revision", 0)
+        try:
+            updated_submission = await json_update_submission(
+                submission_id, changes, expected_revision=expected_revision
+            )
+        except RevisionConflictError as e:
+            raise HTTPException(status_code=409, detail=str(e))
         
         # Convert to SubmissionResponse format - use actual field names, not serialization aliases
         created_at_str = updated_submission.get("createdAt", datetime.utcnow().isoformat() + "Z")
@@ -509,6 +576,7 @@ async def update_draft(
             submitted_at=datetime.fromisoformat(submitted_at_str.replace("Z", "+00:00")) if submitted_at_str else None,
             created_at=datetime.fromisoformat(created_at_str.replace("Z", "+00:00")),
             updated_at=datetime.fromisoformat(updated_at_str.replace("Z", "+00:00")),
+            revision=updated_submission.get("revision", 0),
         )
     
     # Allow updating drafts and rejected submissions (for resubmission)
@@ -533,28 +601,48 @@ async def update_draft(
 
 @router.get("/submissions", response_model=list[SubmissionResponse])
 async def list_submissions(
+    response: Response,
     form_id: Optional[str] = None,
     status: Optional[str] = None,
-    page: int = 1,
-    page_size: int = 20,
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Optional[AsyncSession] = Depends(get_db),
     current_user: Optional[dict] = Depends(get_current_user),
 ) -> list[SubmissionResponse]:
     """
-    List user's submissions.
+    List user's submissions, ordered by creation time.
+
+    Pages are cut on (createdAt, id). The cursor for the next page is returned
+    in the X-Next-Cursor header (absent on the last page); pass it back as
+    ``cursor`` to continue. ``page`` is still accepted for older clients.
+    A cursor is continued by the database that issued it.
 
     Args:
         form_id: Filter by form ID
         status: Filter by status
-        page: Page number
+        page: Page number (ignored when a cursor is given)
         page_size: Page size
+        cursor: Cursor from the previous page's X-Next-Cursor header
+        include_total: Also return the number of matches in X-Total-Count
         db: Database session
 
     Returns:
         List of submissions
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed, 503 if it was issued
+            by the SQL database and that is unavailable
     """
+    try:
+        issuer, after = read_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    offset = 0 if after else (page - 1) * page_size
+
     async def _get_sql_submissions():
-        if db is None:
+        if db is None or issuer == "json":
             return None
         # Build query
         query = select(FormSubmission)
@@ -567,16 +655,38 @@ async def list_submissions(
 
         # TODO: Filter by current user (from authentication)
 
-        # Execute query
+        total = None
+        if include_total:
+            total = await db.scalar(select(func.count()).select_from(query.subquery()))
+
+        # Keyset: continue strictly after the cursor's (created_at, id)
+        if after:
+            after_created_at = datetime.fromisoformat(after[0].replace("Z", "+00:00"))
+            after_id = uuid.UUID(after[1])
+            query = query.where(
+                or_(
+                    FormSubmission.created_at > after_created_at,
+                    and_(FormSubmission.created_at == after_created_at, FormSubmission.id > after_id),
+                )
+            )
+
+        # Fetch one extra row to know whether another page follows
+        query = (
+            query.order_by(FormSubmission.created_at, FormSubmission.id)
+            .offset(offset)
+            .limit(page_size + 1)
+        )
         result = await db.execute(query)
         submissions = result.scalars().all()
 
-        # Pagination
-        start = (page - 1) * page_size
-        end = start + page_size
-        paginated_submissions = submissions[start:end]
+        if len(submissions) > page_size:
+            submissions = submissions[:page_size]
+            last = submissions[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor("sql", last.created_at.isoformat(), str(last.id))
+        if total is not None:
+            response.headers["X-Total-Count"] = str(total)
 
-        return [SubmissionResponse.model_validate(sub) for sub in paginated_submissions]
+        return [SubmissionResponse.model_validate(sub) for sub in submissions]
     
     # Try SQL database first
     try:
@@ -585,26 +695,30 @@ async def list_submissions(
             return result
     except Exception as e:
         print(f"⚠️  SQL database error, using JSON fallback: {e}")
+    if issuer == "sql":
+        raise HTTPException(status_code=503, detail=SQL_CURSOR_UNAVAILABLE)
     
     # Get user ID from authentication
     user_id = current_user.get("userId") if current_user else None
     
     # Fallback to JSON database
-    await initialize_default_data()
-    json_submissions = await json_get_submissions(form_id=form_id, user_id=user_id)
-    
-    # Apply status filter
-    if status:
-        json_submissions = [s for s in json_submissions if s.get("status") == status]
-    
-    # Pagination
-    start = (page - 1) * page_size
-    end = start + page_size
-    paginated_submissions = json_submissions[start:end]
+    json_page = await json_get_submissions_page(
+        form_id=form_id,
+        user_id=user_id,
+        status=status,
+        limit=page_size,
+        after=after,
+        offset=offset,
+        with_total=include_total,
+    )
+    if json_page["next"] is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor("json", *json_page["next"])
+    if json_page["total"] is not None:
+        response.headers["X-Total-Count"] = str(json_page["total"])
     
     # Convert to SubmissionResponse format
     result_submissions = []
-    for sub in paginated_submissions:
+    for sub in json_page["items"]:
         try:
             # Convert to SubmissionResponse format - use actual field names, not serialization aliases
             created_at_str = sub.get("createdAt", datetime.utcnow().isoformat() + "Z")
@@ -621,6 +735,7 @@ async def list_submissions(
                 submitted_at=datetime.fromisoformat(submitted_at_str.replace("Z", "+00:00")) if submitted_at_str else None,
                 created_at=datetime.fromisoformat(created_at_str.replace("Z", "+00:00")),
                 updated_at=datetime.fromisoformat(updated_at_str.replace("Z", "+00:00")),
+                revision=sub.get("revision", 0),
             )
             result_submissions.append(submission_response)
         except Exception as e:
@@ -669,7 +784,6 @@ async def get_submission(
     
     # Fallback to JSON database
     if not submission:
-        await initialize_default_data()
         json_submission = await json_get_submission_by_id(submission_id)
         if not json_submission:
             raise HTTPException(status_code=404, detail=f"Submission not found: {submission_id}")
@@ -699,6 +813,7 @@ async def get_submission(
             submitted_at=datetime.fromisoformat(submitted_at_str.replace("Z", "+00:00")) if submitted_at_str else None,
             created_at=datetime.fromisoformat(created_at_str.replace("Z", "+00:00")),
             updated_at=datetime.fromisoformat(updated_at_str.replace("Z", "+00:00")),
+            revision=json_submission.get("revision", 0),
         )
     
     # TODO: Check authorization (user can only view their own submissions)
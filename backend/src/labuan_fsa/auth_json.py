@@ -12,6 +12,8 @@ from typing import Optional, Dict, Any
 import asyncio
 from functools import wraps
 
+from labuan_fsa.file_lock import async_interprocess_lock
+
 # Paths to JSON auth files
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -23,13 +25,24 @@ SESSIONS_PATH = DATA_DIR / "sessions.json"
 # Lock for file operations
 _auth_lock = asyncio.Lock()
 
+# Lock file shared with the other worker processes
+AUTH_LOCK_PATH = DATA_DIR / "auth.lock"
+
 
 def async_auth_operation(func):
-    """Decorator to ensure thread-safe auth file operations."""
+    """
+    Decorator to ensure thread-safe auth file operations.
+
+    The asyncio lock serializes operations within this process; the file lock
+    serializes them across worker processes, so no worker reads an auth file
+    while another one is rewriting it. The file lock is waited for off the
+    event loop.
+    """
     @wraps(func)
     async def wrapper(*args, **kwargs):
         async with _auth_lock:
-            return await func(*args, **kwargs)
+            async with async_interprocess_lock(AUTH_LOCK_PATH):
+                return await func(*args, **kwargs)
     return wrapper
 
 
@@ -306,7 +319,6 @@ async def update_user(user_id: str, name: Optional[str] = None, email: Optional[
     return None
 
 
-@async_auth_operation
 async def update_user_profile(user_id: str, name: Optional[str] = None, email: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """Update user's own profile (name and email only)."""
     return await update_user(user_id, name=name, email=email)
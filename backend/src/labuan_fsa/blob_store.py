@@ -0,0 +1,497 @@
+"""
+Content-addressed blob store for uploaded files.
+
+Uploads are stored once per distinct content, under
+``<storage.local_path>/blobs/<first two hex digits>/<sha256>``. The same
+document uploaded by many applicants is kept on disk once; each upload only
+adds a metadata record (files.json / FileUpload) pointing at the blob.
+
+Blobs carry no reference count of their own: the metadata records that
+point at a blob are its references, and the caller reclaims the blob once
+the last of them is gone (see ``reclaim_blob``). An upload that reuses a
+stored blob keeps its own copy until its record exists (see
+``settle_blob``), so a delete racing with it cannot leave the new record
+pointing at a missing file.
+
+Large files can also arrive as a resumable multipart upload: the parts are
+staged under ``<storage.local_path>/multipart/<upload_id>/``, each stored
+as ``<number>-<sha256>.part`` once it is complete and matches its checksum,
+and are streamed into a blob in order when the upload is completed. A
+dropped connection costs only the part in flight.
+
+The coroutines do their disk I/O in worker threads; the plain functions
+touch the disk directly, so coroutines call them with ``asyncio.to_thread``.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Optional
+from uuid import uuid4
+
+from labuan_fsa.config import get_settings
+
+settings = get_settings()
+
+# Uploads are read, hashed and written this many bytes at a time
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+# Staged multipart uploads untouched for this long are removed
+MULTIPART_EXPIRY_SECONDS = 24 * 60 * 60
+MAX_PARTS = 10000
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+_PART_NAME = re.compile(r"^(\d{5})-([0-9a-f]{64})\.part$")
+
+
+class BlobTooLargeError(ValueError):
+    """Raised when an upload exceeds the maximum size while it is being stored."""
+
+
+class MultipartUploadError(ValueError):
+    """Raised when a multipart upload, or one of its parts, is invalid."""
+
+
+class MultipartUploadNotFoundError(MultipartUploadError):
+    """Raised when a multipart upload does not exist (never started, completed or expired)."""
+
+
+def blob_root() -> Path:
+    """Return the directory that holds the blobs."""
+    return Path(settings.storage.local_path) / "blobs"
+
+
+def blob_path(file_hash: str) -> Path:
+    """Return where the blob with SHA-256 ``file_hash`` is stored."""
+    return blob_root() / file_hash[:2] / file_hash
+
+
+async def _read_chunks(source: Any) -> AsyncIterator[bytes]:
+    """Yield an upload's content UPLOAD_CHUNK_SIZE bytes at a time."""
+    while chunk := await source.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
+def _too_large(max_size: int) -> BlobTooLargeError:
+    return BlobTooLargeError(f"File size exceeds maximum allowed size of {max_size / 1024 / 1024:.1f}MB")
+
+
+async def _write_chunks(
+    chunks: AsyncIterator[bytes],
+    path: Path,
+    max_size: int,
+    check: Optional[Callable[[int], None]] = None,
+) -> tuple[int, str]:
+    """
+    Write ``chunks`` to ``path``, hashing them on the way.
+
+    Hashing, writing and ``check`` run in a worker thread, so the event loop
+    only waits for the chunks to arrive. ``check``, if given, is called with
+    the bytes written so far after every UPLOAD_CHUNK_SIZE bytes, and may
+    raise to abandon the write.
+
+    Returns:
+        Tuple of (size, sha256 hex digest)
+
+    Raises:
+        BlobTooLargeError: As soon as more than ``max_size`` bytes arrive
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    checked = 0
+
+    def write(f: BinaryIO, chunk: bytes, checked_size: Optional[int]) -> None:
+        sha256.update(chunk)
+        f.write(chunk)
+        if checked_size is not None:
+            check(checked_size)
+
+    f = await asyncio.to_thread(open, path, 'wb')
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_size:
+                raise _too_large(max_size)
+            checked_size = None
+            if check is not None and size - checked >= UPLOAD_CHUNK_SIZE:
+                checked = checked_size = size
+            await asyncio.to_thread(write, f, chunk, checked_size)
+    finally:
+        f.close()
+    if check is not None:
+        await asyncio.to_thread(check, size)
+    return size, sha256.hexdigest()
+
+
+async def store_blob(source: Any, max_size: int) -> tuple[str, int, str, Optional[str]]:
+    """
+    Stream an upload into the blob store in a single pass.
+
+    The upload is read in UPLOAD_CHUNK_SIZE chunks; each chunk updates the
+    SHA-256 and is written to a temporary file, so memory stays bounded by
+    the chunk size whatever the file size. Once the hash is known, the
+    temporary file either becomes the blob or, if a blob with that content
+    is already stored, is kept as a spare copy without touching the
+    existing one.
+
+    Once the upload is recorded, the caller must pass the spare to
+    ``settle_blob``, which restores the blob from it if a concurrent delete
+    reclaimed the blob meanwhile, and then drops it.
+
+    Args:
+        source: Upload to read, with an async ``read(size)`` (e.g. a FastAPI UploadFile)
+        max_size: Maximum size in bytes; larger uploads are abandoned early
+
+    Returns:
+        Tuple of (blob_path, file_size, file_hash, spare), where ``spare`` is
+        the path of the spare copy when identical content was already
+        stored, else None
+
+    Raises:
+        BlobTooLargeError: If the upload exceeds ``max_size``
+    """
+    return await _store_chunks(_read_chunks(source), max_size)
+
+
+async def _store_chunks(chunks: AsyncIterator[bytes], max_size: int) -> tuple[str, int, str, Optional[str]]:
+    root = blob_root()
+    await asyncio.to_thread(root.mkdir, parents=True, exist_ok=True)
+    temp_path = root / f".{uuid4().hex}.part"
+
+    try:
+        file_size, file_hash = await _write_chunks(chunks, temp_path, max_size)
+        path = blob_path(file_hash)
+        if not await asyncio.to_thread(_place_blob, temp_path, path):
+            print(f"♻️  Reusing stored blob {file_hash[:12]} ({file_size} bytes)")
+            return str(path.absolute()), file_size, file_hash, str(temp_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    return str(path.absolute()), file_size, file_hash, None
+
+
+def _place_blob(temp_path: Path, path: Path) -> bool:
+    """Move a written upload to blob ``path``; False (leaving it) if that blob is stored already."""
+    if path.exists():
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temp_path, path)
+    return True
+
+
+def settle_blob(file_path: str, spare: Optional[str]) -> None:
+    """
+    Finish an upload that reused a stored blob, once its record exists.
+
+    If a concurrent delete reclaimed the blob before the record was
+    visible, the blob is restored from the upload's spare copy (identical
+    content); either way the spare is then removed. Does nothing when the
+    upload created the blob itself (``spare`` is None).
+
+    This touches the disk: coroutines run it with ``asyncio.to_thread``.
+    """
+    if spare is None:
+        return
+    try:
+        # Linking never replaces a blob that is (still, or again) in place
+        os.link(spare, file_path)
+        print(f"♻️  Restored blob {Path(file_path).name[:12]} reclaimed during upload")
+    except FileExistsError:
+        pass
+    finally:
+        Path(spare).unlink(missing_ok=True)
+
+
+async def reclaim_blob(file_path: str, count_references: Callable[[], Awaitable[int]]) -> None:
+    """
+    Delete a stored file once no metadata record references it.
+
+    The file is first moved aside and the references are counted again: an
+    upload that reused it and was recorded meanwhile gets it put back (its
+    own ``settle_blob`` covers the case where it checks while the file is
+    moved aside). No lock is held across the awaits.
+
+    Also handles files stored before the blob store (``{field}_{id}.ext``
+    in the upload directory), which always have a single reference.
+
+    The file operations run in a worker thread.
+
+    Args:
+        file_path: Stored file
+        count_references: Returns how many records reference ``file_path``,
+            in every store that may hold them
+    """
+    if await count_references():
+        return
+    path = Path(file_path)
+    reclaimed = path.with_name(f".{path.name}.{uuid4().hex}.reclaim")
+    try:
+        await asyncio.to_thread(os.replace, path, reclaimed)
+    except FileNotFoundError:
+        return
+    try:
+        if await count_references():
+            await asyncio.to_thread(_restore_blob, reclaimed, path)
+    finally:
+        await asyncio.to_thread(reclaimed.unlink, missing_ok=True)
+
+
+def _restore_blob(reclaimed: Path, path: Path) -> None:
+    """Put a blob moved aside by ``reclaim_blob`` back in place."""
+    try:
+        os.link(reclaimed, path)
+    except FileExistsError:  # Already restored by the upload
+        pass
+
+
+def multipart_root() -> Path:
+    """Return the directory that holds staged multipart uploads."""
+    return Path(settings.storage.local_path) / "multipart"
+
+
+def _staged_bytes(directory: Path, part_number: int, own: Path) -> int:
+    """
+    Count the bytes an upload has staged for parts other than ``part_number``.
+
+    Includes parts still arriving (their temporary files), so parallel part
+    uploads count against each other. ``own`` is the caller's temporary file.
+    """
+    total = 0
+    prefix = f"{part_number:05d}-"
+    temp_prefix = f".{part_number:05d}."
+    for path in directory.iterdir():
+        name = path.name
+        if name.startswith(prefix) or name.startswith(temp_prefix) or path == own:
+            continue
+        if _PART_NAME.match(name) or name.endswith(".tmp"):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:  # Renamed or removed meanwhile
+                continue
+    return total
+
+
+def _upload_dir(upload_id: str) -> Path:
+    """Return the staging directory of an upload, rejecting unknown or malformed IDs."""
+    directory = multipart_root() / upload_id
+    if not _UPLOAD_ID.match(upload_id) or not directory.is_dir():
+        raise MultipartUploadNotFoundError(f"Upload not found: {upload_id}")
+    return directory
+
+
+def _remove_expired_multipart() -> None:
+    """Remove staged uploads that have not received a part for MULTIPART_EXPIRY_SECONDS."""
+    root = multipart_root()
+    if not root.is_dir():
+        return
+    cutoff = time.time() - MULTIPART_EXPIRY_SECONDS
+    for directory in root.iterdir():
+        try:
+            if directory.is_dir() and directory.stat().st_mtime < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+                print(f"🗑️  Removed expired multipart upload {directory.name}")
+        except FileNotFoundError:
+            continue
+
+
+def create_multipart(metadata: dict[str, Any]) -> str:
+    """
+    Start a multipart upload.
+
+    Args:
+        metadata: Details to keep until the upload completes (file name, field name, ...)
+
+    Returns:
+        Upload ID
+    """
+    _remove_expired_multipart()
+    upload_id = uuid4().hex
+    directory = multipart_root() / upload_id
+    directory.mkdir(parents=True)
+    with open(directory / "upload.json", 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False)
+    return upload_id
+
+
+def read_multipart(upload_id: str) -> dict[str, Any]:
+    """
+    Return the metadata an upload was started with.
+
+    Raises:
+        MultipartUploadNotFoundError: If the upload does not exist
+    """
+    with open(_upload_dir(upload_id) / "upload.json", 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def store_part(
+    upload_id: str,
+    part_number: int,
+    chunks: AsyncIterator[bytes],
+    max_size: int,
+    checksum: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Stage one part of a multipart upload.
+
+    Parts may arrive in any order and in parallel; each is written to its own
+    temporary file and renamed into place only once it is complete and its
+    SHA-256 matches ``checksum`` (when given). Uploading a part again
+    replaces the earlier attempt.
+
+    ``max_size`` bounds the whole upload: a part is rejected as soon as it,
+    together with the upload's other staged parts (including parts still
+    arriving), would exceed it.
+
+    Returns:
+        Dictionary with partNumber, size and checksum
+
+    Raises:
+        MultipartUploadNotFoundError: If the upload does not exist (or was
+            completed or aborted while the part arrived)
+        MultipartUploadError: If the part number is out of range or the
+            checksum does not match
+        BlobTooLargeError: If the upload's staged parts would exceed ``max_size``
+    """
+    if not 1 <= part_number <= MAX_PARTS:
+        raise MultipartUploadError(f"Part number must be between 1 and {MAX_PARTS}")
+    directory = await asyncio.to_thread(_upload_dir, upload_id)
+
+    temp_path = directory / f".{part_number:05d}.{uuid4().hex}.tmp"
+
+    def check_total(size: int) -> None:
+        if _staged_bytes(directory, part_number, temp_path) + size > max_size:
+            raise _too_large(max_size)
+
+    try:
+        size, digest = await _write_chunks(chunks, temp_path, max_size, check_total)
+        if checksum and checksum.lower() != digest:
+            raise MultipartUploadError(f"Checksum mismatch for part {part_number}")
+        part_path = directory / f"{part_number:05d}-{digest}.part"
+        await asyncio.to_thread(_replace_part, temp_path, part_path)
+    except FileNotFoundError as e:
+        # The staging directory went away (completed, aborted or expired)
+        temp_path.unlink(missing_ok=True)
+        raise MultipartUploadNotFoundError(f"Upload not found: {upload_id}") from e
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return {"partNumber": part_number, "size": size, "checksum": digest}
+
+
+def _replace_part(temp_path: Path, part_path: Path) -> None:
+    """Move a received part into place, dropping earlier attempts at the same part."""
+    os.replace(temp_path, part_path)
+    for earlier in part_path.parent.glob(f"{part_path.name[:5]}-*.part"):
+        if earlier != part_path:
+            earlier.unlink(missing_ok=True)
+
+
+def list_parts(upload_id: str) -> list[dict[str, Any]]:
+    """
+    List the parts an upload has received so far, by part number.
+
+    Raises:
+        MultipartUploadNotFoundError: If the upload does not exist
+    """
+    return _list_parts(_upload_dir(upload_id))
+
+
+def _list_parts(directory: Path) -> list[dict[str, Any]]:
+    parts = []
+    for path in directory.iterdir():
+        match = _PART_NAME.match(path.name)
+        if match:
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:  # Replaced by a retry meanwhile
+                continue
+            parts.append({"partNumber": int(match.group(1)), "size": size, "checksum": match.group(2)})
+    parts.sort(key=lambda part: part["partNumber"])
+    return parts
+
+
+async def _read_parts(directory: Path, parts: list[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Yield the content of the staged parts in order, UPLOAD_CHUNK_SIZE bytes at a time."""
+    for part in parts:
+        path = directory / f"{part['partNumber']:05d}-{part['checksum']}.part"
+        # Read in a worker thread, like the parts were written
+        f = await asyncio.to_thread(open, path, 'rb')
+        try:
+            while chunk := await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE):
+                yield chunk
+        finally:
+            f.close()
+
+
+async def complete_multipart(
+    upload_id: str,
+    max_size: int,
+    expected_parts: Optional[list[dict[str, Any]]] = None,
+) -> tuple[str, int, str, Optional[str]]:
+    """
+    Assemble a multipart upload into the blob store and drop its staging area.
+
+    The parts must be numbered 1..N without gaps. When ``expected_parts``
+    (partNumber and checksum of each part, as the client sent them) is
+    given, the staged parts must match it exactly.
+
+    The staging directory is first claimed by renaming it, so concurrent
+    completes (or late parts) of the same upload find it gone instead of
+    reading parts mid-removal. If completing fails, the upload is put back
+    and can be resumed.
+
+    Returns:
+        Same as ``store_blob``
+
+    Raises:
+        MultipartUploadNotFoundError: If the upload does not exist
+        MultipartUploadError: If the upload is incomplete or does not match
+            ``expected_parts``
+        BlobTooLargeError: If the assembled file exceeds ``max_size``
+    """
+    directory = await asyncio.to_thread(_upload_dir, upload_id)
+    claimed = multipart_root() / f".{upload_id}.{uuid4().hex}.completing"
+    try:
+        await asyncio.to_thread(os.rename, directory, claimed)
+    except FileNotFoundError as e:
+        raise MultipartUploadNotFoundError(f"Upload not found: {upload_id}") from e
+
+    try:
+        parts = await asyncio.to_thread(_list_parts, claimed)
+        if not parts:
+            raise MultipartUploadError("No parts have been uploaded")
+        numbers = [part["partNumber"] for part in parts]
+        missing = sorted(set(range(1, numbers[-1] + 1)) - set(numbers))
+        if missing:
+            raise MultipartUploadError(f"Missing parts: {', '.join(map(str, missing))}")
+        if expected_parts is not None:
+            staged = [(part["partNumber"], part["checksum"]) for part in parts]
+            expected = sorted((part["partNumber"], str(part["checksum"]).lower()) for part in expected_parts)
+            if staged != expected:
+                raise MultipartUploadError("Uploaded parts do not match the parts listed")
+
+        result = await _store_chunks(_read_parts(claimed, parts), max_size)
+    except BaseException:
+        # Leave the upload resumable (or for abort_multipart to remove)
+        os.rename(claimed, directory)
+        raise
+    await asyncio.to_thread(shutil.rmtree, claimed, ignore_errors=True)
+    return result
+
+
+def abort_multipart(upload_id: str) -> None:
+    """
+    Discard a multipart upload and its staged parts.
+
+    Raises:
+        MultipartUploadNotFoundError: If the upload does not exist
+    """
+    shutil.rmtree(_upload_dir(upload_id), ignore_errors=True)
@@ -103,6 +103,9 @@ class StorageConfig(BaseSettings):
     azure_container: Optional[str] = None
     gcp_bucket: Optional[str] = None
     max_file_size: int = 10 * 1024 * 1024  # 10MB
+    # Resumable multipart uploads (/api/files/multipart) for large documents
+    multipart_part_size: int = 5 * 1024 * 1024  # 5MB, suggested to clients
+    max_multipart_file_size: int = 100 * 1024 * 1024  # 100MB
     allowed_extensions: list[str] = Field(
         default_factory=lambda: [
             ".pdf",
@@ -512,8 +512,18 @@ async def init_db() -> None:
                 
                 if existing_tables:
                     print(f"   ℹ️  Found {len(existing_tables)} existing tables: {', '.join(existing_tables[:5])}")
-                    # Tables exist, skip creation to avoid timeout
-                    print(f"   ✅ Tables already exist - skipping creation")
+                    # Tables exist - only create tables added since (e.g. submission_counts)
+                    missing_tables = [
+                        table for name, table in Base.metadata.tables.items()
+                        if name not in existing_tables
+                    ]
+                    if missing_tables:
+                        print(f"   ℹ️  Creating new tables: {', '.join(table.name for table in missing_tables)}")
+                        await conn.run_sync(
+                            lambda sync_conn: Base.metadata.create_all(sync_conn, tables=missing_tables)
+                        )
+                    else:
+                        print(f"   ✅ Tables already exist - skipping creation")
                 else:
                     # No tables exist, create them
                     print(f"   ℹ️  No tables found - creating tables...")
@@ -521,6 +531,11 @@ async def init_db() -> None:
             else:
                 # SQLite - always create
                 await conn.run_sync(Base.metadata.create_all)
+
+            # Count the submissions stored before submission_counts existed
+            from labuan_fsa.models.submission import seed_submission_counts
+            if await conn.run_sync(seed_submission_counts):
+                print(f"   ✅ Seeded submission counts")
             
         print(f"✅ Database tables created/verified successfully")
         print(f"   Tables in metadata: {list(Base.metadata.tables.keys())}")
@@ -0,0 +1,116 @@
+"""
+Inter-process file locks.
+
+Several uvicorn/gunicorn workers can share the same JSON data directory.
+The asyncio locks only serialize coroutines inside one worker, so writers
+also take an advisory ``flock`` on a sidecar ``.lock`` file.
+
+Coroutines take the lock with ``async_interprocess_lock``, which waits for a
+contended lock in a thread instead of blocking the event loop. Lock files
+are opened read-only when they exist (``flock`` does not need write
+access), and a lock file that cannot be opened or created, e.g. in a
+read-only deployment, leaves the block unlocked rather than failing it.
+
+On platforms without ``fcntl`` (Windows) the lock is a no-op, which keeps
+single-process development working unchanged.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import AsyncIterator, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# Lock files already reported as unusable (reported once per process)
+_unusable: set[Path] = set()
+
+
+def _open_lock_file(path: Path) -> Optional[int]:
+    """Open ``path`` for locking, creating it if missing; None if that is not possible."""
+    try:
+        return os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        return _unlocked(path, e)
+    try:
+        return os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+    except OSError as e:
+        return _unlocked(path, e)
+
+
+def _unlocked(path: Path, error: OSError) -> None:
+    if path not in _unusable:
+        _unusable.add(path)
+        print(f"⚠️  Cannot open lock file {path.name} ({error}), continuing without inter-process locking")
+    return None
+
+
+@contextmanager
+def interprocess_lock(path: Path, shared: bool = False, blocking: bool = True) -> Iterator[None]:
+    """
+    Hold an advisory lock on ``path`` for the duration of the block.
+
+    Args:
+        path: Lock file, created if missing
+        shared: Take a shared (reader) lock instead of an exclusive one
+        blocking: Wait for the lock; otherwise raise BlockingIOError if it is held
+
+    Raises:
+        BlockingIOError: If ``blocking`` is False and another process holds the lock
+    """
+    fd = _open_lock_file(path) if fcntl is not None else None
+    if fd is None:
+        yield
+        return
+
+    try:
+        mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        fcntl.flock(fd, mode if blocking else mode | fcntl.LOCK_NB)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+@asynccontextmanager
+async def async_interprocess_lock(path: Path, shared: bool = False) -> AsyncIterator[None]:
+    """
+    Hold an advisory lock on ``path``, waiting for it without blocking the event loop.
+
+    An uncontended lock is taken directly; a contended one is waited for in a
+    worker thread.
+
+    Args:
+        path: Lock file, created if missing
+        shared: Take a shared (reader) lock instead of an exclusive one
+    """
+    fd = _open_lock_file(path) if fcntl is not None else None
+    if fd is None:
+        yield
+        return
+
+    mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+    try:
+        fcntl.flock(fd, mode | fcntl.LOCK_NB)
+    except BlockingIOError:
+        waiter = asyncio.ensure_future(asyncio.to_thread(fcntl.flock, fd, mode))
+        try:
+            await asyncio.shield(waiter)
+        except BaseException:
+            # The thread may still be waiting on the descriptor: close it once it is done
+            waiter.add_done_callback(lambda _: os.close(fd))
+            raise
+    except BaseException:
+        os.close(fd)
+        raise
+    try:
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
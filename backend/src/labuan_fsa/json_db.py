@@ -8,15 +8,28 @@ This is a workaround for connection issues and allows the application to
 function with local file storage.
 """
 
+import bisect
+import copy
+import hashlib
+import itertools
 import json
+import os
 import uuid
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
 import asyncio
+from contextlib import ExitStack, asynccontextmanager, contextmanager
 from functools import wraps
 
+from labuan_fsa.file_lock import async_interprocess_lock, interprocess_lock
+
+try:
+    import orjson
+except ImportError:  # Optional: faster snapshot parsing and compact writes
+    orjson = None
+
 # Paths to JSON database files (separate files for each entity)
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -24,24 +37,129 @@ DATA_DIR.mkdir(parents=True, exist_ok=True)
 FORMS_DB_PATH = DATA_DIR / "forms.json"
 SUBMISSIONS_DB_PATH = DATA_DIR / "submissions.json"
 USERS_DB_PATH = DATA_DIR / "users.json"
+FILES_DB_PATH = DATA_DIR / "files.json"
+COUNTERS_DB_PATH = DATA_DIR / "counters.json"
 
 # Legacy path for backward compatibility
 DB_PATH = DATA_DIR / "database.json"
 
-# Lock for file operations
-_file_lock = asyncio.Lock()
+# Written once database.json has been migrated and the default data seeded
+MIGRATION_MARKER_PATH = DATA_DIR / "json_db.migrated.json"
 
 # Maximum file size before splitting (800KB - stay under 1MB GitHub limit)
 MAX_FILE_SIZE = 800 * 1024
 
+# Snapshot format: "json" (indented, the historical layout) or "compact"
+# (minified, written with orjson when installed). Both are plain JSON with the
+# same structure and file names, so any reader handles either. When unset,
+# saves keep the format the snapshot already has.
+SNAPSHOT_FORMATS = ("json", "compact")
+SNAPSHOT_FORMAT = os.getenv("JSON_DB_SNAPSHOT_FORMAT") or None
+
+# Separator between records inside a chunk's items array, per format
+_ITEM_SEPARATORS = {"json": b",\n    ", "compact": b","}
+
+# Write-ahead logs are folded into the snapshot once they outgrow it
+# (and this floor), so snapshot rewrites stay amortized O(1) per mutation
+WAL_MIN_COMPACT_SIZE = 256 * 1024
+
+
+class RevisionConflictError(ValueError):
+    """Raised when a record changed since the revision the caller last read."""
+
+
+class DuplicateKeyError(ValueError):
+    """Raised when inserting a record whose primary key is already taken."""
+
+
+class _LockBusy(Exception):
+    """Raised when a read needs the inter-process lock and another process holds it."""
+
+
+class _ReadWriteLock:
+    """Asyncio lock admitting many readers or a single writer. Waiting writers go first."""
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[None]:
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[None]:
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writer and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+def _reads(collection: "_JsonCollection"):
+    """
+    Decorator running an operation under the collection's shared lock.
+
+    Reads take the inter-process lock only when they (re)load the snapshot,
+    and never wait for it on the event loop: if another process holds it
+    (e.g. while compacting), the read is retried once the lock has been
+    taken off the loop.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with collection.lock.read():
+                try:
+                    return await func(*args, **kwargs)
+                except _LockBusy:
+                    pass
+                async with collection.shared():
+                    return await func(*args, **kwargs)
+        return wrapper
+    return decorator
 
-def async_file_operation(func):
-    """Decorator to ensure thread-safe file operations."""
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        async with _file_lock:
-            return await func(*args, **kwargs)
-    return wrapper
+
+def _writes(collection: "_JsonCollection"):
+    """
+    Decorator running an operation under the collection's exclusive lock.
+
+    The lock only covers the in-memory change and the log append. The fsync
+    that makes the change durable happens after the lock is released, and is
+    shared with any other writers waiting on it.
+
+    The operation also holds the collection's inter-process lock (waited for
+    off the event loop), so writers in other worker processes are serialized
+    too. Operations must not await anything while holding it.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with collection.lock.write():
+                async with collection.locked():
+                    result = await func(*args, **kwargs)
+            await collection.sync()
+            return result
+        return wrapper
+    return decorator
 
 
 def _is_split_file(file_path: Path) -> bool:
@@ -55,11 +173,11 @@ def _get_split_file_paths(base_path: Path, max_chunks: int = 100) -> List[Path]:
     paths = []
     base_name = base_path.stem  # filename without extension
     parent_dir = base_path.parent
-    
+
     for i in range(max_chunks):
         split_path = parent_dir / f"{base_name}.{i}.json"
         paths.append(split_path)
-    
+
     return paths
 
 
@@ -67,7 +185,7 @@ def _merge_split_files(split_files: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Merge multiple split file chunks back into a single data structure."""
     if not split_files:
         return {}
-    
+
     if len(split_files) == 1:
         # Single chunk - remove chunk metadata
         chunk = split_files[0]
@@ -76,16 +194,16 @@ def _merge_split_files(split_files: List[Dict[str, Any]]) -> Dict[str, Any]:
             chunk.pop('chunkIndex', None)
             chunk.pop('totalChunks', None)
         return chunk
-    
+
     # Multiple chunks - merge items arrays
     # Sort by chunkIndex
     sorted_chunks = sorted(split_files, key=lambda x: x.get('chunkIndex', 0))
-    
+
     # Get metadata from first chunk
     merged = sorted_chunks[0].copy()
     merged.pop('chunkIndex', None)
     merged.pop('totalChunks', None)
-    
+
     # Merge items arrays
     if 'items' in merged and isinstance(merged['items'], list):
         all_items = []
@@ -93,21 +211,122 @@ def _merge_split_files(split_files: List[Dict[str, Any]]) -> Dict[str, Any]:
             if 'items' in chunk and isinstance(chunk['items'], list):
                 all_items.extend(chunk['items'])
         merged['items'] = all_items
-    
+
     return merged
 
 
+def _loads(data: bytes) -> Any:
+    """Parse JSON, with orjson when it is installed."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dumps_compact(value: Any) -> bytes:
+    """Serialize ``value`` as minified UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+def _manifest_path(file_path: Path) -> Path:
+    """Path of the manifest naming the current snapshot generation of ``file_path``."""
+    return file_path.with_name(f"{file_path.stem}.manifest.json")
+
+
+def _read_manifest(file_path: Path) -> Optional[Dict[str, Any]]:
+    """Read the snapshot manifest of ``file_path``, or ``None`` for legacy snapshots."""
+    try:
+        with open(_manifest_path(file_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, IOError) as e:
+        print(f"⚠️  Error loading manifest for {file_path.name}, probing split files: {e}")
+        return None
+
+
+def _open_chunk(directory: Path, name: str, staged: Dict[str, str]):
+    """Open a chunk of a committed generation, using its staged temp file if not yet renamed."""
+    if name in staged:
+        try:
+            return open(directory / staged[name], 'rb')
+        except FileNotFoundError:
+            pass
+    return open(directory / name, 'rb')
+
+
+def _load_chunk(file_path: Path, manifest: Dict[str, Any], chunk: Dict[str, Any]) -> list:
+    """Load the records of one chunk listed in a manifest."""
+    name = chunk["name"]
+    try:
+        with _open_chunk(file_path.parent, name, manifest.get("staged", {})) as f:
+            chunk_data = _loads(f.read())
+    except (json.JSONDecodeError, IOError) as e:
+        # Loading a partial collection would drop records on the next save
+        raise IOError(
+            f"Snapshot generation {manifest.get('generation')} of {file_path.name} "
+            f"has an unreadable chunk {name}: {e}"
+        ) from e
+
+    items = chunk_data.get("items", []) if isinstance(chunk_data, dict) else chunk_data
+    if len(items) != chunk["count"]:
+        raise IOError(
+            f"Snapshot generation {manifest.get('generation')} of {file_path.name}: "
+            f"chunk {name} holds {len(items)} records, manifest lists {chunk['count']}"
+        )
+    return items
+
+
+def _load_manifest_chunks(file_path: Path, manifest: Dict[str, Any]) -> list:
+    """Load every chunk listed in a manifest, in order."""
+    items = []
+    for chunk in manifest.get("chunks", []):
+        items.extend(_load_chunk(file_path, manifest, chunk))
+    return items
+
+
+def _load_key_directory(file_path: Path, manifest: Dict[str, Any]) -> Optional[Dict[str, Dict[str, int]]]:
+    """
+    Load the key -> chunk position directory of a manifest's generation.
+
+    Returns None when the directory is missing, unreadable or not the one the
+    manifest lists (its checksum differs), so callers fall back to a full load.
+    """
+    name = manifest["keys"]["name"]
+    try:
+        with _open_chunk(file_path.parent, name, manifest.get("staged", {})) as f:
+            content = f.read()
+        if "sha256:" + hashlib.sha256(content).hexdigest() != manifest["keys"].get("checksum"):
+            raise ValueError("checksum does not match the manifest")
+        directory = _loads(content)
+        if not isinstance(directory, dict):
+            raise ValueError("not a key directory")
+        return directory
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Error loading key directory {name}: {e}")
+        return None
+
+
+def _manifest_size(manifest: Dict[str, Any]) -> int:
+    """Total size in bytes of the chunks listed in a manifest."""
+    return sum(chunk.get("size", 0) for chunk in manifest.get("chunks", []))
+
+
 def _load_json_file(file_path: Path, default_value: list) -> list:
     """Load JSON array from file, handling both single files and split files."""
+    # Snapshots written with a manifest list exactly the chunks of one generation
+    manifest = _read_manifest(file_path)
+    if manifest is not None:
+        return _load_manifest_chunks(file_path, manifest)
+
     # Check for split files first (they take precedence if they exist)
     split_paths = _get_split_file_paths(file_path, max_chunks=100)
     split_files = []
-    
+
     for split_path in split_paths:
         if not split_path.exists():
             # Stop at first missing chunk
             break
-        
+
         try:
             with open(split_path, 'r', encoding='utf-8') as f:
                 chunk_data = json.load(f)
@@ -121,12 +340,12 @@ def _load_json_file(file_path: Path, default_value: list) -> list:
         except (json.JSONDecodeError, IOError) as e:
             print(f"⚠️  Error loading split file {split_path}: {e}")
             break
-    
+
     # If we found split files, prefer them (they're more complete/recent)
     if split_files:
         print(f"📦 Found {len(split_files)} split files for {file_path.name}, merging...")
         merged_data = _merge_split_files(split_files)
-        
+
         # Extract items array from merged data
         if isinstance(merged_data, list):
             return merged_data
@@ -136,7 +355,7 @@ def _load_json_file(file_path: Path, default_value: list) -> list:
             return merged_data["data"]
         else:
             return default_value.copy()
-    
+
     # If no split files, try to read the main file
     if file_path.exists():
         try:
@@ -154,107 +373,350 @@ def _load_json_file(file_path: Path, default_value: list) -> list:
         except (json.JSONDecodeError, IOError) as e:
             print(f"⚠️  Error loading JSON file {file_path}: {e}")
             return default_value.copy()
-    
+
     # No main file and no split files found
     return default_value.copy()
 
 
-def _estimate_json_size(data: Any) -> int:
-    """Estimate JSON string size in bytes."""
-    return len(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+def _encode_item(item: Any, fmt: str = "json") -> bytes:
+    """Serialize one record exactly as it appears inside a chunk's ``items`` array."""
+    if fmt == "compact":
+        return _dumps_compact(item)
+    return json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n    ").encode('utf-8')
 
 
-def _split_data_into_chunks(file_path: Path, data: list) -> List[Dict[str, Any]]:
-    """Split large data array into chunks if it exceeds MAX_FILE_SIZE."""
-    # Create file data structure
-    file_data = {
-        "version": "1.0.0",
-        "lastUpdated": datetime.utcnow().isoformat() + "Z",
-        "items": data
-    }
-    
-    # Check if file needs splitting
-    estimated_size = _estimate_json_size(file_data)
-    if estimated_size <= MAX_FILE_SIZE:
-        return [{"path": file_path, "data": file_data}]
-    
-    # Need to split - calculate items per chunk
-    if not data:
-        return [{"path": file_path, "data": file_data}]
-    
-    # Estimate size per item
-    sample_item = data[0]
-    item_size = _estimate_json_size(sample_item)
-    # Add metadata overhead (version, lastUpdated, items wrapper)
-    metadata_overhead = 200
-    items_per_chunk = max(1, (MAX_FILE_SIZE - metadata_overhead) // (item_size + 100))  # 100 bytes safety margin
-    
+def _render_chunk(
+    items: List[bytes],
+    last_updated: str,
+    chunk_index: Optional[int],
+    fmt: str = "json",
+    extra: Optional[Dict[str, Any]] = None,
+) -> bytes:
+    """
+    Assemble a chunk file from already encoded records.
+
+    In the "json" format the output is byte-for-byte what
+    ``json.dump(..., indent=2)`` writes for
+    ``{"version", "lastUpdated", "items"[, extra keys][, "chunkIndex"]}``;
+    "compact" writes the same object without whitespace.
+    """
+    separator = _ITEM_SEPARATORS[fmt]
+    if fmt == "compact":
+        head = f'{{"version":"1.0.0","lastUpdated":"{last_updated}","items":['.encode('utf-8')
+        middle = b"]" + b"".join(
+            b"," + _dumps_compact(key) + b":" + _dumps_compact(value) for key, value in (extra or {}).items()
+        )
+        tail = f',"chunkIndex":{chunk_index}}}' if chunk_index is not None else "}"
+        return head + separator.join(items) + middle + tail.encode('utf-8')
+
+    head = f'{{\n  "version": "1.0.0",\n  "lastUpdated": "{last_updated}",\n  "items": '.encode('utf-8')
+    body = b"[\n    " + separator.join(items) + b"\n  ]" if items else b"[]"
+    middle = "".join(
+        f',\n  {json.dumps(key, ensure_ascii=False)}: '
+        + json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        for key, value in (extra or {}).items()
+    ).encode('utf-8')
+    tail = f',\n  "chunkIndex": {chunk_index}\n}}' if chunk_index is not None else "\n}"
+    return head + body + middle + tail.encode('utf-8')
+
+
+# Top-level snapshot keys json_db manages itself; any other key is carried over as is
+_SNAPSHOT_KEYS = ("version", "lastUpdated", "items", "chunkIndex")
+
+
+def _snapshot_extra(file_path: Path) -> Dict[str, Any]:
+    """
+    Return the top-level keys of a snapshot that are not json_db's own.
+
+    Legacy snapshots may hold other data next to ``items`` (files.json has a
+    "files" array written by an older client); saving must not drop it. Once
+    a manifest exists, the keys are kept in it.
+    """
+    manifest = _read_manifest(file_path)
+    if manifest is not None:
+        return manifest.get("extra", {})
+    try:
+        with open(file_path, 'rb') as f:
+            data = _loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    # Snapshots without "items" keep their records under "data" (see _load_json_file)
+    own = _SNAPSHOT_KEYS if "items" in data else _SNAPSHOT_KEYS + ("data",)
+    return {key: value for key, value in data.items() if key not in own}
+
+
+def _split_data_into_chunks(
+    file_path: Path,
+    data: list,
+    previous: Optional[Dict[str, Any]] = None,
+    fmt: str = "json",
+    extra: Optional[Dict[str, Any]] = None,
+    key_field: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Pack records into chunks of at most MAX_FILE_SIZE bytes, in format ``fmt``.
+
+    ``extra`` top-level keys (see ``_snapshot_extra``) are written into the
+    first chunk.
+
+    Every record is serialized once, and its exact size decides where chunks
+    are cut. Cuts from the ``previous`` manifest are kept while the chunk
+    before them is at least half full. With a ``key_field``, the cuts are
+    anchored to the key of the record each previous chunk started with, so
+    editing, adding or deleting a record changes only the chunk holding it
+    (plus any chunk it overflows into), and new records only change the
+    last chunk. Manifests without those keys fall back to record positions.
+
+    Returns one dict per chunk with its ``path``, record ``count``, items
+    ``checksum``, file ``size`` and rendered ``content``. ``content`` is
+    ``None`` when the previous generation already has identical items at
+    that path.
+    """
+    encoded = [_encode_item(item, fmt) for item in data]
+    separator = _ITEM_SEPARATORS[fmt]
+    last_updated = datetime.utcnow().isoformat() + "Z"
+    budget = MAX_FILE_SIZE - len(_render_chunk([], last_updated, len(encoded), fmt, extra))
+
+    # Cut points of the previous generation: the keys its chunks started
+    # with, or else record positions
+    previous_chunks_list = (previous or {}).get("chunks", [])
+    cut_keys = set()
+    cuts = set()
+    if key_field and previous_chunks_list and all("first" in chunk for chunk in previous_chunks_list):
+        cut_keys = {chunk["first"] for chunk in previous_chunks_list[1:]}
+    else:
+        position = 0
+        for chunk in previous_chunks_list[:-1]:
+            position += chunk["count"]
+            cuts.add(position)
+
+    def _previous_cut(i: int) -> bool:
+        if cut_keys:
+            return _index_key(data[i].get(key_field)) in cut_keys
+        return i in cuts
+
+    # Greedily fill chunks, also cutting where the previous generation did
+    groups = []
+    start, size = 0, 0
+    for i, item in enumerate(encoded):
+        cost = len(item) + len(separator)
+        if i > start and (size + cost > budget or (size >= budget // 2 and _previous_cut(i))):
+            groups.append((start, i))
+            start, size = i, 0
+        size += cost
+    groups.append((start, len(encoded)))
+
+    previous_chunks = {}
+    if previous is not None and previous.get("format", "json") == fmt:
+        previous_chunks = {chunk["name"]: chunk for chunk in previous.get("chunks", [])}
     chunks = []
-    base_name = file_path.stem  # filename without extension
-    parent_dir = file_path.parent
-    
-    # Split items into chunks
-    for i in range(0, len(data), items_per_chunk):
-        chunk_items = data[i:i + items_per_chunk]
-        chunk_index = i // items_per_chunk
-        
-        chunk_path = parent_dir / f"{base_name}.{chunk_index}.json"
-        chunk_data = {
-            "version": file_data["version"],
-            "lastUpdated": file_data["lastUpdated"],
-            "items": chunk_items,
-            "chunkIndex": chunk_index,
-            "totalChunks": (len(data) + items_per_chunk - 1) // items_per_chunk,
-        }
-        
-        chunks.append({"path": chunk_path, "data": chunk_data})
-    
+    for chunk_index, (start, end) in enumerate(groups):
+        items = encoded[start:end]
+        if len(groups) == 1:
+            chunk_path, chunk_index = file_path, None
+        else:
+            chunk_path = file_path.parent / f"{file_path.stem}.{chunk_index}.json"
+        checksum = "sha256:" + hashlib.sha256(separator.join(items)).hexdigest()
+
+        old = previous_chunks.get(chunk_path.name)
+        if old is not None and old["count"] == len(items) and old["checksum"] == checksum:
+            content, size = None, old["size"]
+        else:
+            content = _render_chunk(items, last_updated, chunk_index, fmt, extra if not chunks else None)
+            size = len(content)
+        chunks.append({
+            "path": chunk_path,
+            "count": len(items),
+            "checksum": checksum,
+            "size": size,
+            "content": content,
+            "first": _index_key(data[start].get(key_field)) if key_field and end > start else None,
+        })
+
     return chunks
 
 
-def _save_json_file(file_path: Path, data: list) -> None:
-    """Save JSON array to file, automatically splitting if too large."""
+def _write_durably(path: Path, content: bytes) -> None:
+    """Write ``content`` to ``path`` and fsync it."""
+    with open(path, 'wb') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Make renames and unlinks in ``directory`` durable."""
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
     try:
-        # Check if we need to split
-        chunks = _split_data_into_chunks(file_path, data)
-        
-        if len(chunks) == 1:
-            # Single file - save normally
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(chunks[0]["data"], f, indent=2, ensure_ascii=False)
-            
-            # Delete old split files if they exist
-            split_paths = _get_split_file_paths(file_path, max_chunks=100)
-            for split_path in split_paths:
-                if split_path.exists():
-                    try:
-                        split_path.unlink()
-                    except Exception as e:
-                        print(f"⚠️  Error deleting old split file {split_path}: {e}")
-        else:
-            # Multiple chunks - save each chunk
-            for chunk in chunks:
-                with open(chunk["path"], 'w', encoding='utf-8') as f:
-                    json.dump(chunk["data"], f, indent=2, ensure_ascii=False)
-            
-            # Delete old main file if it exists
-            if file_path.exists():
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _finish_generation(directory: Path, manifest: Dict[str, Any]) -> None:
+    """
+    Complete a committed generation: rename its temp files to their final
+    chunk names and delete the files it retired. Safe to repeat.
+    """
+    for name, staged_name in manifest.get("staged", {}).items():
+        try:
+            os.replace(directory / staged_name, directory / name)
+        except FileNotFoundError:
+            # Already published
+            pass
+    for name in manifest.get("retired", []):
+        try:
+            (directory / name).unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️  Error deleting old snapshot file {name}: {e}")
+
+
+def _remove_abandoned_temp_files(file_path: Path, manifest: Dict[str, Any]) -> None:
+    """Delete temp files of generations that were never committed."""
+    prefix = f"{file_path.stem}."
+    keep = set(manifest["staged"].values())
+    with os.scandir(file_path.parent) as entries:
+        for entry in entries:
+            if entry.name.startswith(prefix) and entry.name.endswith(".tmp") and entry.name not in keep:
                 try:
-                    file_path.unlink()
-                except Exception as e:
-                    print(f"⚠️  Error deleting old main file {file_path}: {e}")
-            
-            # Delete any old split files beyond the new count
-            split_paths = _get_split_file_paths(file_path, max_chunks=100)
-            for i in range(len(chunks), len(split_paths)):
-                old_split_path = split_paths[i]
-                if old_split_path.exists():
-                    try:
-                        old_split_path.unlink()
-                    except Exception as e:
-                        print(f"⚠️  Error deleting old split file {old_split_path}: {e}")
-            
-            print(f"📦 Split {file_path.name} into {len(chunks)} chunks")
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def _keys_path(file_path: Path) -> Path:
+    """Path of the key directory sidecar of a split ``file_path``."""
+    return file_path.with_name(f"{file_path.stem}.keys.json")
+
+
+def _render_key_directory(data: list, chunks: List[Dict[str, Any]], key_fields: tuple) -> bytes:
+    """
+    Map every string value of ``key_fields`` to the position of the chunk
+    holding its record, keeping the first occurrence like a front-to-back scan.
+    """
+    directory: Dict[str, Dict[str, int]] = {field: {} for field in key_fields}
+    start = 0
+    for position, chunk in enumerate(chunks):
+        for item in data[start:start + chunk["count"]]:
+            for field in key_fields:
+                value = item.get(field)
+                if isinstance(value, str):
+                    directory[field].setdefault(value, position)
+        start += chunk["count"]
+    return _dumps_compact(directory)
+
+
+def _save_json_file(
+    file_path: Path,
+    data: list,
+    key_fields: tuple = (),
+    fmt: Optional[str] = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Save JSON array as a new snapshot generation, splitting it if too large.
+
+    Only chunks whose records changed are written. They go to fsynced temp
+    files first. Atomically replacing ``<name>.manifest.json`` commits the
+    generation, and only then are the temp files renamed over the chunk names
+    and superseded chunks deleted. Readers follow the manifest (and its staged
+    temp files), so they see one whole generation, and a crash at any point
+    leaves one complete generation on disk. The next save finishes whatever a
+    crash interrupted.
+
+    When the data is split and ``key_fields`` are given, a ``<name>.keys.json``
+    sidecar maps each of their values to its chunk, so a point lookup can
+    parse a single chunk. It is part of the generation like the chunks.
+
+    ``fmt`` picks the snapshot format; by default it is SNAPSHOT_FORMAT, or
+    else the format of the previous generation. Top-level keys other than
+    json_db's own are kept (``extra`` overrides them, e.g. for an export).
+
+    Returns the committed manifest.
+    """
+    try:
+        directory = file_path.parent
+        if extra is None:
+            extra = _snapshot_extra(file_path)
+        previous = _read_manifest(file_path)
+        if previous is not None:
+            _finish_generation(directory, previous)
+            existing = [chunk["name"] for chunk in previous.get("chunks", [])]
+            if "keys" in previous:
+                existing.append(previous["keys"]["name"])
+        else:
+            # Legacy snapshot: the main file and any split files may exist
+            existing = [
+                path.name
+                for path in [file_path] + _get_split_file_paths(file_path, max_chunks=100)
+                if path.exists()
+            ]
+        generation = (previous or {}).get("generation", 0) + 1
+        fmt = fmt or SNAPSHOT_FORMAT or (previous or {}).get("format", "json")
+        if fmt not in SNAPSHOT_FORMATS:
+            raise ValueError(f"Unknown snapshot format {fmt!r}, expected one of {SNAPSHOT_FORMATS}")
+
+        if previous is not None and previous.get("extra", {}) != extra:
+            previous = {**previous, "chunks": []}  # The first chunk must be rewritten with the new keys
+        key_field = key_fields[0] if key_fields else None
+        chunks = _split_data_into_chunks(file_path, data, previous, fmt, extra, key_field)
+        staged: Dict[str, str] = {}
+        for chunk in chunks:
+            if chunk["content"] is None:
+                continue
+            name = chunk["path"].name
+            staged[name] = f"{name}.{generation}.tmp"
+            _write_durably(directory / staged[name], chunk["content"])
+
+        names = [chunk["path"].name for chunk in chunks]
+        manifest = {
+            "version": "1.0.0",
+            "generation": generation,
+            "format": fmt,
+            "chunks": [
+                {
+                    "name": name,
+                    "count": chunk["count"],
+                    "size": chunk["size"],
+                    "checksum": chunk["checksum"],
+                    **({"first": chunk["first"]} if chunk["first"] is not None else {}),
+                }
+                for name, chunk in zip(names, chunks, strict=True)
+            ],
+        }
+        if extra:
+            manifest["extra"] = extra
+
+        if key_fields and len(chunks) > 1:
+            content = _render_key_directory(data, chunks, key_fields)
+            keys = {"name": _keys_path(file_path).name, "checksum": "sha256:" + hashlib.sha256(content).hexdigest()}
+            if (previous or {}).get("keys") != keys:
+                staged[keys["name"]] = f"{keys['name']}.{generation}.tmp"
+                _write_durably(directory / staged[keys["name"]], content)
+            manifest["keys"] = keys
+            names.append(keys["name"])
+
+        manifest["staged"] = staged
+        manifest["retired"] = [name for name in existing if name not in names]
+        manifest_path = _manifest_path(file_path)
+        manifest_tmp = manifest_path.with_name(f"{manifest_path.name}.tmp")
+        _write_durably(manifest_tmp, json.dumps(manifest, indent=2).encode('utf-8'))
+        os.replace(manifest_tmp, manifest_path)
+        _fsync_dir(directory)
+
+        # Committed - move the chunks into place and drop the old ones
+        _finish_generation(directory, manifest)
+        _remove_abandoned_temp_files(file_path, manifest)
+
+        if len(chunks) > 1:
+            print(f"📦 Split {file_path.name} into {len(chunks)} chunks ({len(staged)} rewritten)")
+        return manifest
     except IOError as e:
         print(f"⚠️  Error saving JSON file {file_path}: {e}")
         raise
@@ -271,7 +733,7 @@ def _load_db() -> Dict[str, Any]:
             "submissions": [],
             "users": []
         }
-    
+
     try:
         with open(DB_PATH, 'r', encoding='utf-8') as f:
             return json.load(f)
@@ -287,246 +749,1087 @@ def _load_db() -> Dict[str, Any]:
         }
 
 
-@async_file_operation
+def _file_stamp(path: Path) -> Optional[tuple]:
+    """Identify a file's current version by inode, mtime and size."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _torn_tail(path: Path) -> bool:
+    """Whether ``path`` ends in an unterminated line."""
+    try:
+        with open(path, 'rb') as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+    except FileNotFoundError:
+        return False
+
+
+def _read_only(*args, **kwargs):
+    raise TypeError(
+        "JSON database records are read-only; change them through "
+        "update_form / update_submission"
+    )
+
+
+class _FrozenDict(dict):
+    """
+    Read-only dict used for resident records and everything nested in them.
+
+    It is still a dict, so JSON encoders, pydantic and FastAPI treat it as
+    one. Copies (``copy``, ``deepcopy``, ``dict(...)``, pickling) are plain
+    mutable dicts.
+    """
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict) -> Dict[str, Any]:
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class _FrozenList(list):
+    """Read-only list nested in a resident record. See ``_FrozenDict``."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __copy__(self) -> List[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo: dict) -> List[Any]:
+        return [copy.deepcopy(value, memo) for value in self]
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def _freeze(value: Any) -> Any:
+    """Return a read-only copy of ``value``, reusing parts that are already frozen."""
+    if type(value) in (_FrozenDict, _FrozenList):
+        return value
+    if isinstance(value, dict):
+        return _FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return _FrozenList(_freeze(item) for item in value)
+    return value
+
+
+def _view(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return a record to a caller without copying it deeply.
+
+    The top level is a fresh dict the caller may modify (e.g. to pass back to
+    ``update_submission``); nested values are shared and read-only.
+    """
+    return dict(record)
+
+
+# Returned by _JsonCollection._peek when only a full load can answer
+_UNKNOWN = object()
+
+
+def _index_key(value: Any) -> Any:
+    """Return ``value`` if it can key an index, or ``None`` for nested values."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return None
+
+
+class _JsonCollection:
+    """
+    Process-resident copy of one JSON collection.
+
+    The collection is parsed from disk once and served from memory afterwards.
+    The snapshot manifest is fingerprinted by inode, mtime and size, so a
+    write made by another process is picked up on the next access.
+
+    Several worker processes may share the files. Writers hold an exclusive
+    ``flock`` on ``<name>.lock`` while they catch up with the log, mutate and
+    append, so every process applies the same entries in the same order, and
+    revision checks see changes made elsewhere. Reloading the snapshot takes a
+    shared lock, so it never observes a compaction halfway through. The log
+    doubles as the change feed: every access compares its size and inode with
+    what was last replayed and applies only the new entries.
+
+    Resident records are frozen (``_FrozenDict`` / ``_FrozenList``) and never
+    modified in place: an update replaces the record with a merged copy. The
+    public functions hand out shallow copies, so no read deep-copies a record,
+    and writing to a nested value raises TypeError instead of corrupting the
+    cache.
+
+    Records are kept in file order under a row number. ``unique`` fields get a
+    value -> row index for point lookups; the first one is the primary key.
+    ``indexed`` fields get a value -> rows index for filtered listings. Both
+    are maintained on every mutation, so neither needs a scan of the collection.
+    ``ordered`` fields define a sort order kept as a sorted list of
+    ``(values..., row)`` entries, which ``page`` walks from a cursor instead of
+    sorting and slicing the whole listing.
+
+    Until the collection is loaded, point lookups in a split collection read
+    only the chunk the ``<name>.keys.json`` directory names, which keeps cold
+    processes (e.g. serverless invocations) from parsing every chunk.
+
+    Mutations are appended to a JSONL write-ahead log next to the snapshot
+    (``<name>.wal.jsonl``) instead of rewriting it. Loading reads the snapshot
+    with ``_load_json_file`` and replays the log on top. Once the log outgrows
+    the snapshot it is compacted back into the usual ``<name>.json`` /
+    ``<name>.N.json`` format.
+    """
+
+    def __init__(
+        self, file_path: Path, unique: tuple = (), indexed: tuple = (), ordered: tuple = ()
+    ):
+        self.file_path = file_path
+        self.key = unique[0]
+        self.lock = _ReadWriteLock()
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._next_row = 0
+        self._unique: Dict[str, Dict[Any, int]] = {field: {} for field in unique}
+        self._indexes: Dict[str, Dict[Any, Dict[int, None]]] = {field: {} for field in indexed}
+        self._ordered = ordered
+        self._order: List[tuple] = []
+        self._stamp: Optional[tuple] = None
+        self._snapshot_size = 0
+        self._log_ino: Optional[int] = None
+        self._log_offset = 0
+        self._log_file: Optional[BinaryIO] = None
+        self._log_seq = 0
+        self._synced_seq = 0
+        self._sync_task: Optional[asyncio.Task] = None
+        self._exclusive_depth = 0
+        self._shared_depth = 0
+        self._peeked = False
+
+    @property
+    def log_path(self) -> Path:
+        return self.file_path.with_name(f"{self.file_path.stem}.wal.jsonl")
+
+    @property
+    def lock_path(self) -> Path:
+        return self.file_path.with_name(f"{self.file_path.stem}.lock")
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the inter-process write lock. Re-entrant within this process."""
+        if self._exclusive_depth:
+            self._exclusive_depth += 1
+            try:
+                yield
+            finally:
+                self._exclusive_depth -= 1
+            return
+        with interprocess_lock(self.lock_path):
+            self._exclusive_depth = 1
+            try:
+                yield
+            finally:
+                self._exclusive_depth = 0
+
+    @asynccontextmanager
+    async def locked(self) -> AsyncIterator[None]:
+        """Like ``exclusive``, but waits for the lock without blocking the event loop."""
+        if self._exclusive_depth:
+            with self.exclusive():
+                yield
+            return
+        async with async_interprocess_lock(self.lock_path):
+            self._exclusive_depth = 1
+            try:
+                yield
+            finally:
+                self._exclusive_depth = 0
+
+    @asynccontextmanager
+    async def shared(self) -> AsyncIterator[None]:
+        """Hold the inter-process read lock, waiting for it without blocking the event loop."""
+        if self._exclusive_depth or self._shared_depth:
+            yield
+            return
+        async with async_interprocess_lock(self.lock_path, shared=True):
+            self._shared_depth = 1
+            try:
+                yield
+            finally:
+                self._shared_depth = 0
+
+    @contextmanager
+    def _shared(self):
+        """
+        Hold the inter-process read lock, unless this process already holds a lock.
+
+        Never waits: raises _LockBusy if another process holds the write
+        lock, so ``_reads`` can wait for it off the event loop and retry.
+        """
+        if self._exclusive_depth or self._shared_depth:
+            yield
+            return
+        with ExitStack() as stack:
+            try:
+                stack.enter_context(interprocess_lock(self.lock_path, shared=True, blocking=False))
+            except BlockingIOError:
+                raise _LockBusy(self.lock_path.name) from None
+            yield
+
+    def _disk_stamp(self) -> tuple:
+        """
+        Fingerprint the snapshot.
+
+        A manifest is replaced on every save, so a single stat of it tells
+        whether anything changed. Legacy snapshots without one fingerprint
+        the main file and every split chunk that exists.
+        """
+        manifest_stamp = _file_stamp(_manifest_path(self.file_path))
+        if manifest_stamp is not None:
+            return (manifest_stamp,)
+        stamp = [_file_stamp(self.file_path)]
+        for split_path in _get_split_file_paths(self.file_path):
+            split_stamp = _file_stamp(split_path)
+            if split_stamp is None:
+                # Stop at first missing chunk, like _load_json_file
+                break
+            stamp.append(split_stamp)
+        return tuple(stamp)
+
+    def _refresh(self) -> None:
+        """Reload the snapshot if it changed on disk and replay new log entries."""
+        stamp = self._disk_stamp()
+        log_stamp = _file_stamp(self.log_path)
+        if self._is_stale(stamp, log_stamp):
+            with self._shared():
+                # Fingerprint again: a compaction may have finished meanwhile
+                stamp = self._disk_stamp()
+                log_stamp = _file_stamp(self.log_path)
+                manifest = _read_manifest(self.file_path)
+                if manifest is not None:
+                    self._rebuild(_load_manifest_chunks(self.file_path, manifest))
+                    self._snapshot_size = _manifest_size(manifest)
+                else:
+                    self._rebuild(_load_json_file(self.file_path, []))
+                    self._snapshot_size = sum(part[2] for part in stamp if part is not None)
+                self._stamp = stamp
+                self._log_ino = None
+                self._log_offset = 0
+                self._catch_up(log_stamp)
+        else:
+            self._catch_up(log_stamp)
+
+    def _is_stale(self, stamp: tuple, log_stamp: Optional[tuple]) -> bool:
+        """Whether the snapshot must be reloaded rather than just replaying the log tail."""
+        log_ino = log_stamp[0] if log_stamp else None
+        log_replaced = self._log_ino is not None and log_ino != self._log_ino
+        log_truncated = log_stamp is not None and log_stamp[2] < self._log_offset
+        return stamp != self._stamp or log_replaced or log_truncated
+
+    def _catch_up(self, log_stamp: Optional[tuple]) -> None:
+        """Replay log entries appended since the last refresh."""
+        if log_stamp is not None and (log_stamp[0] != self._log_ino or log_stamp[2] != self._log_offset):
+            self._log_ino = log_stamp[0]
+            self._replay_log()
+
+    def _replay_log(self) -> None:
+        """Apply log entries written after ``_log_offset``."""
+        try:
+            with open(self.log_path, 'rb') as f:
+                f.seek(self._log_offset)
+                tail = f.read()
+        except FileNotFoundError:
+            return
+
+        consumed = 0
+        for line in tail.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                # Partially written entry - pick it up once it is complete
+                break
+            consumed += len(line)
+            try:
+                self._apply(_loads(line))
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                print(f"⚠️  Skipping bad entry in {self.log_path.name}: {e}")
+        self._log_offset += consumed
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        """Apply one log entry. Entries are idempotent, so replaying twice is harmless."""
+        if entry["op"] == "put":
+            record = entry["record"]
+            row = self._unique[self.key].get(_index_key(record.get(self.key)))
+            if row is None:
+                self._add(record)
+            else:
+                self._set(row, record)
+        elif entry["op"] == "delete":
+            row = self._unique[self.key].get(_index_key(entry["key"]))
+            if row is not None:
+                self._unindex(row, self._rows.pop(row))
+
+    def _rebuild(self, items: List[Dict[str, Any]]) -> None:
+        """Replace the resident records and rebuild every index."""
+        self._rows = {}
+        self._next_row = 0
+        for positions in self._unique.values():
+            positions.clear()
+        for buckets in self._indexes.values():
+            buckets.clear()
+        # Sort once at the end instead of inserting every record into the order
+        ordered, self._ordered = self._ordered, ()
+        try:
+            for record in items:
+                self._add(record)
+        finally:
+            self._ordered = ordered
+        self._order = sorted(
+            self._order_key(row, record) for row, record in self._rows.items()
+        ) if ordered else []
+
+    def _add(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Append a frozen copy of a record and index it."""
+        record = _freeze(record)
+        row = self._next_row
+        self._next_row += 1
+        self._rows[row] = record
+        self._index(row, record)
+        return record
+
+    def _set(self, row: int, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace the record at ``row`` with a frozen copy of ``record`` and re-index it."""
+        record = _freeze(record)
+        self._unindex(row, self._rows[row])
+        # Re-assigning an existing key keeps the record's position in file order
+        self._rows[row] = record
+        self._index(row, record)
+        return record
+
+    def _index(self, row: int, record: Dict[str, Any]) -> None:
+        for field, positions in self._unique.items():
+            key = _index_key(record.get(field))
+            if key is not None:
+                # Keep the first occurrence, matching a front-to-back scan
+                positions.setdefault(key, row)
+        for field, buckets in self._indexes.items():
+            buckets.setdefault(_index_key(record.get(field)), {})[row] = None
+        if self._ordered:
+            bisect.insort(self._order, self._order_key(row, record))
+
+    def _order_key(self, row: int, record: Dict[str, Any]) -> tuple:
+        """Return the entry of ``record`` in the sorted order: its ``ordered`` values, then its row."""
+        return (*(str(record.get(field) or "") for field in self._ordered), row)
+
+    def _unindex(self, row: int, record: Dict[str, Any]) -> None:
+        for field, positions in self._unique.items():
+            key = _index_key(record.get(field))
+            if key is not None and positions.get(key) == row:
+                del positions[key]
+        for field, buckets in self._indexes.items():
+            key = _index_key(record.get(field))
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.pop(row, None)
+                if not bucket:
+                    del buckets[key]
+        if self._ordered:
+            entry = self._order_key(row, record)
+            position = bisect.bisect_left(self._order, entry)
+            if position < len(self._order) and self._order[position] == entry:
+                del self._order[position]
+
+    def _log(self, entry: Dict[str, Any]) -> None:
+        """
+        Append one entry to the write-ahead log.
+
+        The entry reaches the OS immediately, so other processes can see it.
+        It becomes durable once ``sync()`` has run.
+        """
+        line = _dumps_compact(entry) + b"\n"
+        with self.exclusive():
+            log_stamp = _file_stamp(self.log_path)
+            log_file = self._log_file
+            if log_file is not None and (
+                log_stamp is None or log_stamp[0] != os.fstat(log_file.fileno()).st_ino
+            ):
+                # The log was compacted away underneath us
+                self._retire_log_file()
+                log_file = None
+            if log_file is None:
+                log_file = self._log_file = open(self.log_path, 'ab')
+            if log_stamp is not None and log_stamp[2] != self._log_offset and _torn_tail(self.log_path):
+                # A writer died mid-entry: end its line so ours is not glued onto it
+                line = b"\n" + line
+
+            log_file.write(line)
+            log_file.flush()
+            self._log_seq += 1
+            end = log_file.tell()
+            start = end - len(line)
+
+            log_ino = os.fstat(log_file.fileno()).st_ino
+            if start == self._log_offset and (log_ino == self._log_ino or self._log_ino is None):
+                self._log_ino = log_ino
+                self._log_offset = end
+            # Otherwise an entry from another process was not replayed yet;
+            # the next refresh replays it all
+
+            if self._log_offset > max(WAL_MIN_COMPACT_SIZE, self._snapshot_size):
+                self.compact()
+
+    def _retire_log_file(self) -> None:
+        """Stop appending to the current log file, closing it once no fsync is using it."""
+        log_file, self._log_file = self._log_file, None
+        if log_file is not None and self._sync_task is None:
+            log_file.close()
+
+    async def sync(self) -> None:
+        """
+        Wait until every entry logged so far is on disk.
+
+        Concurrent callers share a single fsync (group commit), so writers
+        queue behind one disk flush instead of one flush each.
+        """
+        target = self._log_seq
+        while self._synced_seq < target:
+            if self._sync_task is None:
+                self._sync_task = asyncio.create_task(self._fsync())
+            await asyncio.shield(self._sync_task)
+
+    async def _fsync(self) -> None:
+        log_file, seq = self._log_file, self._log_seq
+        try:
+            if log_file is not None:
+                await asyncio.to_thread(os.fsync, log_file.fileno())
+            self._synced_seq = max(self._synced_seq, seq)
+        finally:
+            self._sync_task = None
+            if log_file is not None and log_file is not self._log_file:
+                log_file.close()
+
+    def compact(self, fmt: Optional[str] = None) -> None:
+        """Fold the write-ahead log into a fresh snapshot, optionally in another format."""
+        with self.exclusive():
+            self._refresh()
+            manifest = _save_json_file(self.file_path, list(self._rows.values()), tuple(self._unique), fmt)
+            self._retire_log_file()
+            try:
+                os.unlink(self.log_path)
+            except FileNotFoundError:
+                pass
+            self._stamp = self._disk_stamp()
+            self._snapshot_size = _manifest_size(manifest)
+            self._log_ino = None
+            self._log_offset = 0
+            # Everything logged so far now lives in the snapshot
+            self._synced_seq = self._log_seq
+
+    def export(self, target: Path, fmt: str) -> None:
+        """Write the current records as a snapshot at ``target`` in format ``fmt``."""
+        with self._shared():
+            self._refresh()
+            records = list(self._rows.values())
+            extra = _snapshot_extra(self.file_path)
+        _save_json_file(target, records, tuple(self._unique), fmt, extra)
+
+    def items(self) -> List[Dict[str, Any]]:
+        """Return all records in file order."""
+        self._refresh()
+        return list(self._rows.values())
+
+    def locate(self, value: Any, *fields: str) -> Optional[int]:
+        """Return the row of the record whose first matching unique field equals ``value``."""
+        self._refresh()
+        key = _index_key(value)
+        if key is None:
+            return None
+        for field in fields:
+            row = self._unique[field].get(key)
+            if row is not None:
+                return row
+        return None
+
+    def get(self, value: Any, *fields: str) -> Optional[Dict[str, Any]]:
+        """Look up one record by unique field(s)."""
+        if self._stamp is None and not self._peeked:
+            # First lookup of a cold collection - try reading only the chunk
+            # holding the record. Peeking re-reads the manifest and the log, so
+            # later lookups load the collection once and stay resident.
+            self._peeked = True
+            record = self._peek(value, fields)
+            if record is not _UNKNOWN:
+                return record
+        row = self.locate(value, *fields)
+        return self._rows[row] if row is not None else None
+
+    def _peek(self, value: Any, fields: tuple) -> Any:
+        """
+        Look up a record through the key directory, parsing a single chunk.
+
+        Returns ``_UNKNOWN`` when the directory cannot answer reliably: there
+        is none, it cannot be read or disagrees with the chunks, or the
+        write-ahead log mentions the record and may change it.
+        """
+        if not isinstance(value, str):
+            return _UNKNOWN
+        with self._shared():
+            manifest = _read_manifest(self.file_path)
+            if manifest is None or "keys" not in manifest:
+                return _UNKNOWN
+            keys = _load_key_directory(self.file_path, manifest)
+            if keys is None:
+                return _UNKNOWN
+
+            record = None
+            for field in fields:
+                if field not in keys:
+                    return _UNKNOWN
+                position = keys[field].get(value)
+                if position is None:
+                    continue
+                if not isinstance(position, int) or not 0 <= position < len(manifest["chunks"]):
+                    return _UNKNOWN
+                chunk_items = _load_chunk(self.file_path, manifest, manifest["chunks"][position])
+                record = next((item for item in chunk_items if item.get(field) == value), None)
+                if record is None:
+                    # The directory points at a chunk without the record
+                    return _UNKNOWN
+                break
+
+            mentioned = [value] if record is None else [value, record.get(self.key)]
+            if self._log_mentions(mentioned):
+                return _UNKNOWN
+            return _freeze(record) if record is not None else None
+
+    def _log_mentions(self, values: List[Any]) -> bool:
+        """Whether any of ``values`` appears in the write-ahead log."""
+        try:
+            with open(self.log_path, 'rb') as f:
+                log = f.read()
+        except FileNotFoundError:
+            return False
+        return any(_dumps_compact(value) in log for value in values)
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Return the record at a row obtained from ``locate``."""
+        return self._rows[row]
+
+    def find(self, **criteria: Any) -> List[Dict[str, Any]]:
+        """Return records whose indexed fields equal every given value, in file order."""
+        self._refresh()
+        buckets = self._matching_rows(criteria)
+        if buckets is None:
+            return list(self._rows.values())
+        smallest, others = buckets[0], buckets[1:]
+        rows = [row for row in smallest if all(row in bucket for bucket in others)]
+        return [self._rows[row] for row in sorted(rows)]
+
+    def _matching_rows(self, criteria: Dict[str, Any]) -> Optional[List[Dict[int, None]]]:
+        """Return the index buckets for ``criteria``, smallest first, or None without criteria."""
+        if not criteria:
+            return None
+        buckets = [
+            self._indexes[field].get(_index_key(value), {})
+            for field, value in criteria.items()
+        ]
+        buckets.sort(key=len)
+        return buckets
+
+    def count(self, **criteria: Any) -> int:
+        """Return how many records ``find(**criteria)`` would return, without building them."""
+        self._refresh()
+        buckets = self._matching_rows(criteria)
+        if buckets is None:
+            return len(self._rows)
+        smallest, others = buckets[0], buckets[1:]
+        return sum(1 for row in smallest if all(row in bucket for bucket in others))
+
+    def page(
+        self, limit: int, after: Optional[tuple] = None, offset: int = 0, **criteria: Any
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Return up to ``limit`` matching records in ``ordered`` order, and whether more follow.
+
+        ``after`` is the ``ordered`` values of the last record of the previous
+        page (a keyset cursor); ``offset`` skips matches after that. Without a
+        filter, or with a broad one, the sorted order is walked from the cursor
+        and stops after ``limit + 1`` matches. A narrow filter (a few rows in
+        its smallest bucket) sorts just those rows instead.
+        """
+        self._refresh()
+        buckets = self._matching_rows(criteria)
+        if buckets is not None and len(buckets[0]) * 8 < len(self._rows):
+            smallest, others = buckets[0], buckets[1:]
+            order = sorted(
+                self._order_key(row, self._rows[row])
+                for row in smallest
+                if all(row in bucket for bucket in others)
+            )
+            buckets = None
+        else:
+            order = self._order
+
+        start = 0
+        if after is not None:
+            # Rows are ints, so this sorts after every entry with the same values
+            start = bisect.bisect_right(order, (*after, float("inf")))
+
+        records: List[Dict[str, Any]] = []
+        for entry in itertools.islice(order, start, None):
+            row = entry[-1]
+            if buckets is not None and not all(row in bucket for bucket in buckets):
+                continue
+            if offset:
+                offset -= 1
+                continue
+            if len(records) == limit:
+                return records, True
+            records.append(self._rows[row])
+        return records, False
+
+    def tally(self, field: str) -> Dict[Any, int]:
+        """Return how many records hold each value of the indexed ``field``."""
+        self._refresh()
+        return {key: len(bucket) for key, bucket in self._indexes[field].items()}
+
+    def latest(self, limit: int) -> List[Dict[str, Any]]:
+        """Return the last ``limit`` records in ``ordered`` order, last first."""
+        self._refresh()
+        if limit <= 0:
+            return []
+        return [self._rows[entry[-1]] for entry in reversed(self._order[-limit:])]
+
+    def find_truthy(self, field: str, truthy: bool = True) -> List[Dict[str, Any]]:
+        """Return records whose indexed ``field`` is (or is not) truthy, in file order."""
+        self._refresh()
+        rows: List[int] = []
+        for key, bucket in self._indexes[field].items():
+            if bool(key) == truthy:
+                rows.extend(bucket)
+        return [self._rows[row] for row in sorted(rows)]
+
+    def insert(self, record: Dict[str, Any]) -> None:
+        """
+        Append a copy of a record and log it.
+
+        Raises:
+            DuplicateKeyError: If a record with the same primary key exists.
+                Replaying the logged ``put`` would replace that record, so
+                accepting it would leave this process and a fresh load
+                disagreeing.
+        """
+        self._refresh()
+        key = _index_key(record.get(self.key))
+        if key is not None and key in self._unique[self.key]:
+            raise DuplicateKeyError(f"{self.key} {record.get(self.key)!r} already exists")
+        self._log({"op": "put", "record": self._add(record)})
+
+    def update(self, row: int, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge ``changes`` into the record at ``row`` and log it.
+
+        Records are never modified in place: the merged record replaces the
+        old one, sharing the nested values that did not change.
+        """
+        updated = self._set(row, {**self._rows[row], **changes})
+        self._log({"op": "put", "record": updated})
+        return updated
+
+    def delete(self, row: int) -> None:
+        """Remove the record at ``row`` and log it."""
+        record = self._rows.pop(row)
+        self._unindex(row, record)
+        self._log({"op": "delete", "key": record.get(self.key)})
+
+    def replace_all(self, items: List[Dict[str, Any]]) -> None:
+        """Replace the whole collection, e.g. when migrating or seeding."""
+        self._refresh()
+        self._rebuild(items)
+        self.compact()
+
+
+_forms = _JsonCollection(FORMS_DB_PATH, unique=("formId",), indexed=("id", "isActive"))
+_submissions = _JsonCollection(
+    SUBMISSIONS_DB_PATH,
+    unique=("id", "submissionId"),
+    indexed=("formId", "submittedBy", "status"),
+    ordered=("createdAt", "id"),
+)
+# Uploaded file metadata; records sharing a filePath share one stored blob
+_files = _JsonCollection(FILES_DB_PATH, unique=("id", "fileId"), indexed=("filePath",))
+# Named counters, e.g. the daily submission number ({"id": name, "next": value})
+_counters = _JsonCollection(COUNTERS_DB_PATH, unique=("id",))
+
+_COLLECTIONS = (_forms, _submissions, _files, _counters)
+
+
+@_reads(_forms)
 async def get_forms(status: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get all forms, optionally filtered by status."""
-    # Try separate file first, fallback to legacy combined file
-    forms = _load_json_file(FORMS_DB_PATH, [])
-    
-    # If empty, try to migrate from legacy file
-    if not forms and DB_PATH.exists():
-        legacy_db = _load_db()
-        forms = legacy_db.get("forms", [])
-        if forms:
-            # Migrate to separate file
-            _save_json_file(FORMS_DB_PATH, forms)
-            print("📦 Migrated forms from legacy database.json to forms.json")
-    
     if status == "active":
-        forms = [f for f in forms if f.get("isActive", False)]
+        forms = _forms.find_truthy("isActive")
     elif status == "inactive":
-        forms = [f for f in forms if not f.get("isActive", False)]
-    
-    return forms
+        forms = _forms.find_truthy("isActive", truthy=False)
+    else:
+        forms = _forms.items()
+
+    return [_view(f) for f in forms]
 
 
-@async_file_operation
+@_reads(_forms)
 async def get_form_by_id(form_id: str) -> Optional[Dict[str, Any]]:
     """Get a form by its form_id."""
-    # Load directly from file to avoid recursion
-    forms = _load_json_file(FORMS_DB_PATH, [])
-    
-    # If empty, try to migrate from legacy file
-    if not forms and DB_PATH.exists():
-        legacy_db = _load_db()
-        forms = legacy_db.get("forms", [])
-        if forms:
-            # Migrate to separate file
-            _save_json_file(FORMS_DB_PATH, forms)
-            print("📦 Migrated forms from legacy database.json to forms.json")
-    
-    for form in forms:
-        if form.get("formId") == form_id:
-            return form
-    
-    return None
+    form = _forms.get(form_id, "formId")
+    return _view(form) if form is not None else None
+
 
+@_reads(_forms)
+async def count_forms() -> int:
+    """Count the forms without copying them."""
+    return _forms.count()
 
-@async_file_operation
+
+@_writes(_forms)
 async def create_form(form_data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a new form."""
-    forms = _load_json_file(FORMS_DB_PATH, [])
-    
     # Generate ID if not provided
     if "id" not in form_data:
         form_data["id"] = str(uuid.uuid4())
-    
+
     # Set timestamps
     now = datetime.utcnow().isoformat() + "Z"
     if "createdAt" not in form_data:
         form_data["createdAt"] = now
     if "updatedAt" not in form_data:
         form_data["updatedAt"] = now
-    
-    # Add to forms list
-    forms.append(form_data)
-    _save_json_file(FORMS_DB_PATH, forms)
-    
+
+    # Add to forms collection
+    _forms.insert(form_data)
+
     return form_data
 
 
-@async_file_operation
+@_writes(_forms)
 async def update_form(form_id: str, form_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Update an existing form."""
-    forms = _load_json_file(FORMS_DB_PATH, [])
-    
-    for i, form in enumerate(forms):
-        if form.get("formId") == form_id:
-            # Update form data
-            form.update(form_data)
-            form["updatedAt"] = datetime.utcnow().isoformat() + "Z"
-            forms[i] = form
-            _save_json_file(FORMS_DB_PATH, forms)
-            return form
-    
-    return None
+    """Update an existing form. Fields in ``form_data`` replace the stored ones; others are kept."""
+    row = _forms.locate(form_id, "formId")
+    if row is None:
+        return None
 
+    changes = dict(form_data)
+    changes["updatedAt"] = datetime.utcnow().isoformat() + "Z"
+    return _view(_forms.update(row, changes))
 
-@async_file_operation
+
+@_writes(_forms)
 async def delete_form(form_id: str) -> bool:
     """Delete a form by its form_id."""
-    forms = _load_json_file(FORMS_DB_PATH, [])
-    
-    original_count = len(forms)
-    forms = [f for f in forms if f.get("formId") != form_id]
-    
-    if len(forms) < original_count:
-        _save_json_file(FORMS_DB_PATH, forms)
-        return True
-    
-    return False
-
-
-@async_file_operation
-async def get_submissions(form_id: Optional[str] = None, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
-    """Get submissions, optionally filtered by form_id or user_id."""
-    # Try separate file first, fallback to legacy combined file
-    submissions = _load_json_file(SUBMISSIONS_DB_PATH, [])
-    
-    # If empty, try to migrate from legacy file
-    if not submissions and DB_PATH.exists():
-        legacy_db = _load_db()
-        submissions = legacy_db.get("submissions", [])
-        if submissions:
-            # Migrate to separate file
-            _save_json_file(SUBMISSIONS_DB_PATH, submissions)
-            print("📦 Migrated submissions from legacy database.json to submissions.json")
-    
+    row = _forms.locate(form_id, "formId")
+    if row is None:
+        return False
+
+    _forms.delete(row)
+    return True
+
+
+@_reads(_submissions)
+async def get_submissions(
+    form_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    status: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Get submissions, optionally filtered by form_id, user_id or status."""
+    criteria: Dict[str, Any] = {}
     if form_id:
-        submissions = [s for s in submissions if s.get("formId") == form_id]
-    
+        criteria["formId"] = form_id
     if user_id:
         # Filter by submittedBy field (not userId)
-        submissions = [s for s in submissions if s.get("submittedBy") == user_id]
-    
-    return submissions
+        criteria["submittedBy"] = user_id
+    if status:
+        criteria["status"] = status
+
+    return [_view(s) for s in _submissions.find(**criteria)]
+
+
+@_reads(_submissions)
+async def get_submissions_page(
+    form_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 20,
+    after: Optional[Tuple[str, str]] = None,
+    offset: int = 0,
+    with_total: bool = False,
+) -> Dict[str, Any]:
+    """
+    Get one page of submissions ordered by (createdAt, id).
+
+    ``after`` is the (createdAt, id) of the last submission already seen, as
+    returned in ``next``; ``offset`` skips further submissions after it. The
+    result holds the page's ``items``, the ``next`` key (None on the last page)
+    and, when ``with_total`` is set, the ``total`` number of matches.
+    """
+    criteria: Dict[str, Any] = {}
+    if form_id:
+        criteria["formId"] = form_id
+    if user_id:
+        criteria["submittedBy"] = user_id
+    if status:
+        criteria["status"] = status
+
+    records, more = _submissions.page(limit, after=after, offset=offset, **criteria)
+    last = records[-1] if more and records else None
+    return {
+        "items": [_view(s) for s in records],
+        "next": (str(last.get("createdAt") or ""), str(last.get("id") or "")) if last else None,
+        "total": _submissions.count(**criteria) if with_total else None,
+    }
+
 
+@_reads(_submissions)
+async def get_submission_statistics(recent: int = 10) -> Dict[str, Any]:
+    """
+    Get submission counts and the most recently created submissions.
 
-@async_file_operation
+    Everything is read from the indexes, which every create, update and
+    delete keeps current: the counts are the sizes of the status and formId
+    buckets, and the recent submissions are the tail of the (createdAt, id)
+    order. No submission is scanned.
+    """
+    by_status: Dict[str, int] = {}
+    for status, count in _submissions.tally("status").items():
+        # Submissions without a status are drafts
+        status = status if status is not None else "draft"
+        by_status[status] = by_status.get(status, 0) + count
+    by_form = {
+        form_id: count
+        for form_id, count in _submissions.tally("formId").items()
+        if form_id is not None
+    }
+    return {
+        "total": _submissions.count(),
+        "byStatus": by_status,
+        "byForm": by_form,
+        "recent": [_view(s) for s in _submissions.latest(recent)],
+    }
+
+
+@_reads(_submissions)
 async def get_submission_by_id(submission_id: str) -> Optional[Dict[str, Any]]:
     """Get a submission by its ID."""
-    # Load directly from file to avoid recursion
-    submissions = _load_json_file(SUBMISSIONS_DB_PATH, [])
-    
-    # If empty, try to migrate from legacy file
-    if not submissions and DB_PATH.exists():
-        legacy_db = _load_db()
-        submissions = legacy_db.get("submissions", [])
-        if submissions:
-            # Migrate to separate file
-            _save_json_file(SUBMISSIONS_DB_PATH, submissions)
-            print("📦 Migrated submissions from legacy database.json to submissions.json")
-    
-    for submission in submissions:
-        if submission.get("id") == submission_id or submission.get("submissionId") == submission_id:
-            return submission
-    
-    return None
+    submission = _submissions.get(submission_id, "id", "submissionId")
+    return _view(submission) if submission is not None else None
+
+
+@_writes(_counters)
+async def lease_sequence_block(name: str, size: int) -> int:
+    """
+    Reserve the next ``size`` values of a named counter.
+
+    Counters start at 1 and never hand out a value twice, across worker
+    processes too. The caller owns [first, first + size) and can hand those
+    values out without coming back here.
+
+    Returns:
+        The first reserved value
+    """
+    row = _counters.locate(name, "id")
+    if row is None:
+        first = 1
+        _counters.insert({"id": name, "next": first + size})
+    else:
+        first = _counters.record(row).get("next", 1)
+        _counters.update(row, {"next": first + size})
+    return first
 
 
-@async_file_operation
+@_writes(_submissions)
 async def create_submission(submission_data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a new submission."""
-    submissions = _load_json_file(SUBMISSIONS_DB_PATH, [])
-    
     # Generate ID if not provided
     if "id" not in submission_data:
         submission_data["id"] = str(uuid.uuid4())
-    
+
     # Ensure submissionId matches id if not set
     if "submissionId" not in submission_data:
         submission_data["submissionId"] = submission_data["id"]
-    
+
     # Set timestamps
     now = datetime.utcnow().isoformat() + "Z"
     if "createdAt" not in submission_data:
         submission_data["createdAt"] = now
     if "updatedAt" not in submission_data:
         submission_data["updatedAt"] = now
-    
-    # Add to submissions list
-    submissions.append(submission_data)
-    _save_json_file(SUBMISSIONS_DB_PATH, submissions)
-    
+
+    # Add to submissions collection
+    _submissions.insert(submission_data)
+
     print(f"💾 Saved submission {submission_data.get('submissionId')} to submissions.json")
-    
+
     return submission_data
 
 
-@async_file_operation
-async def update_submission(submission_id: str, submission_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Update an existing submission."""
-    submissions = _load_json_file(SUBMISSIONS_DB_PATH, [])
-    
-    for i, submission in enumerate(submissions):
-        if submission.get("id") == submission_id or submission.get("submissionId") == submission_id:
-            # Update submission data
-            submission.update(submission_data)
-            submission["updatedAt"] = datetime.utcnow().isoformat() + "Z"
-            submissions[i] = submission
-            _save_json_file(SUBMISSIONS_DB_PATH, submissions)
-            print(f"💾 Updated submission {submission_id} in submissions.json")
-            return submission
-    
-    return None
+@_writes(_submissions)
+async def update_submission(
+    submission_id: str,
+    submission_data: Dict[str, Any],
+    expected_revision: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Update an existing submission.
+
+    Fields in ``submission_data`` replace the stored ones; others are kept,
+    so callers only need to pass what changed. Each update bumps the
+    submission's ``revision``. Pass the revision the caller read as
+    ``expected_revision`` to reject the update with RevisionConflictError if
+    someone else saved the submission in between.
+    """
+    row = _submissions.locate(submission_id, "id", "submissionId")
+    if row is None:
+        return None
+
+    current_revision = _submissions.record(row).get("revision", 0)
+    if expected_revision is not None and expected_revision != current_revision:
+        raise RevisionConflictError(
+            f"Submission {submission_id} was modified concurrently "
+            f"(revision {current_revision}, expected {expected_revision})"
+        )
 
+    changes = dict(submission_data)
+    changes["revision"] = current_revision + 1
+    changes["updatedAt"] = datetime.utcnow().isoformat() + "Z"
+    updated = _submissions.update(row, changes)
+    print(f"💾 Updated submission {submission_id} in submissions.json")
+    return _view(updated)
 
-@async_file_operation
+
+@_writes(_submissions)
 async def delete_submission(submission_id: str) -> bool:
     """Delete a submission by its ID."""
-    submissions = _load_json_file(SUBMISSIONS_DB_PATH, [])
-    
-    original_count = len(submissions)
-    submissions = [
-        s for s in submissions 
-        if s.get("id") != submission_id and s.get("submissionId") != submission_id
-    ]
-    
-    if len(submissions) < original_count:
-        _save_json_file(SUBMISSIONS_DB_PATH, submissions)
-        return True
-    
-    return False
+    row = _submissions.locate(submission_id, "id", "submissionId")
+    if row is None:
+        return False
 
+    _submissions.delete(row)
+    return True
+
+
+@_reads(_files)
+async def get_file(file_id: str) -> Optional[Dict[str, Any]]:
+    """Get file metadata by its internal ``id`` or frontend ``fileId`` (exact match)."""
+    file_data = _files.get(file_id, "id", "fileId")
+    return _view(file_data) if file_data is not None else None
+
+
+@_writes(_files)
+async def create_file(file_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Record the metadata of an uploaded file."""
+    _files.insert(file_data)
+    return file_data
+
+
+@_writes(_files)
+async def delete_file(file_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+    """
+    Delete file metadata by ``id`` or ``fileId``.
+
+    Returns the deleted record and how many records still reference its
+    ``filePath`` (the stored file may be removed once that is 0), or None if
+    no record matches.
+    """
+    row = _files.locate(file_id, "id", "fileId")
+    if row is None:
+        return None
+
+    file_data = _view(_files.record(row))
+    _files.delete(row)
+    return file_data, _files.count(filePath=file_data.get("filePath"))
+
+
+@_reads(_files)
+async def count_file_references(file_path: str) -> int:
+    """Count the file records that reference a stored file."""
+    return _files.count(filePath=file_path)
+
+
+async def convert_snapshots(fmt: str, output_dir: Optional[Path] = None) -> None:
+    """
+    Rewrite every collection's snapshot in ``fmt`` ("json" or "compact").
+
+    Without ``output_dir`` the snapshots are converted in place (folding in
+    the write-ahead logs), and later saves keep the new format unless
+    JSON_DB_SNAPSHOT_FORMAT says otherwise. With ``output_dir`` a converted
+    copy is written there instead, e.g. to export a readable snapshot.
+    """
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unknown snapshot format {fmt!r}, expected one of {SNAPSHOT_FORMATS}")
+    for collection in _COLLECTIONS:
+        if output_dir is None:
+            async with collection.lock.write(), collection.locked():
+                collection.compact(fmt)
+        else:
+            async with collection.lock.read(), collection.shared():
+                collection.export(output_dir / collection.file_path.name, fmt)
+
+
+async def compact_logs() -> None:
+    """
+    Fold every collection's write-ahead log into its JSON snapshot.
+
+    Collections without logged writes are left alone, so a restart does not
+    rewrite (or create) snapshots nothing has changed.
+    """
+    for collection in _COLLECTIONS:
+        async with collection.lock.write():
+            try:
+                if collection.log_path.stat().st_size == 0:
+                    continue
+            except FileNotFoundError:
+                continue
+            async with collection.locked():
+                collection.compact()
+
+
+@_writes(_forms)
+async def _migrate_legacy_forms(legacy_db: Dict[str, Any]) -> None:
+    """Move forms from the legacy database.json into forms.json if that is empty."""
+    legacy_forms = legacy_db.get("forms", [])
+    if legacy_forms and not _forms.items():
+        _forms.replace_all(legacy_forms)
+        print("📦 Migrated forms from legacy database.json to forms.json")
+
+
+@_writes(_submissions)
+async def _migrate_legacy_submissions(legacy_db: Dict[str, Any]) -> None:
+    """Move submissions from the legacy database.json into submissions.json if that is empty."""
+    legacy_submissions = legacy_db.get("submissions", [])
+    if legacy_submissions and not _submissions.items():
+        _submissions.replace_all(legacy_submissions)
+        print("📦 Migrated submissions from legacy database.json to submissions.json")
+
+
+@_writes(_forms)
+async def _seed_default_form() -> bool:
+    """Add the default form if there are no forms. Returns False if seeding failed."""
+    if _forms.items():
+        return True
 
-async def initialize_default_data() -> None:
-    """Initialize default form data if database is empty."""
-    # Check if forms already exist in separate file
-    forms = _load_json_file(FORMS_DB_PATH, [])
-    
-    if forms:
-        return
-    
-    # Try legacy file
-    if DB_PATH.exists():
-        legacy_db = _load_db()
-        legacy_forms = legacy_db.get("forms", [])
-        if legacy_forms:
-            # Migrate to separate file
-            _save_json_file(FORMS_DB_PATH, legacy_forms)
-            print("📦 Migrated forms from legacy database.json to forms.json")
-            return
-    
     # Import seed function
     try:
         import sys
-        from pathlib import Path
         scripts_dir = Path(__file__).parent.parent.parent / "scripts"
         sys.path.insert(0, str(scripts_dir))
         from seed_sample_form import create_labuan_company_management_form_schema
-        
+
         schema_data = create_labuan_company_management_form_schema()
-        
+
         form_data = {
             "id": str(uuid.uuid4()),
             "formId": schema_data["formId"],
@@ -543,11 +1846,41 @@ async def initialize_default_data() -> None:
             "createdBy": None,
             "updatedBy": None
         }
-        
-        _save_json_file(FORMS_DB_PATH, [form_data])
-        
+
+        _forms.replace_all([form_data])
+
         print(f"✅ Initialized default form in forms.json")
         print(f"   Form ID: {form_data['formId']}")
+        return True
     except Exception as e:
         print(f"⚠️  Error initializing default data: {e}")
+        return False
+
 
+async def initialize_default_data() -> None:
+    """
+    Migrate the legacy database.json and seed the default form, once per data directory.
+
+    Runs from the application lifespan, never per request. Once it has
+    succeeded it writes MIGRATION_MARKER_PATH, so later startups skip it.
+    """
+    if MIGRATION_MARKER_PATH.exists():
+        return
+
+    if DB_PATH.exists():
+        legacy_db = _load_db()
+        await _migrate_legacy_forms(legacy_db)
+        await _migrate_legacy_submissions(legacy_db)
+
+    if not await _seed_default_form():
+        # Try again on the next startup
+        return
+
+    marker = {
+        "migratedAt": datetime.utcnow().isoformat() + "Z",
+        "legacyDatabase": DB_PATH.name if DB_PATH.exists() else None,
+    }
+    marker_tmp = MIGRATION_MARKER_PATH.with_name(f"{MIGRATION_MARKER_PATH.name}.tmp")
+    _write_durably(marker_tmp, json.dumps(marker, indent=2).encode('utf-8'))
+    os.replace(marker_tmp, MIGRATION_MARKER_PATH)
+    print(f"✅ Recorded JSON database initialization in {MIGRATION_MARKER_PATH.name}")
@@ -39,6 +39,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         print(f"   ⚠️  JSON database initialization warning: {e}")
     
+    # Worker processes for large batch validations, shared by every request
+    from labuan_fsa.utils.validators import start_batch_pool, stop_batch_pool
+    start_batch_pool()
+
     # Skip init_db() for now due to connection issues
     # The API endpoints will use JSON fallback if SQL fails
     print("   ⚠️  Skipping SQL database initialization (will use JSON fallback if needed)")
@@ -46,6 +50,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     yield
     
     # Shutdown
+    stop_batch_pool()
+
+    try:
+        from labuan_fsa.json_db import compact_logs
+        await compact_logs()
+    except Exception as e:
+        print(f"   ⚠️  JSON database compaction warning: {e}")
+    
     try:
         await close_db()
     except Exception:
@@ -5,7 +5,8 @@ All models are defined here and imported from this module.
 """
 
 from labuan_fsa.models.form import Form, FormVersion
-from labuan_fsa.models.submission import FormSubmission, FileUpload
+from labuan_fsa.models.submission import FormSubmission, FileUpload, SubmissionCount
+from labuan_fsa.models.sequence import SequenceCounter
 from labuan_fsa.models.user import User
 from labuan_fsa.models.audit import AuditLog
 
@@ -17,6 +18,8 @@ try:
         "FormVersion",
         "FormSubmission",
         "FileUpload",
+        "SubmissionCount",
+        "SequenceCounter",
         "User",
         "AuditLog",
         "Payment",
@@ -28,6 +31,8 @@ except ImportError:
         "FormVersion",
         "FormSubmission",
         "FileUpload",
+        "SubmissionCount",
+        "SequenceCounter",
         "User",
         "AuditLog",
     ]
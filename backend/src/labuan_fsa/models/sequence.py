@@ -0,0 +1,22 @@
+"""
+Sequence models.
+
+Defines SequenceCounter, the named counters behind human-readable IDs.
+"""
+
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from labuan_fsa.database import Base
+
+
+class SequenceCounter(Base):
+    """Next unleased value of a named counter (e.g. "submission:20251117")."""
+
+    __tablename__ = "sequence_counters"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    next: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<SequenceCounter(name='{self.name}', next={self.next})>"
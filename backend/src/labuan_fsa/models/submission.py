@@ -8,8 +8,10 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import ForeignKey, String, Text, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Connection, ForeignKey, Index, Integer, String, Text, event, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
 from labuan_fsa.config import get_settings
 from labuan_fsa.database import Base
@@ -23,6 +25,10 @@ class FormSubmission(Base):
     """Form submission model."""
 
     __tablename__ = "form_submissions"
+    __table_args__ = (
+        # Serves cursor pagination and the dashboard's most recent submissions
+        Index("ix_form_submissions_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(
         UUIDType(as_uuid=True) if not is_sqlite else UUIDType(),  # type: ignore
@@ -82,6 +88,118 @@ class FormSubmission(Base):
         return f"<FormSubmission(id={self.id}, submission_id='{self.submission_id}', status='{self.status}')>"
 
 
+class SubmissionCount(Base):
+    """
+    Number of submissions per form and status.
+
+    Kept current by the session's flush (see _maintain_submission_counts), so
+    the dashboard reads a handful of rows instead of counting submissions.
+    """
+
+    __tablename__ = "submission_counts"
+
+    form_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    status: Mapped[str] = mapped_column(String(50), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<SubmissionCount(form_id='{self.form_id}', status='{self.status}', count={self.count})>"
+
+
+def _committed_value(submission: FormSubmission, attribute: str):
+    """Return ``attribute`` as stored in the database, before pending changes."""
+    history = inspect(submission).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(submission, attribute)
+
+
+# Engines whose database has the submission_counts table. A missing table is
+# looked up again on the next write, so counting starts once a migration adds it.
+_engines_with_counts: set = set()
+
+
+def has_submission_counts(connection: Connection) -> bool:
+    """Whether the database behind ``connection`` has the submission_counts table."""
+    engine = connection.engine
+    if engine not in _engines_with_counts:
+        if not inspect(connection).has_table(SubmissionCount.__tablename__):
+            return False
+        _engines_with_counts.add(engine)
+    return True
+
+
+@event.listens_for(Session, "before_flush")
+def _maintain_submission_counts(session: Session, flush_context, instances) -> None:
+    """
+    Apply the flush's submission creates, deletes and status (or form)
+    changes to submission_counts, in the same transaction.
+
+    Databases not migrated yet (no submission_counts table) are left alone;
+    the migration seeds the table from the submissions stored meanwhile.
+    """
+    deltas: dict[tuple[str, str], int] = {}
+
+    def add(key: tuple[str, str], delta: int) -> None:
+        deltas[key] = deltas.get(key, 0) + delta
+
+    for obj in session.new:
+        if isinstance(obj, FormSubmission):
+            add((obj.form_id, obj.status or "draft"), 1)
+    for obj in session.deleted:
+        if isinstance(obj, FormSubmission):
+            add((_committed_value(obj, "form_id"), _committed_value(obj, "status")), -1)
+    for obj in session.dirty:
+        if isinstance(obj, FormSubmission) and session.is_modified(obj):
+            old = (_committed_value(obj, "form_id"), _committed_value(obj, "status"))
+            new = (obj.form_id, obj.status)
+            if old != new:
+                add(old, -1)
+                add(new, 1)
+
+    if not any(deltas.values()):
+        return
+    connection = session.connection()
+    if not has_submission_counts(connection):
+        return
+    insert = sqlite_insert if is_sqlite else postgresql_insert
+    counts = SubmissionCount.__table__
+    for (form_id, status), delta in deltas.items():
+        if delta:
+            connection.execute(
+                insert(counts)
+                .values(form_id=form_id, status=status, count=delta)
+                .on_conflict_do_update(
+                    index_elements=[counts.c.form_id, counts.c.status],
+                    set_={"count": counts.c.count + delta},
+                )
+            )
+
+
+def seed_submission_counts(connection: Connection) -> bool:
+    """
+    Fill an empty submission_counts table from the stored submissions.
+
+    Needed once, when the table is added to a database that already holds
+    submissions. Rows are never removed (a count may drop to 0), so an empty
+    table means it has not been seeded yet.
+
+    Returns:
+        True if any counts were added
+    """
+    counts = SubmissionCount.__table__
+    if connection.execute(select(counts.c.form_id).limit(1)).first() is not None:
+        return False
+    result = connection.execute(
+        counts.insert().from_select(
+            ["form_id", "status", "count"],
+            select(FormSubmission.form_id, FormSubmission.status, func.count())
+            .group_by(FormSubmission.form_id, FormSubmission.status),
+        )
+    )
+    return result.rowcount > 0
+
+
 class FileUpload(Base):
     """File upload metadata model."""
 
@@ -101,7 +219,9 @@ class FileUpload(Base):
     )
     field_name: Mapped[str] = mapped_column(String(100), nullable=False)
     file_name: Mapped[str] = mapped_column(String(255), nullable=False)
-    file_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    # Indexed: uploads of identical content share one stored blob, and a blob
+    # is deleted when no row references its path any more
+    file_path: Mapped[str] = mapped_column(String(500), nullable=False, index=True)
     file_size: Mapped[int] = mapped_column(nullable=False)
     mime_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     storage_location: Mapped[str] = mapped_column(
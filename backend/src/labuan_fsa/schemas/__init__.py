@@ -17,9 +17,16 @@ from labuan_fsa.schemas.submission import (
     SubmissionResponse,
     SubmissionUpdate,
     SubmissionValidateRequest,
+    SubmissionBatchValidateRequest,
     SubmissionValidateResponse,
 )
-from labuan_fsa.schemas.file import FileUploadResponse
+from labuan_fsa.schemas.file import (
+    FileUploadResponse,
+    MultipartPart,
+    MultipartUploadComplete,
+    MultipartUploadCreate,
+    MultipartUploadResponse,
+)
 from labuan_fsa.schemas.auth import (
     LoginRequest,
     LoginResponse,
@@ -41,8 +48,13 @@ __all__ = [
     "SubmissionUpdate",
     "SubmissionResponse",
     "SubmissionValidateRequest",
+    "SubmissionBatchValidateRequest",
     "SubmissionValidateResponse",
     "FileUploadResponse",
+    "MultipartUploadCreate",
+    "MultipartPart",
+    "MultipartUploadResponse",
+    "MultipartUploadComplete",
     "RegisterRequest",
     "RegisterResponse",
     "LoginRequest",
@@ -30,3 +30,47 @@ class FileUploadResponse(BaseModel):
         from_attributes = True
         populate_by_name = True
 
+
+
+class MultipartUploadCreate(BaseModel):
+    """Schema for starting a resumable multipart upload."""
+
+    file_name: str = Field(..., alias="fileName")
+    field_name: str = Field(..., alias="fieldName")
+    file_size: Optional[int] = Field(None, alias="fileSize", description="Expected total size in bytes")
+    file_id: Optional[str] = Field(None, alias="fileId", description="File ID (frontend format)")
+    mime_type: Optional[str] = Field(None, alias="mimeType")
+
+    class Config:
+        populate_by_name = True
+
+
+class MultipartPart(BaseModel):
+    """Schema for one part of a multipart upload."""
+
+    part_number: int = Field(..., alias="partNumber")
+    size: Optional[int] = None
+    checksum: str = Field(..., description="SHA-256 of the part (hex)")
+
+    class Config:
+        populate_by_name = True
+
+
+class MultipartUploadResponse(BaseModel):
+    """Schema for the state of a multipart upload."""
+
+    upload_id: str = Field(..., alias="uploadId")
+    part_size: int = Field(..., alias="partSize", description="Suggested part size in bytes")
+    max_file_size: int = Field(..., alias="maxFileSize")
+    parts: list[MultipartPart] = Field(default_factory=list, description="Parts received so far")
+
+    class Config:
+        populate_by_name = True
+
+
+class MultipartUploadComplete(BaseModel):
+    """Schema for completing a multipart upload."""
+
+    parts: Optional[list[MultipartPart]] = Field(
+        None, description="Parts the client uploaded; checked against the received parts"
+    )
@@ -16,6 +16,17 @@ class SubmissionValidateRequest(BaseModel):
 
     data: dict[str, Any] = Field(..., description="Form data organized by step")
     step_id: Optional[str] = Field(None, description="Specific step to validate")
+    fields: Optional[list[str]] = Field(
+        None, description="Specific fields to validate, by fieldName or fieldId (within step_id when given)"
+    )
+
+
+class SubmissionBatchValidateRequest(BaseModel):
+    """Schema for validating many submissions of one form."""
+
+    items: list[dict[str, Any]] = Field(
+        ..., max_length=10000, description="Form data payloads, each organized by step"
+    )
 
 
 class ValidationError(BaseModel):
@@ -51,6 +62,10 @@ class SubmissionDraft(BaseModel):
     files: Optional[list[dict[str, str]]] = Field(
         None, description="List of file uploads with fieldName, fileId, fileName"
     )
+    revision: Optional[int] = Field(
+        None,
+        description="Revision the client last read; the update is rejected (409) if the submission changed since",
+    )
 
 
 class SubmissionUpdate(BaseModel):
@@ -59,6 +74,10 @@ class SubmissionUpdate(BaseModel):
     status: Optional[str] = None
     review_notes: Optional[str] = None
     requested_info: Optional[str] = None
+    revision: Optional[int] = Field(
+        None,
+        description="Revision the client last read; the update is rejected (409) if the submission changed since",
+    )
 
 
 class SubmissionResponse(BaseModel):
@@ -77,6 +96,8 @@ class SubmissionResponse(BaseModel):
     requested_info: Optional[str] = Field(None, serialization_alias="requestedInfo")
     created_at: datetime = Field(..., serialization_alias="createdAt")
     updated_at: datetime = Field(..., serialization_alias="updatedAt")
+    # Send back (If-Match or the body's revision) when updating, to detect concurrent changes
+    revision: int = 0
 
     class Config:
         from_attributes = True
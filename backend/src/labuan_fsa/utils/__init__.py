@@ -11,7 +11,15 @@ from labuan_fsa.utils.security import (
     verify_password,
     verify_token,
 )
+from labuan_fsa.utils.export import export_row, flatten_submitted_data
+from labuan_fsa.utils.pagination import decode_cursor, encode_cursor, read_cursor
+from labuan_fsa.utils.revision import client_revision
 from labuan_fsa.utils.validators import (
+    compile_form_schema,
+    get_form_validator,
+    start_batch_pool,
+    stop_batch_pool,
+    validate_batch,
     validate_form_data,
     validate_file_upload,
     generate_submission_id,
@@ -24,7 +32,18 @@ __all__ = [
     "get_password_hash",
     "verify_password",
     "validate_form_data",
+    "compile_form_schema",
+    "get_form_validator",
+    "validate_batch",
+    "start_batch_pool",
+    "stop_batch_pool",
     "validate_file_upload",
     "generate_submission_id",
+    "encode_cursor",
+    "decode_cursor",
+    "read_cursor",
+    "client_revision",
+    "export_row",
+    "flatten_submitted_data",
 ]
 
@@ -0,0 +1,104 @@
+"""
+Export utilities.
+
+Flatten submissions into rows and render them as NDJSON or CSV lines, one
+row at a time, so an export can be streamed without holding it in memory.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Iterable
+
+# Submission fields exported ahead of the flattened submitted data
+EXPORT_COLUMNS = [
+    "id",
+    "submissionId",
+    "formId",
+    "status",
+    "submittedBy",
+    "submittedAt",
+    "createdAt",
+    "updatedAt",
+    "reviewedBy",
+    "reviewedAt",
+]
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+def flatten_submitted_data(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Flatten submitted data organized by step into "stepId.fieldName" keys.
+
+    Args:
+        data: Submitted data ({stepId: {fieldName: value}})
+
+    Returns:
+        Dictionary of "stepId.fieldName" -> value
+    """
+    flat: dict[str, Any] = {}
+    for step_id, fields in (data or {}).items():
+        if isinstance(fields, dict):
+            for field_id, value in fields.items():
+                flat[f"{step_id}.{field_id}"] = value
+        else:
+            flat[step_id] = fields
+    return flat
+
+
+def schema_columns(form_schema: dict[str, Any]) -> list[str]:
+    """
+    List the "stepId.fieldName" columns a form schema defines, in schema order.
+
+    Submitted data is keyed by fieldName (as the validators read it), so
+    these columns line up with ``flatten_submitted_data``.
+
+    Args:
+        form_schema: Form schema JSON (from Form.schema_data)
+
+    Returns:
+        List of column names
+    """
+    columns = []
+    for step in (form_schema or {}).get("steps", []):
+        for field in step.get("fields", []):
+            if field.get("fieldName"):
+                columns.append(f"{step.get('stepId')}.{field['fieldName']}")
+    return columns
+
+
+def export_row(submission: dict[str, Any]) -> dict[str, Any]:
+    """
+    Build the export row of a submission (camelCase JSON record).
+
+    Args:
+        submission: Submission record
+
+    Returns:
+        Export columns followed by the flattened submitted data
+    """
+    row = {column: submission.get(column) for column in EXPORT_COLUMNS}
+    row.update(flatten_submitted_data(submission.get("submittedData", {})))
+    return row
+
+
+def ndjson_line(row: dict[str, Any]) -> str:
+    """Render one export row as an NDJSON line."""
+    return json.dumps(row, ensure_ascii=False, default=str) + "\n"
+
+
+def _csv_value(value: Any) -> Any:
+    """Render nested values as JSON inside a CSV cell."""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def csv_line(values: Iterable[Any]) -> str:
+    """Render one CSV line (with csv quoting rules)."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([_csv_value(value) for value in values])
+    return buffer.getvalue()
@@ -0,0 +1,84 @@
+"""
+Cursor helpers for keyset pagination.
+
+Listings are ordered by (createdAt, id). A cursor is the opaque, URL-safe
+encoding of the (createdAt, id) of the last item on a page; the next page
+starts strictly after it, so pages stay stable while new items are added.
+
+Cursors also record the backend that issued them ("sql" or "json"). The
+two stores use different IDs (UUIDs in SQL, free-form strings in JSON), so
+a listing is continued by the backend its cursor came from.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+# Backends that issue cursors
+CURSOR_BACKENDS = ("sql", "json")
+
+# Error detail when a SQL cursor arrives while the SQL database cannot answer
+SQL_CURSOR_UNAVAILABLE = "The SQL database that issued this cursor is unavailable; list again without a cursor"
+
+
+def encode_cursor(backend: str, created_at: str, item_id: str) -> str:
+    """
+    Encode the sort key of the last item on a page as a cursor.
+
+    Args:
+        backend: Backend that produced the page ("sql" or "json")
+        created_at: The item's creation timestamp (ISO 8601)
+        item_id: The item's ID
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([backend, created_at, item_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str, str]:
+    """
+    Decode and validate a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        Tuple of (backend, created_at, item_id)
+
+    Raises:
+        ValueError: If the cursor is malformed, or a SQL cursor's timestamp
+            or ID does not parse
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        backend, created_at, item_id = json.loads(raw)
+        if backend not in CURSOR_BACKENDS or not isinstance(created_at, str) or not isinstance(item_id, str):
+            raise ValueError("unexpected values")
+        if backend == "sql":
+            # The SQL listing compares these as a timestamp and a UUID
+            datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+            UUID(item_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    return backend, created_at, item_id
+
+
+def read_cursor(cursor: Optional[str]) -> tuple[Optional[str], Optional[tuple[str, str]]]:
+    """
+    Decode an optional ``cursor`` query parameter.
+
+    Returns:
+        Tuple of (issuing backend, (created_at, item_id)), or (None, None)
+        when there is no cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return None, None
+    backend, created_at, item_id = decode_cursor(cursor)
+    return backend, (created_at, item_id)
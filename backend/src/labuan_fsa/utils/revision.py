@@ -0,0 +1,35 @@
+"""
+Optimistic concurrency for submission updates.
+
+Every update bumps a submission's ``revision``. Clients send back the
+revision they last read, in an If-Match header or the request body, and the
+update is rejected with 409 if the submission changed since.
+"""
+
+from typing import Optional
+
+
+def client_revision(if_match: Optional[str], revision: Optional[int]) -> Optional[int]:
+    """
+    Return the revision the client last read, or None if it sent none.
+
+    If-Match takes precedence over the body. It may be a bare or quoted
+    number, with or without the weak ``W/`` prefix; ``*`` matches any
+    revision, like sending none.
+
+    Args:
+        if_match: If-Match header value
+        revision: ``revision`` field of the request body
+
+    Raises:
+        ValueError: If If-Match is not a revision number
+    """
+    if if_match is None:
+        return revision
+    tag = if_match.strip()
+    if tag == "*":
+        return None
+    tag = tag.removeprefix("W/").strip('"')
+    if not tag.isdigit():
+        raise ValueError(f"If-Match must be a submission revision, got {if_match!r}")
+    return int(tag)
@@ -4,16 +4,485 @@ Validation utilities.
 Form data validation and file upload validation utilities.
 """
 
+import hashlib
+import json
+import math
+import os
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from multiprocessing import get_context
 from typing import Any
 
 from labuan_fsa.schemas.submission import ValidationError
+from labuan_fsa.utils.sequence import BlockSequence, lease_sql_sequence_block
+
+# Compiled form schemas kept in memory; the least recently used is evicted first
+VALIDATOR_CACHE_SIZE = 64
+
+# Field types that hold the document checklist supportingDocuments defers to
+CHECKLIST_FIELD_TYPES = ("document-checklist", "labuan-document-checklist")
+
+# Field types checked as free text (besides the input-* family)
+TEXT_FIELD_TYPES = ("text-input", "textarea", "email", "phone")
+
+# Field types whose value must be one of their options (besides the select-* family)
+OPTION_FIELD_TYPES = ("radio", "select", "checkbox")
+
+# Field types whose value must be a number
+NUMBER_FIELD_TYPES = ("number", "currency", "percentage")
+
+# Field types holding a list of rows, each validated against nested fields
+REPEATER_FIELD_TYPES = ("repeater", "repeater-field")
+
+# Phone numbers once spaces, dashes, dots and brackets are removed (as the phone field stores them)
+PHONE_PATTERN = re.compile(r"^\+?[0-9]{10,15}$")
+PHONE_SEPARATORS = re.compile(r"[\s\-.()]")
+
+# A check returns (error message, error code) when a value fails it, else None
+Check = Callable[[Any], tuple[str, str] | None]
+
+
+class CompiledField:
+    """One field of a compiled schema: where its value lives and which checks it runs."""
+
+    __slots__ = (
+        "field_id", "field_name", "step_id", "label", "field_type",
+        "required", "checks", "checklist", "row_fields",
+    )
+
+    def __init__(
+        self,
+        field: dict[str, Any],
+        step_id: str | None,
+        checks: tuple[Check, ...],
+        checklist: tuple[Any, tuple[Any, ...]] | None = None,
+        row_fields: tuple["CompiledField", ...] = (),
+    ):
+        self.field_id: str | None = field.get("fieldId")
+        self.field_name: str | None = field.get("fieldName")
+        self.step_id = step_id
+        self.label = field.get("label", self.field_name)
+        self.field_type = field.get("fieldType") or ""
+        self.required = field.get("required", False)
+        self.checks = checks
+        # (checklist field name, IDs of its required documents)
+        self.checklist = checklist
+        # Nested fields of each repeater row
+        self.row_fields = row_fields
+
+    def error(self, message: str, code: str, path: tuple[str, str] = ("", "")) -> ValidationError:
+        """Build an error for this field; ``path`` prefixes the ID and name inside repeater rows."""
+        field_id = self.field_id or ""
+        field_name = self.field_name or ""
+        return ValidationError(
+            field_id=f"{path[0]}{field_id}" if path[0] else field_id,
+            field_name=f"{path[1]}{field_name}" if path[1] else field_name,
+            step_id=self.step_id,
+            error=message,
+            error_code=code,
+        )
+
+    def validate(
+        self,
+        values: dict[str, Any],
+        errors: list[ValidationError],
+        path: tuple[str, str] = ("", ""),
+    ) -> None:
+        """
+        Validate this field's value in ``values`` (step data, or a repeater row), appending any errors.
+
+        Repeater rows are walked once, each row running the nested fields'
+        compiled checks; errors inside a row are reported as
+        ``repeaterId[index].fieldId`` (and likewise for field names).
+        """
+        # supportingDocuments is satisfied by a complete document checklist
+        if self.checklist is not None and _checklist_complete(values, *self.checklist):
+            return
+
+        value = values.get(self.field_name)
+        if _is_empty(value, self.field_type):
+            if self.required:
+                errors.append(self.error(f"{self.label} is required", "REQUIRED", path))
+            return
+
+        for check in self.checks:
+            failure = check(value)
+            if failure is not None:
+                errors.append(self.error(*failure, path))
+
+        if self.row_fields and isinstance(value, list):
+            for index, row in enumerate(value):
+                if not isinstance(row, dict):
+                    row = {}
+                row_path = (
+                    f"{path[0]}{self.field_id}[{index}].",
+                    f"{path[1]}{self.field_name}[{index}].",
+                )
+                for row_field in self.row_fields:
+                    row_field.validate(row, errors, row_path)
+
+
+class CompiledSchema:
+    """
+    A form schema compiled into a validator plan.
+
+    Everything that depends only on the schema (messages, limits, regexes,
+    option sets, required documents) is worked out once, so validating data
+    costs only the checks on that data. Fields are also indexed by step and
+    by name/ID, so validating one step or a few changed fields touches only
+    those fields.
+    """
+
+    def __init__(
+        self,
+        steps: list[tuple[str | None, list[CompiledField]]],
+        form_schema: dict[str, Any] | None = None,
+    ):
+        self.steps = steps
+        # The source schema, for recompiling in worker processes (see validate_batch)
+        self.form_schema = form_schema
+        self._schema_key: str | None = None
+        self.fields = [field for _, fields in steps for field in fields]
+        # stepId -> {fieldName or fieldId -> field}
+        self.field_index: dict[str | None, dict[Any, CompiledField]] = {}
+        for step_id, fields in steps:
+            index = self.field_index.setdefault(step_id, {})
+            for field in fields:
+                for key in (field.field_name, field.field_id):
+                    if key is not None:
+                        index.setdefault(key, field)
+
+    @property
+    def schema_key(self) -> str:
+        """Digest of the source schema, identifying it to worker processes."""
+        if self._schema_key is None:
+            source = json.dumps(self.form_schema, sort_keys=True, default=str)
+            self._schema_key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        return self._schema_key
+
+    def select(
+        self, step_id: str | None = None, fields: list[str] | None = None
+    ) -> list[CompiledField]:
+        """
+        Return the fields to validate, in schema order.
+
+        Args:
+            step_id: Only fields of this step (all steps when None)
+            fields: Only these fields, by fieldName or fieldId (all when None)
+
+        Raises:
+            ValueError: If the step or any of the fields is not in the schema
+        """
+        if step_id is None and fields is None:
+            return self.fields
+        if step_id is not None and step_id not in self.field_index:
+            raise ValueError(f"Unknown step: {step_id}")
+        steps = [
+            (sid, step_fields) for sid, step_fields in self.steps if step_id is None or sid == step_id
+        ]
+        if fields is None:
+            return [field for _, step_fields in steps for field in step_fields]
+
+        selected: set[int] = set()
+        unknown = []
+        for key in fields:
+            matches = [self.field_index[sid][key] for sid, _ in steps if key in self.field_index[sid]]
+            if not matches:
+                unknown.append(key)
+            selected.update(id(field) for field in matches)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(map(str, unknown))}")
+        return [field for _, step_fields in steps for field in step_fields if id(field) in selected]
+
+    def validate(
+        self,
+        data: dict[str, Any],
+        step_id: str | None = None,
+        fields: list[str] | None = None,
+    ) -> tuple[bool, list[ValidationError]]:
+        """
+        Validate form data (organized by step).
+
+        Args:
+            data: Form data to validate (organized by step)
+            step_id: Validate only this step
+            fields: Validate only these fields (by fieldName or fieldId)
+
+        Returns:
+            Tuple of (is_valid, list of validation errors)
+
+        Raises:
+            ValueError: If ``step_id`` or ``fields`` name something not in the schema
+        """
+        errors: list[ValidationError] = []
+        for field in self.select(step_id, fields):
+            step_data = data.get(field.step_id)
+            if not isinstance(step_data, dict):
+                step_data = {}
+            field.validate(step_data, errors)
+        return len(errors) == 0, errors
+
+
+def _is_empty(value: Any, field_type: str) -> bool:
+    """Check if a value is empty (None, empty string, empty list, empty dict, False for checkboxes)."""
+    if value is None or value == "":
+        return True
+    if isinstance(value, (list, dict)) and len(value) == 0:
+        return True
+    return field_type == "checkbox" and value is False
+
+
+def _checklist_complete(step_data: dict[str, Any], checklist_name: Any, required_ids: tuple[Any, ...]) -> bool:
+    """Check if every required document of a checklist value is marked uploaded."""
+    checklist_value = step_data.get(checklist_name)
+    if not checklist_value or not isinstance(checklist_value, dict) or not required_ids:
+        return False
+    for doc_id in required_ids:
+        document = checklist_value.get(doc_id)
+        if not isinstance(document, dict) or not document.get("uploaded", False):
+            return False
+    return True
+
+
+def _option_set(options: list[dict[str, Any]]) -> Callable[[Any], bool]:
+    """Return a membership test for the option values, using a frozenset when they are hashable."""
+    values = [opt.get("value") for opt in options]
+    try:
+        lookup = frozenset(values)
+    except TypeError:
+        return lambda value: value in values
+
+    def contains(value: Any) -> bool:
+        try:
+            return value in lookup
+        except TypeError:  # Unhashable values (e.g. lists) never equal a hashable option
+            return False
+    return contains
+
+
+def _as_number(value: Any) -> float | None:
+    """Read a number from a field value (numbers, or numeric strings with thousands separators)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        try:
+            number = float(value.replace(",", "").strip())
+        except ValueError:
+            return None
+    else:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _setting(field: dict[str, Any], validation: dict[str, Any], key: str, default: Any = None) -> Any:
+    """Read a rule from the field's validation, falling back to the field itself (e.g. min/max, minItems)."""
+    if key in validation:
+        return validation[key]
+    return field.get(key, default)
+
+
+def _compile_checks(field: dict[str, Any]) -> tuple[Check, ...]:
+    """Build the checks for a field's type and validation rules."""
+    field_type = field.get("fieldType") or ""
+    validation = field.get("validation") or {}
+    label = field.get("label", field.get("fieldName"))
+    custom_message = validation.get("errorMessage")
+    checks: list[Check] = []
+
+    def fail(default: str, code: str) -> tuple[str, str]:
+        return (custom_message or default, code)
+
+    if field_type.startswith("input-") or field_type in TEXT_FIELD_TYPES:
+        # Text input validation
+        if "minLength" in validation:
+            min_length = validation["minLength"]
+            too_short = fail(f"{label} must be at least {min_length} characters", "MIN_LENGTH")
+            checks.append(lambda value: too_short if len(str(value)) < min_length else None)
+
+        if "maxLength" in validation:
+            max_length = validation["maxLength"]
+            too_long = fail(f"{label} must be at most {max_length} characters", "MAX_LENGTH")
+            checks.append(lambda value: too_long if len(str(value)) > max_length else None)
+
+        if "pattern" in validation:
+            regex = re.compile(validation["pattern"])
+            mismatch = fail(f"{label} format is invalid", "PATTERN_MISMATCH")
+            checks.append(lambda value: mismatch if not regex.match(str(value)) else None)
+
+        if field_type in ("input-email", "email") or field.get("inputType") == "email":
+            # Basic email validation
+            invalid_email = fail(f"{label} must be a valid email address", "INVALID_EMAIL")
+            checks.append(
+                lambda value: invalid_email if "@" not in str(value) or "." not in str(value) else None
+            )
+
+        if field_type in ("input-phone", "phone") and "pattern" not in validation:
+            invalid_phone = fail(f"{label} must be a valid phone number", "INVALID_PHONE")
+            checks.append(
+                lambda value: invalid_phone
+                if not PHONE_PATTERN.match(PHONE_SEPARATORS.sub("", str(value)))
+                else None
+            )
+
+    elif field_type.startswith("select-") or (field_type in OPTION_FIELD_TYPES and field.get("options")):
+        # Select validation (multiple choice values are lists, each of which must be an option)
+        is_option = _option_set(field.get("options", []))
+        multiple = bool(field.get("multiple")) or field_type == "checkbox" or field_type.startswith("select-multi")
+        invalid_option = fail(f"{label} must be one of the available options", "INVALID_OPTION")
+
+        def check_option(value: Any) -> tuple[str, str] | None:
+            if multiple and isinstance(value, list):
+                return invalid_option if not all(is_option(item) for item in value) else None
+            if isinstance(value, bool) and field_type == "checkbox":  # Single consent checkbox
+                return None
+            return invalid_option if not is_option(value) else None
+        checks.append(check_option)
+
+    elif field_type in NUMBER_FIELD_TYPES:
+        # Numeric validation; percentages are bounded to 0-100 unless the schema says otherwise
+        default_min, default_max = (0, 100) if field_type == "percentage" else (None, None)
+        min_value = _setting(field, validation, "min", default_min)
+        max_value = _setting(field, validation, "max", default_max)
+        not_number = fail(f"{label} must be a number", "INVALID_NUMBER")
+        too_small = fail(f"{label} must be at least {min_value}", "MIN_VALUE")
+        too_large = fail(f"{label} must be at most {max_value}", "MAX_VALUE")
+
+        def check_number(value: Any) -> tuple[str, str] | None:
+            number = _as_number(value)
+            if number is None:
+                return not_number
+            if min_value is not None and number < min_value:
+                return too_small
+            if max_value is not None and number > max_value:
+                return too_large
+            return None
+        checks.append(check_number)
+
+    elif field_type in REPEATER_FIELD_TYPES:
+        # Repeater validation (the rows themselves are checked against the nested fields)
+        min_items = _setting(field, validation, "minItems")
+        max_items = _setting(field, validation, "maxItems")
+        not_list = fail(f"{label} must be a list of entries", "INVALID_TYPE")
+        too_few = fail(f"{label} must have at least {min_items} entries", "MIN_ITEMS")
+        too_many = fail(f"{label} must have at most {max_items} entries", "MAX_ITEMS")
+
+        def check_rows(value: Any) -> tuple[str, str] | None:
+            if not isinstance(value, list):
+                return not_list
+            if min_items is not None and len(value) < min_items:
+                return too_few
+            if max_items is not None and len(value) > max_items:
+                return too_many
+            return None
+        checks.append(check_rows)
+
+    # Add more validation rules as needed
+
+    return tuple(checks)
+
+
+def _compile_field(
+    field: dict[str, Any],
+    step_id: str | None,
+    checklist: tuple[Any, tuple[Any, ...]] | None = None,
+) -> CompiledField:
+    """Compile a field, and the nested fields of a repeater, recursively."""
+    row_fields: tuple[CompiledField, ...] = ()
+    if (field.get("fieldType") or "") in REPEATER_FIELD_TYPES:
+        nested = field.get("fields") or field.get("itemSchema") or []
+        row_fields = tuple(_compile_field(row_field, step_id) for row_field in nested)
+    return CompiledField(field, step_id, _compile_checks(field), checklist, row_fields)
+
+
+def compile_form_schema(form_schema: dict[str, Any]) -> CompiledSchema:
+    """
+    Compile a form schema into a validator plan.
+
+    Args:
+        form_schema: Form schema JSON (from Form.schema_data)
+
+    Returns:
+        Compiled schema
+    """
+    steps = []
+    for step in form_schema.get("steps", []):
+        step_id = step.get("stepId")
+        fields = step.get("fields", [])
+
+        # The first document checklist in the step, and its required documents
+        checklist = None
+        checklist_field = next(
+            (f for f in fields if f.get("fieldType") in CHECKLIST_FIELD_TYPES), None
+        )
+        if checklist_field:
+            required_ids = tuple(
+                doc.get("id") for doc in checklist_field.get("documents", []) if doc.get("required", False)
+            )
+            checklist = (checklist_field.get("fieldName"), required_ids)
+
+        compiled_fields = []
+        for field in fields:
+            defers_to_checklist = (
+                field.get("fieldName") == "supportingDocuments"
+                and field.get("fieldType") in ("file-upload", "upload")
+            )
+            compiled_fields.append(
+                _compile_field(field, step_id, checklist if defers_to_checklist else None)
+            )
+        steps.append((step_id, compiled_fields))
+    return CompiledSchema(steps, form_schema)
+
+
+# (form_id, version) -> (revision, compiled schema), in least recently used order
+_validator_cache: "OrderedDict[tuple[str, str], tuple[Any, CompiledSchema]]" = OrderedDict()
+
+
+def get_form_validator(
+    form_id: str, version: Any, form_schema: dict[str, Any], revision: Any = None
+) -> CompiledSchema:
+    """
+    Return the compiled validator of a form version, compiling it on first use.
+
+    Compiled schemas are cached per (form_id, version) in an LRU of
+    VALIDATOR_CACHE_SIZE entries. ``revision`` (e.g. the form's updatedAt)
+    guards against a schema edited without a version bump: a different
+    revision recompiles.
+
+    Args:
+        form_id: Form identifier
+        version: Form version
+        form_schema: Form schema JSON (from Form.schema_data)
+        revision: Marker that changes whenever the schema does
+
+    Returns:
+        Compiled schema
+    """
+    key = (form_id, str(version))
+    cached = _validator_cache.get(key)
+    if cached is not None and cached[0] == revision:
+        _validator_cache.move_to_end(key)
+        return cached[1]
+
+    compiled = compile_form_schema(form_schema)
+    _validator_cache[key] = (revision, compiled)
+    _validator_cache.move_to_end(key)
+    while len(_validator_cache) > VALIDATOR_CACHE_SIZE:
+        _validator_cache.popitem(last=False)
+    return compiled
 
 
 def validate_form_data(form_schema: dict[str, Any], data: dict[str, Any]) -> tuple[bool, list[ValidationError]]:
     """
     Validate form data against form schema.
 
+    Compiles the schema for this call only; use ``get_form_validator`` to
+    reuse the compiled schema across calls.
+
     Args:
         form_schema: Form schema JSON (from Form.schema_data)
         data: Form data to validate (organized by step)
@@ -21,171 +490,102 @@ def validate_form_data(form_schema: dict[str, Any], data: dict[str, Any]) -> tup
     Returns:
         Tuple of (is_valid, list of validation errors)
     """
-    errors: list[ValidationError] = []
+    return compile_form_schema(form_schema).validate(data)
 
-    # Extract steps from schema
-    steps = form_schema.get("steps", [])
 
-    # Validate each step
-    for step in steps:
-        step_id = step.get("stepId")
-        step_data = data.get(step_id, {})
+# Batches smaller than this are validated in-process; a process pool only pays off for larger ones
+BATCH_POOL_THRESHOLD = 200
 
-        # Validate each field in step
-        fields = step.get("fields", [])
-        for field in fields:
-            field_id = field.get("fieldId")
-            field_name = field.get("fieldName")
-            field_type = field.get("fieldType")
-            required = field.get("required", False)
-            validation = field.get("validation", {})
-
-            # Get field value
-            field_value = step_data.get(field_name)
-
-            # Special handling for supportingDocuments: skip validation if document-checklist is complete
-            should_skip_validation = False
-            if field_name == "supportingDocuments" and (field_type == "file-upload" or field_type == "upload"):
-                # Check if there's a document-checklist field in the same step that is complete
-                checklist_field = next(
-                    (f for f in fields if f.get("fieldType") in ("document-checklist", "labuan-document-checklist")),
-                    None
-                )
-                if checklist_field:
-                    checklist_value = step_data.get(checklist_field.get("fieldName"))
-                    if checklist_value and isinstance(checklist_value, dict):
-                        documents = checklist_field.get("documents", [])
-                        required_documents = [doc for doc in documents if doc.get("required", False)]
-                        if required_documents:
-                            # Check if all required documents are uploaded
-                            all_required_uploaded = all(
-                                checklist_value.get(doc.get("id"), {}).get("uploaded", False)
-                                for doc in required_documents
-                            )
-                            if all_required_uploaded:
-                                should_skip_validation = True
-
-            # Check if field is empty (handles None, empty string, empty list, empty dict, False for checkboxes)
-            is_empty = False
-            if should_skip_validation:
-                # Skip validation for supportingDocuments when checklist is complete
-                is_empty = False
-            elif field_value is None:
-                is_empty = True
-            elif field_value == "":
-                is_empty = True
-            elif isinstance(field_value, list) and len(field_value) == 0:
-                is_empty = True
-            elif isinstance(field_value, dict) and len(field_value) == 0:
-                is_empty = True
-            elif field_type == "checkbox" and field_value is False:
-                is_empty = True
-
-            # Check required
-            if required and is_empty:
-                errors.append(
-                    ValidationError(
-                        field_id=field_id,
-                        field_name=field_name,
-                        step_id=step_id,
-                        error=f"{field.get('label', field_name)} is required",
-                        error_code="REQUIRED",
-                    )
-                )
-                continue
-
-            # Skip validation if field is empty and not required
-            if is_empty:
-                continue
-
-            # Validate based on field type
-            if field_type.startswith("input-"):
-                # Text input validation
-                if "minLength" in validation:
-                    if len(str(field_value)) < validation["minLength"]:
-                        errors.append(
-                            ValidationError(
-                                field_id=field_id,
-                                field_name=field_name,
-                                step_id=step_id,
-                                error=validation.get(
-                                    "errorMessage",
-                                    f"{field.get('label', field_name)} must be at least {validation['minLength']} characters",
-                                ),
-                                error_code="MIN_LENGTH",
-                            )
-                        )
-
-                if "maxLength" in validation:
-                    if len(str(field_value)) > validation["maxLength"]:
-                        errors.append(
-                            ValidationError(
-                                field_id=field_id,
-                                field_name=field_name,
-                                step_id=step_id,
-                                error=validation.get(
-                                    "errorMessage",
-                                    f"{field.get('label', field_name)} must be at most {validation['maxLength']} characters",
-                                ),
-                                error_code="MAX_LENGTH",
-                            )
-                        )
-
-                if "pattern" in validation:
-                    import re
-
-                    pattern = validation["pattern"]
-                    if not re.match(pattern, str(field_value)):
-                        errors.append(
-                            ValidationError(
-                                field_id=field_id,
-                                field_name=field_name,
-                                step_id=step_id,
-                                error=validation.get(
-                                    "errorMessage",
-                                    f"{field.get('label', field_name)} format is invalid",
-                                ),
-                                error_code="PATTERN_MISMATCH",
-                            )
-                        )
-
-                if field_type == "input-email":
-                    # Basic email validation
-                    if "@" not in str(field_value) or "." not in str(field_value):
-                        errors.append(
-                            ValidationError(
-                                field_id=field_id,
-                                field_name=field_name,
-                                step_id=step_id,
-                                error=validation.get(
-                                    "errorMessage",
-                                    f"{field.get('label', field_name)} must be a valid email address",
-                                ),
-                                error_code="INVALID_EMAIL",
-                            )
-                        )
-
-            elif field_type.startswith("select-"):
-                # Select validation
-                options = field.get("options", [])
-                option_values = [opt.get("value") for opt in options]
-                if field_value not in option_values:
-                    errors.append(
-                        ValidationError(
-                            field_id=field_id,
-                            field_name=field_name,
-                            step_id=step_id,
-                            error=validation.get(
-                                "errorMessage",
-                                f"{field.get('label', field_name)} must be one of the available options",
-                            ),
-                            error_code="INVALID_OPTION",
-                        )
-                    )
-
-            # Add more validation rules as needed
-
-    return len(errors) == 0, errors
+# Payloads handed to a worker process at a time
+BATCH_CHUNK_SIZE = 100
+
+# The process pool shared by every batch (see start_batch_pool)
+_batch_pool: ProcessPoolExecutor | None = None
+
+# Compiled schemas of a batch worker process, by schema key (see _validate_chunk)
+_worker_validators: "OrderedDict[str, CompiledSchema]" = OrderedDict()
+
+
+def start_batch_pool(max_workers: int | None = None) -> None:
+    """
+    Start the process pool that validates large batches (see validate_batch).
+
+    Call once at application startup. Workers are spawned, not forked, so
+    they never inherit the server's threads, locks or open connections.
+    With a single CPU no pool is started and batches are validated in-process.
+
+    Args:
+        max_workers: Worker processes (defaults to the CPU count)
+    """
+    global _batch_pool
+    workers = max_workers or os.cpu_count() or 1
+    if _batch_pool is None and workers > 1:
+        _batch_pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+
+
+def stop_batch_pool() -> None:
+    """Shut the batch process pool down (at application shutdown)."""
+    global _batch_pool
+    if _batch_pool is not None:
+        _batch_pool.shutdown(cancel_futures=True)
+        _batch_pool = None
+
+
+def _validate_chunk(
+    schema_key: str, form_schema: dict[str, Any], items: list[dict[str, Any]]
+) -> list[tuple[bool, list[ValidationError]]]:
+    """Validate a chunk in a worker process, compiling each schema once per worker."""
+    validator = _worker_validators.get(schema_key)
+    if validator is None:
+        validator = compile_form_schema(form_schema)
+        _worker_validators[schema_key] = validator
+        while len(_worker_validators) > VALIDATOR_CACHE_SIZE:
+            _worker_validators.popitem(last=False)
+    else:
+        _worker_validators.move_to_end(schema_key)
+    return [validator.validate(item) for item in items]
+
+
+def validate_batch(
+    validator: CompiledSchema,
+    items: list[dict[str, Any]],
+) -> Iterator[tuple[bool, list[ValidationError]]]:
+    """
+    Validate many payloads against one compiled schema.
+
+    Batches of BATCH_POOL_THRESHOLD items or more are split into chunks of
+    BATCH_CHUNK_SIZE and validated in the shared process pool (when
+    start_batch_pool has started one), so regex-heavy schemas use every
+    CPU; each worker compiles a schema once and keeps it for later batches.
+    Results are yielded in item order as soon as their chunk is done, so
+    callers can stream them.
+
+    Args:
+        validator: Compiled schema (from compile_form_schema or get_form_validator)
+        items: Form data payloads (each organized by step)
+
+    Yields:
+        Tuple of (is_valid, list of validation errors) for each item
+    """
+    pool = _batch_pool
+    form_schema = validator.form_schema
+    if len(items) < BATCH_POOL_THRESHOLD or pool is None or form_schema is None:
+        for item in items:
+            yield validator.validate(item)
+        return
+
+    schema_key = validator.schema_key
+    futures = [
+        pool.submit(_validate_chunk, schema_key, form_schema, items[i:i + BATCH_CHUNK_SIZE])
+        for i in range(0, len(items), BATCH_CHUNK_SIZE)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        # Drop the chunks still queued if the caller stops early (e.g. the client disconnected)
+        for future in futures:
+            future.cancel()
 
 
 def validate_file_upload(
@@ -220,18 +620,48 @@ def validate_file_upload(
     return True, None
 
 
-def generate_submission_id() -> str:
+# Daily submission numbers, leased from the JSON store a block at a time
+_submission_numbers = BlockSequence()
+_sql_submission_numbers = BlockSequence(lease=lease_sql_sequence_block)
+
+# The JSON store and the SQL database count submissions separately, so the
+# SQL counter's numbers start above this one and the two never issue the
+# same ID. The JSON counter must stay below it.
+SQL_SUBMISSION_NUMBER_OFFSET = 500000
+
+
+async def generate_submission_id(sql: bool = False) -> str:
     """
     Generate human-readable submission ID.
 
-    Format: SUB-YYYYMMDD-XXXXXX (6-digit sequential number)
+    Format: SUB-YYYYMMDD-XXXXXX (6-digit sequential number, from 000001 each day)
+
+    Numbers come from a per-day counter that each worker process leases in
+    blocks (see utils.sequence), so concurrent submissions never share an
+    ID. Numbers may be skipped (e.g. across restarts), but are never reused.
+    The SQL database's counter numbers from SQL_SUBMISSION_NUMBER_OFFSET + 1,
+    so its IDs never match ones numbered by the JSON store.
+
+    Args:
+        sql: Number from the SQL database's counter (for submissions stored
+            there) instead of the JSON store's. Falls back to the JSON
+            store if the SQL counter cannot be leased.
 
     Returns:
         Submission ID string (e.g., SUB-20251117-001234)
+
+    Raises:
+        RuntimeError: If the JSON store ran out of numbers for the day
     """
     date_str = datetime.now().strftime("%Y%m%d")
-    # In production, use database sequence for sequential number
-    # For now, use timestamp-based approach
-    seq_num = datetime.now().strftime("%f")[:6]  # Use microseconds for uniqueness
-    return f"SUB-{date_str}-{seq_num}"
-
+    name = f"submission:{date_str}"
+    if sql:
+        try:
+            seq_num = await _sql_submission_numbers.next(name)
+            return f"SUB-{date_str}-{SQL_SUBMISSION_NUMBER_OFFSET + seq_num:06d}"
+        except Exception as e:
+            print(f"⚠️  SQL sequence error, using JSON counter: {e}")
+    seq_num = await _submission_numbers.next(name)
+    if seq_num > SQL_SUBMISSION_NUMBER_OFFSET:
+        raise RuntimeError(f"No submission numbers left for {date_str}")
+    return f"SUB-{date_str}-{seq_num:06d}"
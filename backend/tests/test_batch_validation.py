@@ -0,0 +1,79 @@
+"""Tests for batch validation in the shared process pool."""
+
+import asyncio
+import os
+
+import pytest
+from fastapi import FastAPI
+
+from labuan_fsa import json_db, main
+from labuan_fsa.utils import validators
+
+SCHEMA = {
+    "steps": [
+        {
+            "stepId": "step-1",
+            "fields": [
+                {"fieldId": "email", "fieldName": "email", "fieldType": "email", "label": "Email", "required": True},
+                {"fieldId": "name", "fieldName": "name", "fieldType": "text-input", "label": "Name"},
+            ],
+        }
+    ]
+}
+
+
+def _items(count: int) -> list:
+    return [
+        {"step-1": {"email": "someone@example.com" if i % 2 else "not an email", "name": f"Applicant {i}"}}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def no_batch_pool():
+    validators.stop_batch_pool()
+    yield
+    validators.stop_batch_pool()
+
+
+def test_pool_is_reused_across_batches() -> None:
+    validator = validators.compile_form_schema(SCHEMA)
+    items = _items(validators.BATCH_POOL_THRESHOLD + 50)
+    expected = [validator.validate(item) for item in items]
+
+    validators.start_batch_pool(2)
+    pool = validators._batch_pool
+    assert pool is not None
+
+    assert list(validators.validate_batch(validator, items)) == expected
+    workers = set(pool._processes)
+    assert list(validators.validate_batch(validator, items)) == expected
+
+    # Starting again keeps the running pool, and the second batch ran on the same workers
+    validators.start_batch_pool(2)
+    assert validators._batch_pool is pool
+    assert set(pool._processes) == workers
+
+
+def test_lifespan_starts_and_stops_pool(monkeypatch) -> None:
+    async def nothing() -> None:
+        return None
+
+    monkeypatch.setattr(json_db, "initialize_default_data", nothing)
+    monkeypatch.setattr(json_db, "compact_logs", nothing)
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+    async def run() -> None:
+        async with main.lifespan(FastAPI()):
+            pool = validators._batch_pool
+            assert pool is not None
+            validator = validators.compile_form_schema(SCHEMA)
+            items = _items(validators.BATCH_POOL_THRESHOLD)
+            assert list(validators.validate_batch(validator, items)) == [
+                validator.validate(item) for item in items
+            ]
+        assert validators._batch_pool is None
+        with pytest.raises(RuntimeError):
+            pool.submit(os.getpid)
+
+    asyncio.run(run())
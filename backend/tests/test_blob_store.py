@@ -0,0 +1,89 @@
+"""Tests for resumable multipart uploads in the blob store."""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from labuan_fsa import blob_store
+from labuan_fsa.blob_store import BlobTooLargeError, MultipartUploadError
+
+
+@pytest.fixture(autouse=True)
+def storage(tmp_path, monkeypatch):
+    """Store blobs and staged uploads under a temporary directory."""
+    monkeypatch.setattr(blob_store, "settings", SimpleNamespace(storage=SimpleNamespace(local_path=str(tmp_path))))
+
+
+async def _chunks(content: bytes):
+    yield content
+
+
+def _store_part(upload_id: str, part_number: int, content: bytes, max_size: int = 1024) -> dict:
+    return asyncio.run(blob_store.store_part(upload_id, part_number, _chunks(content), max_size))
+
+
+def test_parts_are_assembled_in_part_order() -> None:
+    upload_id = blob_store.create_multipart({"fileName": "report.pdf"})
+    for part_number, content in [(3, b"third"), (1, b"first-"), (2, b"second-")]:
+        _store_part(upload_id, part_number, content)
+
+    assert [part["partNumber"] for part in blob_store.list_parts(upload_id)] == [1, 2, 3]
+
+    file_path, size, _, _ = asyncio.run(blob_store.complete_multipart(upload_id, 1024))
+    assert Path(file_path).read_bytes() == b"first-second-third"
+    assert size == len(b"first-second-third")
+
+
+def test_resent_part_replaces_the_earlier_attempt() -> None:
+    upload_id = blob_store.create_multipart({"fileName": "report.pdf"})
+    _store_part(upload_id, 1, b"corrupted")
+    _store_part(upload_id, 1, b"good")
+
+    assert [part["size"] for part in blob_store.list_parts(upload_id)] == [4]
+
+
+def test_expired_uploads_are_removed() -> None:
+    expired = blob_store.create_multipart({"fileName": "old.pdf"})
+    stale = time.time() - blob_store.MULTIPART_EXPIRY_SECONDS - 60
+    os.utime(blob_store.multipart_root() / expired, (stale, stale))
+
+    # Starting an upload sweeps the expired ones
+    recent = blob_store.create_multipart({"fileName": "new.pdf"})
+
+    with pytest.raises(blob_store.MultipartUploadNotFoundError):
+        blob_store.list_parts(expired)
+    assert blob_store.list_parts(recent) == []
+
+
+def test_part_numbers_are_limited_to_max_parts() -> None:
+    upload_id = blob_store.create_multipart({"fileName": "report.pdf"})
+
+    for part_number in (0, blob_store.MAX_PARTS + 1):
+        with pytest.raises(MultipartUploadError):
+            _store_part(upload_id, part_number, b"data")
+
+    _store_part(upload_id, blob_store.MAX_PARTS, b"data")
+    assert [part["partNumber"] for part in blob_store.list_parts(upload_id)] == [blob_store.MAX_PARTS]
+
+
+def test_staged_parts_count_against_max_size() -> None:
+    upload_id = blob_store.create_multipart({"fileName": "report.pdf"})
+    _store_part(upload_id, 1, b"x" * 6, max_size=10)
+
+    with pytest.raises(BlobTooLargeError):
+        _store_part(upload_id, 2, b"x" * 6, max_size=10)
+
+    # Resending a part replaces it, so its earlier attempt does not count
+    _store_part(upload_id, 1, b"x" * 8, max_size=10)
+    _store_part(upload_id, 2, b"x" * 2, max_size=10)
+
+    # A part still arriving counts too
+    (blob_store.multipart_root() / upload_id / ".00004.inflight.tmp").write_bytes(b"x")
+    with pytest.raises(BlobTooLargeError):
+        _store_part(upload_id, 3, b"x", max_size=10)
+
+    assert [part["size"] for part in blob_store.list_parts(upload_id)] == [8, 2]
@@ -0,0 +1,80 @@
+"""Tests for file downloads: ETag revalidation and byte ranges."""
+
+import hashlib
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from labuan_fsa.api.files import _download_response
+
+CONTENT = bytes(range(256)) * 8
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+ETAG = f'"{DIGEST}"'
+
+
+@pytest.fixture
+def client(tmp_path) -> TestClient:
+    """A client for an app serving one stored file through _download_response."""
+    file_path = tmp_path / "document.pdf"
+    file_path.write_bytes(CONTENT)
+
+    app = FastAPI()
+
+    @app.get("/download")
+    async def download(request: Request):
+        return _download_response(request, file_path, "document.pdf", "application/pdf", DIGEST)
+
+    return TestClient(app)
+
+
+def test_full_download_has_etag(client: TestClient) -> None:
+    response = client.get("/download")
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == ETAG
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_if_none_match_returns_304(client: TestClient) -> None:
+    response = client.get("/download", headers={"If-None-Match": ETAG})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == ETAG
+
+
+def test_if_none_match_weak_and_listed_etags(client: TestClient) -> None:
+    assert client.get("/download", headers={"If-None-Match": f"W/{ETAG}"}).status_code == 304
+    assert client.get("/download", headers={"If-None-Match": f'"other", {ETAG}'}).status_code == 304
+    assert client.get("/download", headers={"If-None-Match": "*"}).status_code == 304
+
+
+def test_stale_if_none_match_returns_file(client: TestClient) -> None:
+    response = client.get("/download", headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_range_returns_206(client: TestClient) -> None:
+    response = client.get("/download", headers={"Range": "bytes=10-19"})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+
+def test_if_range_with_current_etag_returns_206(client: TestClient) -> None:
+    response = client.get("/download", headers={"Range": "bytes=0-99", "If-Range": ETAG})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[:100]
+
+
+def test_if_range_with_stale_etag_returns_full_file(client: TestClient) -> None:
+    response = client.get("/download", headers={"Range": "bytes=0-99", "If-Range": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
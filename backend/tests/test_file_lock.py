@@ -0,0 +1,62 @@
+"""Tests for the inter-process file locks."""
+
+import asyncio
+
+import pytest
+
+from labuan_fsa.file_lock import async_interprocess_lock, interprocess_lock
+
+
+def test_non_blocking_lock_raises_when_held(tmp_path) -> None:
+    path = tmp_path / "items.lock"
+    with interprocess_lock(path):
+        with pytest.raises(BlockingIOError):
+            with interprocess_lock(path, shared=True, blocking=False):
+                pass
+    with interprocess_lock(path, shared=True, blocking=False):
+        pass
+
+
+def test_async_lock_waits_off_the_event_loop(tmp_path) -> None:
+    path = tmp_path / "items.lock"
+
+    async def scenario() -> None:
+        held = interprocess_lock(path)
+        held.__enter__()
+        waiter = asyncio.create_task(_acquire(path))
+        # The event loop keeps running while the waiter is blocked on the lock
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        held.__exit__(None, None, None)
+        await asyncio.wait_for(waiter, timeout=5)
+
+    asyncio.run(scenario())
+
+
+async def _acquire(path) -> None:
+    async with async_interprocess_lock(path):
+        pass
+
+
+def test_unusable_lock_file_leaves_block_unlocked(tmp_path) -> None:
+    # A lock file that cannot be created (e.g. a read-only data directory)
+    path = tmp_path / "missing" / "items.lock"
+    with interprocess_lock(path, shared=True):
+        pass
+
+    async def scenario() -> None:
+        async with async_interprocess_lock(path):
+            pass
+
+    asyncio.run(scenario())
+    assert not path.exists()
+
+
+def test_existing_lock_file_is_opened_read_only(tmp_path) -> None:
+    path = tmp_path / "items.lock"
+    path.touch()
+    path.chmod(0o444)
+    with interprocess_lock(path, shared=True):
+        pass
+    with interprocess_lock(path):
+        pass
@@ -0,0 +1,147 @@
+"""Tests for the JSON database's write-ahead log, snapshots and lookups."""
+
+import pytest
+
+from labuan_fsa import json_db
+from labuan_fsa.json_db import DuplicateKeyError, _JsonCollection
+
+
+def _collection(path) -> _JsonCollection:
+    """A collection over ``path``; a second one over the same path acts like another process."""
+    return _JsonCollection(path, unique=("id", "name"), indexed=("kind",))
+
+
+@pytest.fixture
+def items_path(tmp_path):
+    return tmp_path / "items.json"
+
+
+def test_insert_rejects_duplicate_primary_key(items_path) -> None:
+    items = _collection(items_path)
+    items.insert({"id": "a", "name": "first"})
+
+    with pytest.raises(DuplicateKeyError):
+        items.insert({"id": "a", "name": "dup"})
+
+    assert [record["name"] for record in items.items()] == ["first"]
+    # A fresh load (replaying the log) agrees with the writing process
+    assert [record["name"] for record in _collection(items_path).items()] == ["first"]
+
+
+def _records(count: int) -> list:
+    return [{"id": f"r{i}", "name": f"item {i}", "kind": i % 3, "pad": "x" * (i * 37 % 500)} for i in range(count)]
+
+
+@pytest.fixture
+def split_items(items_path, monkeypatch) -> _JsonCollection:
+    """A collection whose snapshot is split into several chunks with a key directory."""
+    monkeypatch.setattr(json_db, "MAX_FILE_SIZE", 8 * 1024)
+    items = _collection(items_path)
+    items.replace_all(_records(200))
+    assert len(json_db._read_manifest(items_path)["chunks"]) > 1
+    return items
+
+
+def test_log_replays_after_unclean_stop(items_path) -> None:
+    items = _collection(items_path)
+    for record in _records(5):
+        items.insert(record)
+    items.update(items.locate("r1", "id"), {"name": "renamed"})
+    items.delete(items.locate("r3", "id"))
+    # No compaction and no clean shutdown: only the log holds these writes
+
+    assert _collection(items_path).items() == items.items()
+    assert [record["id"] for record in _collection(items_path).items()] == ["r0", "r1", "r2", "r4"]
+
+
+def test_crash_while_compacting_keeps_committed_generation(items_path, monkeypatch) -> None:
+    items = _collection(items_path)
+    items.replace_all(_records(3))
+    items.update(items.locate("r0", "id"), {"name": "logged"})
+
+    def crash(directory, manifest):
+        raise SystemExit("killed")
+
+    monkeypatch.setattr(json_db, "_finish_generation", crash)
+    with pytest.raises(SystemExit):
+        items.compact()
+    monkeypatch.undo()
+
+    reloaded = _collection(items_path)
+    assert reloaded.get("r0", "id")["name"] == "logged"
+    assert len(reloaded.items()) == 3
+
+
+def test_torn_final_log_line_is_ignored(items_path) -> None:
+    items = _collection(items_path)
+    items.insert({"id": "a", "name": "first"})
+    items.insert({"id": "b", "name": "second"})
+    with open(items.log_path, "ab") as f:
+        f.write(b'{"op":"put","record":{"id":"c","na')
+
+    assert [record["id"] for record in _collection(items_path).items()] == ["a", "b"]
+
+    # The next writer ends the torn line instead of appending to it
+    writer = _collection(items_path)
+    writer.insert({"id": "d", "name": "after crash"})
+    assert [record["id"] for record in _collection(items_path).items()] == ["a", "b", "d"]
+
+
+def test_compaction_rewrites_only_changed_chunks(split_items, items_path) -> None:
+    def checksums() -> dict:
+        manifest = json_db._read_manifest(items_path)
+        return {chunk["name"]: chunk["checksum"] for chunk in manifest["chunks"]}
+
+    def mtimes() -> dict:
+        return {name: (items_path.parent / name).stat().st_mtime_ns for name in checksums()}
+
+    before_checksums, before_mtimes = checksums(), mtimes()
+    split_items.update(split_items.locate("r150", "id"), {"name": "edited"})
+    split_items.compact()
+    after_checksums, after_mtimes = checksums(), mtimes()
+
+    changed = [name for name in after_checksums if after_checksums[name] != before_checksums.get(name)]
+    rewritten = [name for name in after_mtimes if after_mtimes[name] != before_mtimes.get(name)]
+    assert len(changed) == 1
+    assert rewritten == changed
+    assert _collection(items_path).get("r150", "id")["name"] == "edited"
+
+
+def test_peek_agrees_with_resident_lookups(split_items, items_path, monkeypatch) -> None:
+    split_items.update(split_items.locate("r42", "id"), {"name": "changed in the log"})
+    split_items.delete(split_items.locate("r7", "id"))
+
+    resident = _collection(items_path)
+    resident.items()
+    for value, fields in [
+        ("r0", ("id",)),
+        ("r199", ("id",)),
+        ("item 120", ("name", "id")),
+        ("r42", ("id",)),
+        ("r7", ("id",)),
+        ("missing", ("id", "name")),
+    ]:
+        cold = _collection(items_path)
+        assert cold.get(value, *fields) == resident.get(value, *fields), value
+
+    # A cold lookup of a record untouched by the log parses a single chunk
+    loaded = []
+    load_chunk = json_db._load_chunk
+    monkeypatch.setattr(json_db, "_load_chunk", lambda *args: loaded.append(args[2]["name"]) or load_chunk(*args))
+    assert _collection(items_path).get("r120", "id")["name"] == "item 120"
+    assert len(loaded) == 1
+
+
+def test_only_first_cold_lookup_peeks(split_items, items_path, monkeypatch) -> None:
+    items = _collection(items_path)
+    peeks = []
+    peek = items._peek
+    monkeypatch.setattr(items, "_peek", lambda *args: peeks.append(args) or peek(*args))
+
+    assert items.get("r10", "id")["name"] == "item 10"
+    assert items.get("r11", "id")["name"] == "item 11"
+    assert items.get("r12", "id")["name"] == "item 12"
+
+    # Later lookups are answered from the resident collection
+    assert len(peeks) == 1
+    assert items._stamp is not None
@@ -0,0 +1,40 @@
+"""Tests for keyset pagination cursors."""
+
+import base64
+import json
+
+import pytest
+
+from labuan_fsa.utils.pagination import decode_cursor, encode_cursor, read_cursor
+
+SQL_ID = "6f1c2a4e-8b9d-4c3e-a1f2-0e9d8c7b6a51"
+
+
+def _raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def test_cursor_round_trip_records_backend() -> None:
+    sql = encode_cursor("sql", "2025-11-17T10:00:00+00:00", SQL_ID)
+    json_cursor = encode_cursor("json", "2025-11-17T10:00:00Z", "SUB-20251117-000001")
+
+    assert decode_cursor(sql) == ("sql", "2025-11-17T10:00:00+00:00", SQL_ID)
+    assert read_cursor(json_cursor) == ("json", ("2025-11-17T10:00:00Z", "SUB-20251117-000001"))
+    assert read_cursor(None) == (None, None)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64 !",
+        _raw_cursor("just a string"),
+        _raw_cursor(["2025-11-17T10:00:00Z", SQL_ID]),
+        _raw_cursor(["mongo", "2025-11-17T10:00:00Z", SQL_ID]),
+        _raw_cursor(["sql", "2025-11-17T10:00:00Z", 42]),
+        _raw_cursor(["sql", "2025-11-17T10:00:00Z", "SUB-20251117-000001"]),
+        _raw_cursor(["sql", "yesterday", SQL_ID]),
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor: str) -> None:
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
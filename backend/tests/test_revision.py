@@ -0,0 +1,29 @@
+"""Tests for reading the client's submission revision."""
+
+import pytest
+
+from labuan_fsa.utils.revision import client_revision
+
+
+@pytest.mark.parametrize("if_match", ['"3"', "3", 'W/"3"', ' "3" '])
+def test_if_match_forms(if_match: str) -> None:
+    assert client_revision(if_match, None) == 3
+
+
+def test_if_match_takes_precedence_over_body() -> None:
+    assert client_revision('"5"', 2) == 5
+
+
+def test_body_revision_without_if_match() -> None:
+    assert client_revision(None, 2) == 2
+    assert client_revision(None, None) is None
+
+
+def test_wildcard_matches_any_revision() -> None:
+    assert client_revision("*", 2) is None
+
+
+@pytest.mark.parametrize("if_match", ['"abc"', '"-1"', ""])
+def test_malformed_if_match(if_match: str) -> None:
+    with pytest.raises(ValueError):
+        client_revision(if_match, None)